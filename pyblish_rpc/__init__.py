@@ -6,11 +6,17 @@ from .version import *
 
 
 def register_vendor_packages():
+    """Expose vendored packages at the top level, e.g. `import six`
+
+    Not needed by pyblish_rpc itself, which imports them as
+    pyblish_rpc.vendor.*, and no longer done upon import.
+
+    """
+
     vendor_dir = os.path.join(__file__, "..", "vendor")
     vendor_dir = os.path.realpath(vendor_dir)
     sys.path.insert(0, vendor_dir)
 
-register_vendor_packages()
 
 self = sys.modules[__name__]
 self._dispatch_wrapper = None
@@ -6,15 +6,48 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     parser.add_argument("--port", type=int, default=6000,
                         help="Port to use")
+    parser.add_argument("--socket", help="Listen on a Unix socket "
+                                         "at this path, rather than "
+                                         "the port")
     parser.add_argument("--delay", type=float, default=0.5,
                         help="Higher value means slower")
     parser.add_argument("--debug", action="store_true", default=False)
+    parser.add_argument("--backend", default="threaded",
+                        choices=["threaded", "asyncio"],
+                        help="Serve connections from a thread each, "
+                             "or from a single event loop")
+
+    parser.add_argument("--bench", action="store_true", default=False,
+                        help="Run benchmarks, rather than a server")
+    parser.add_argument("--iterations", type=int, default=200,
+                        help="Number of calls per benchmark")
+    parser.add_argument("--instances", type=int, default=50,
+                        help="Number of instances in benchmarked context")
+    parser.add_argument("--output", help="Write benchmark results to "
+                                         "this JSON file")
+    parser.add_argument("--compare", help="Compare benchmark results "
+                                          "with those of this JSON file")
+    parser.add_argument("--imports", nargs="?", const="pyblish_rpc.server",
+                        help="Break down the time taken to import "
+                             "this module, rather than run a server")
 
     args = parser.parse_args()
 
-    if args.debug:
-        print "Starting debug server.."
-        server.start_debug_server(**args.__dict__)
+    if args.imports:
+        from .bench import imports
+        print(imports.report(args.imports))
+
+    elif args.bench:
+        from . import bench
+        bench.main(iterations=args.iterations,
+                   instances=args.instances,
+                   output=args.output,
+                   compare_to=args.compare)
+
+    elif args.debug:
+        print("Starting debug server..")
+        server.start_debug_server(port=args.port, delay=args.delay)
     else:
-        print "Starting production server.."
-        server.start_production_server(port=args.port)
+        print("Starting production server..")
+        server.start_production_server(port=args.socket or args.port,
+                                       backend=args.backend)
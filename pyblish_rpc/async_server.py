@@ -0,0 +1,468 @@
+"""asyncio alternative to the threaded RpcServer
+
+Connections are served by a single event loop, rather than read and
+written by workers, such that many idle or long-polling clients cost
+next to nothing. Calls are carried out exactly as with :class:`RpcServer`;
+by the workers of its :class:`PooledDispatcher`, through the
+registered dispatch wrapper, with responses written back from the
+loop once ready.
+
+Requires Python 3.4 or above.
+
+"""
+
+import sys
+import time
+import zlib
+import threading
+
+try:
+    import asyncio
+    from xmlrpc.client import Fault
+    from xmlrpc.server import SimpleXMLRPCDispatcher
+except ImportError:
+    # Python 2, importable for the sake of documentation only
+    asyncio = None
+    from xmlrpclib import Fault
+    from SimpleXMLRPCServer import SimpleXMLRPCDispatcher
+
+from . import encoding, sessions, sidechannel
+from .server import (
+    PooledDispatcher,
+    _is_socket_path,
+    _unix_family,
+    _remove_socket,
+)
+
+# Requests with headers larger than this are refused
+MAX_HEADER_SIZE = 65536
+
+_reasons = {
+    200: "OK",
+    400: "Bad Request",
+    401: "Unauthorized",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    431: "Request Header Fields Too Large",
+    501: "Not Implemented",
+    503: "Service Unavailable",
+}
+
+
+class AsyncRpcServer(PooledDispatcher, SimpleXMLRPCDispatcher):
+    """The Pyblish RPC Server, on an asyncio event loop
+
+    Serves the same paths, encodings and metrics as :class:`RpcServer`
+    and shares its interface; register functions and instances, then
+    :meth:`serve_forever` until :meth:`shutdown` from another thread.
+
+    Arguments:
+        path (str): Path of API, in addition to /pyblish
+        address (tuple or str): Host and port to listen on, port 0
+            picks any available port, see :attr:`server_address`.
+            Or the path of a Unix socket to listen on instead.
+        allow_none (bool, optional): Allow None in XML-RPC
+        encoding (str, optional): Encoding of XML-RPC responses
+        logRequests (bool, optional): Ignored, requests are not logged
+        workers (int, optional): Number of calls carried out at once
+        queue_size (int, optional): Maximum number of calls queued
+        max_connections (int, optional): Maximum number of open
+            connections, further connections are refused with 503.
+        compress_threshold (int, optional): Bytes beyond which
+            responses are compressed, None to never compress.
+        side_channel_threshold (int, optional): Bytes beyond which
+            responses are passed via the side channel, if asked for,
+            None to never do so.
+
+    """
+
+    def __init__(self, path, address, allow_none=False, encoding=None,
+                 logRequests=False, workers=8, queue_size=64,
+                 max_connections=1024, compress_threshold=1400,
+                 side_channel_threshold=256 * 1024):
+        if asyncio is None:
+            raise RuntimeError("The asyncio backend requires Python 3.4+")
+
+        SimpleXMLRPCDispatcher.__init__(self, allow_none, encoding)
+        self._setup_dispatcher(workers, queue_size, compress_threshold,
+                               side_channel_threshold)
+
+        self.rpc_paths = ("/pyblish", path)
+        self.max_connections = max_connections
+
+        self._protocols = set()
+        self._pending = 0
+        self._stopping = False
+        self._stopped = threading.Event()
+
+        self.loop = asyncio.new_event_loop()
+
+        if _is_socket_path(address):
+            _unix_family()
+            _remove_socket(address)
+            self._server = self.loop.run_until_complete(
+                self.loop.create_unix_server(lambda: _HttpProtocol(self),
+                                             address))
+            self.server_address = address
+
+        else:
+            self._server = self.loop.run_until_complete(
+                self.loop.create_server(lambda: _HttpProtocol(self),
+                                        *address))
+            self.server_address = self._server.sockets[0].getsockname()[:2]
+
+    def serve_forever(self):
+        asyncio.set_event_loop(self.loop)
+
+        try:
+            self.loop.run_forever()
+        finally:
+            self._stopped.set()
+
+    def shutdown(self):
+        """Stop serving once calls in progress have been answered
+
+        Blocks until stopped, unless called from within a call,
+        e.g. kill(), which must first be answered itself.
+
+        """
+
+        self.loop.call_soon_threadsafe(self._stop)
+
+        if not getattr(self._local, "dispatching", False):
+            self._stopped.wait()
+
+    def server_close(self):
+        self._server.close()
+
+        for protocol in list(self._protocols):
+            protocol.close()
+
+        self.loop.run_until_complete(self._server.wait_closed())
+        self.loop.close()
+        self.pool.shutdown(wait=True)
+        self._close_side_channel()
+
+        if _is_socket_path(self.server_address):
+            _remove_socket(self.server_address)
+
+    def stats(self, methods=True):
+        """Return statistics about connections, queue and calls"""
+        stats = PooledDispatcher.stats(self, methods)
+        stats["connectionCount"] = len(self._protocols)
+        return stats
+
+    def handle(self, request, respond):
+        """Handle `request`, eventually calling `respond`
+
+        Called from the loop, with `respond` taking the status,
+        Content-Type, body, Content-Encoding and side channel header
+        of the response, to be called from the loop as well.
+
+        """
+
+        if not self.authenticate(request.headers):
+            return respond(401)
+
+        accept_encoding = request.headers.get("accept-encoding", "")
+        # Files are removed once the connection closes, so it must
+        # outlive the response for the client to read them
+        side_channel = (request.headers.get(sidechannel.HEADER.lower())
+                        if request.keep_alive else None)
+
+        if request.method == "GET":
+            if request.path == self.health_path:
+                return respond(200, "application/json", self._health())
+
+            if request.path != self.metrics_path:
+                return respond(404)
+
+            text = self.metrics.text(gauges=self.stats(methods=False))
+            body, content_encoding = self._compress(
+                text.encode("utf-8"), accept_encoding)
+            return respond(200, "text/plain; version=0.0.4",
+                           body, content_encoding)
+
+        if request.method != "POST":
+            return respond(405)
+
+        if request.path not in self.rpc_paths:
+            return respond(404)
+
+        content_type = request.headers.get("content-type", "")
+        content_type = content_type.split(";")[0].strip()
+
+        if content_type not in encoding.content_types:
+            content_type = "text/xml"
+
+        try:
+            body = _decode(request)
+        except ValueError:
+            return respond(501)
+        except zlib.error:
+            return respond(400)
+
+        try:
+            method, params, id_ = self._loads(body, content_type)
+        except Exception:
+            return respond(200, content_type, self._error(
+                sys.exc_info(), content_type, None))
+
+        times = {"queued": time.time()}
+
+        try:
+            future = self._submit(method, self._call, method, params,
+                                  times, content_type, id_, len(body),
+                                  accept_encoding, side_channel,
+                                  request.headers.get(
+                                      sessions.HEADER.lower()) or None)
+        except Fault as fault:
+            return respond(200, content_type, self._fault(
+                fault.faultCode, fault.faultString, content_type, id_))
+
+        self._pending += 1
+
+        def done(future):
+            try:
+                response = future.result()
+            except Exception:
+                response = (self._error(sys.exc_info(), content_type, id_),
+                            None, None)
+
+            self.loop.call_soon_threadsafe(finish, *response)
+
+        def finish(response, content_encoding, side_channel):
+            self._pending -= 1
+            respond(200, content_type, response,
+                    content_encoding, side_channel)
+
+            if self._stopping and not self._pending:
+                self.loop.stop()
+
+        future.add_done_callback(done)
+
+    def _stop(self):
+        self._stopping = True
+        self._server.close()
+
+        if not self._pending:
+            self.loop.stop()
+
+
+class _Request(object):
+    def __init__(self, method, path, version, headers, body):
+        self.method = method
+        self.path = path
+        self.version = version
+        self.headers = headers
+        self.body = body
+
+    @property
+    def keep_alive(self):
+        connection = self.headers.get("connection", "").lower()
+
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+
+        return connection != "close"
+
+
+class _HttpProtocol(asyncio.Protocol if asyncio else object):
+    """HTTP/1.1 connection, answering one request at a time"""
+
+    def __init__(self, server):
+        self._server = server
+        self._transport = None
+        self._buffer = bytearray()
+        self._request = None
+
+        # Request line and headers of a request awaiting its body,
+        # and the offset from which to search for the end of headers
+        self._head = None
+        self._searched = 0
+        self._refused = False
+
+        # Side channel of the last response over this connection
+        self._side_channel = None
+
+    def connection_made(self, transport):
+        self._transport = transport
+
+        if len(self._server._protocols) >= self._server.max_connections:
+            self._refused = True
+            transport.write(b"HTTP/1.1 503 Service Unavailable\r\n"
+                            b"Retry-After: 1\r\n"
+                            b"Content-Length: 0\r\n"
+                            b"Connection: close\r\n\r\n")
+            transport.close()
+            return
+
+        self._server._protocols.add(self)
+
+    def connection_lost(self, exc):
+        self._server._protocols.discard(self)
+        self._transport = None
+        self._release_side_channel()
+
+    def data_received(self, data):
+        if self._refused:
+            return
+
+        self._buffer += data
+        self._next()
+
+    def close(self):
+        if self._transport is not None:
+            self._transport.close()
+
+    def _next(self):
+        """Handle next request, unless one is already in progress"""
+        if self._request is not None or self._transport is None:
+            return
+
+        try:
+            request = self._parse()
+        except _HttpError as e:
+            return self._write(e.status, close=True)
+
+        if request is None:
+            return  # Incomplete
+
+        # The client has read the previous response by now
+        self._release_side_channel()
+
+        self._request = request
+        self._server.handle(request, self._respond)
+
+    def _release_side_channel(self):
+        """Remove file of previous response, unless claimed"""
+        if self._side_channel is not None:
+            sidechannel.remove(self._side_channel)
+            self._side_channel = None
+
+    def _parse(self):
+        """Return next request, or None whilst incomplete
+
+        Headers are parsed once complete, after which the body is
+        awaited by its length alone, such that data received in
+        many parts is never searched more than once.
+
+        """
+
+        if self._head is None:
+            self._head = self._parse_head()
+
+            if self._head is None:
+                return None
+
+        method, path, version, headers, length = self._head
+
+        if len(self._buffer) < length:
+            return None
+
+        body = bytes(self._buffer[:length])
+        del self._buffer[:length]
+        self._head = None
+
+        return _Request(method, path, version, headers, body)
+
+    def _parse_head(self):
+        """Return request line, headers and length of body, if complete"""
+        end = self._buffer.find(b"\r\n\r\n", self._searched)
+
+        if end < 0:
+            if len(self._buffer) > MAX_HEADER_SIZE:
+                raise _HttpError(431)
+
+            # The terminator may straddle what was received so far
+            self._searched = max(0, len(self._buffer) - 3)
+            return None
+
+        lines = bytes(self._buffer[:end]).decode("latin-1").split("\r\n")
+        del self._buffer[:end + 4]
+        self._searched = 0
+
+        try:
+            method, path, version = lines[0].split()
+        except ValueError:
+            raise _HttpError(400)
+
+        headers = dict()
+        for line in lines[1:]:
+            key, _, value = line.partition(":")
+            headers[key.strip().lower()] = value.strip()
+
+        if "chunked" in headers.get("transfer-encoding", ""):
+            raise _HttpError(501)
+
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise _HttpError(400)
+
+        if method == "POST" and "content-length" not in headers:
+            raise _HttpError(411)
+
+        return method, path, version, headers, length
+
+    def _respond(self, status, content_type=None, body=b"",
+                 content_encoding=None, side_channel=None):
+        request, self._request = self._request, None
+        self._side_channel = side_channel
+        self._write(status, content_type, body, content_encoding,
+                    side_channel, close=not request.keep_alive)
+        self._next()
+
+    def _write(self, status, content_type=None, body=b"",
+               content_encoding=None, side_channel=None, close=False):
+        if self._transport is None:
+            self._release_side_channel()
+            return  # The client has gone
+
+        headers = ["HTTP/1.1 %d %s" % (status, _reasons[status]),
+                   "Content-Length: %d" % len(body)]
+
+        if content_type is not None:
+            headers.append("Content-Type: %s" % content_type)
+
+        if content_encoding is not None:
+            headers.append("Content-Encoding: %s" % content_encoding)
+
+        if side_channel is not None:
+            headers.append("%s: %s" % (sidechannel.HEADER, side_channel))
+
+        if close:
+            headers.append("Connection: close")
+
+        self._transport.write(
+            ("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body)
+
+        if close:
+            self._transport.close()
+            self._transport = None
+
+
+class _HttpError(Exception):
+    def __init__(self, status):
+        super(_HttpError, self).__init__(status)
+        self.status = status
+
+
+def _decode(request):
+    """Return body of `request`, decompressed if need be
+
+    Raises:
+        ValueError on unsupported Content-Encoding
+
+    """
+
+    content_encoding = request.headers.get("content-encoding", "identity")
+
+    if content_encoding == "identity":
+        return request.body
+
+    if content_encoding == "gzip":
+        return encoding.decompress(request.body)
+
+    raise ValueError("Unsupported Content-Encoding: %s" % content_encoding)
@@ -0,0 +1,252 @@
+"""Benchmarks of the round-trip and formatting hot paths
+
+Results are summarised per benchmark as latency percentiles along
+with calls per second and, for calls made over the wire, the number
+of bytes sent and received. The time taken to import this package
+from a cold start is included as well, see :mod:`bench.imports`.
+Write them to disk with :func:`save` and compare those of two commits
+with :func:`compare`.
+
+Usage:
+    $ python -m pyblish_rpc --bench --output before.json
+    $ git checkout feature
+    $ python -m pyblish_rpc --bench --compare before.json
+
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import subprocess
+
+import pyblish.api
+
+from .. import version
+
+# Highest resolution clock available
+timer = getattr(time, "perf_counter", time.time)
+
+
+def run(iterations=200, instances=50, protocols=None, backends=None,
+        log=None):
+    """Run all benchmarks
+
+    Arguments:
+        iterations (int, optional): Number of calls per benchmark
+        instances (int, optional): Size of synthetic context
+        protocols (list, optional): Protocols to benchmark over
+            the wire, defaults to all available.
+        backends (list, optional): Server backends to benchmark,
+            defaults to all available.
+        log (callable, optional): Called with progress messages
+
+    Returns:
+        Dictionary of results, suitable for :func:`save`
+
+    """
+
+    from . import imports, micro, rpc
+
+    log = log or (lambda message: None)
+
+    results = {
+        "version": version,
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.time(),
+        "iterations": iterations,
+        "instances": instances,
+        "formatting": dict(),
+        "rpc": dict(),
+        "imports": dict(),
+    }
+
+    log("Benchmarking imports..")
+    results["imports"] = dict(
+        (module, summarise(durations))
+        for module, durations in imports.run(
+            repeat=min(iterations, 10)).items())
+
+    log("Benchmarking formatting..")
+    results["formatting"] = micro.run(iterations, instances)
+
+    for backend in backends or rpc.backends():
+        results["rpc"][backend] = dict()
+
+        for protocol in protocols or rpc.protocols():
+            log("Benchmarking %s over %s.." % (protocol, backend))
+            results["rpc"][backend][protocol] = rpc.run(
+                protocol, iterations, instances, backend)
+
+    return results
+
+
+def measure(func, iterations, setup=None):
+    """Return duration of each of `iterations` calls to `func`
+
+    Arguments:
+        func (callable): Function to measure
+        iterations (int): Number of calls
+        setup (callable, optional): Called before each call, outside
+            of the measurement, returning arguments for `func`.
+
+    """
+
+    durations = list()
+
+    for _ in range(iterations):
+        args = setup() if setup is not None else ()
+
+        start = timer()
+        func(*args)
+        durations.append(timer() - start)
+
+    return durations
+
+
+def summarise(durations, **extra):
+    """Summarise `durations` in seconds, along with `extra` measures"""
+    durations = sorted(durations)
+    total = sum(durations)
+
+    summary = {
+        "calls": len(durations),
+        "p50": _percentile(durations, 50),
+        "p99": _percentile(durations, 99),
+        "mean": total / len(durations),
+        "callsPerSecond": len(durations) / total if total else 0,
+    }
+
+    summary.update(extra)
+
+    return summary
+
+
+def synthetic_context(instances=50, context=None):
+    """Return context of `instances` instances, with typical data
+
+    Arguments:
+        instances (int, optional): Number of instances to create
+        context (Context, optional): Context to populate, defaults
+            to a new one.
+
+    """
+
+    if context is None:
+        context = pyblish.api.Context()
+
+    context.data["user"] = "benchmark"
+
+    for index in range(instances):
+        instance = context.create_instance("Instance%03d" % index)
+        instance.data["family"] = "A"
+        instance.data["families"] = ["A", "B"]
+        instance.data["label"] = "Instance %d" % index
+        instance.data["publish"] = index % 4 != 0
+
+        # Data beyond what formatting passes on to the client
+        instance.data["frames"] = list(range(100))
+        instance.data["path"] = "/projects/benchmark/%03d.ma" % index
+
+    return context
+
+
+def save(results, path):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=4, sort_keys=True)
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def report(results):
+    """Return human-readable table of `results`"""
+    lines = ["%-36s %10s %10s %12s %12s" % (
+        "Benchmark", "p50 (ms)", "p99 (ms)", "calls/sec", "bytes/call")]
+
+    for name, summary in _flatten(results):
+        lines.append("%-36s %10.3f %10.3f %12.1f %12s" % (
+            name,
+            summary["p50"] * 1000,
+            summary["p99"] * 1000,
+            summary["callsPerSecond"],
+            summary.get("bytesPerCall", "-")))
+
+    return "\n".join(lines)
+
+
+def compare(before, after):
+    """Return table of p50 latency of `after` relative to `before`"""
+    before = dict(_flatten(before))
+
+    lines = ["%-36s %12s %12s %8s" % (
+        "Benchmark", "before (ms)", "after (ms)", "change")]
+
+    for name, summary in _flatten(after):
+        if name not in before:
+            continue
+
+        old, new = before[name]["p50"], summary["p50"]
+        lines.append("%-36s %12.3f %12.3f %+7.1f%%" % (
+            name, old * 1000, new * 1000,
+            (new - old) / old * 100 if old else 0))
+
+    return "\n".join(lines)
+
+
+def _flatten(results):
+    """Yield (name, summary) of each benchmark in `results`"""
+    for name, summary in sorted(results["formatting"].items()):
+        yield name, summary
+
+    # Not in results prior to their introduction
+    for name, summary in sorted(results.get("imports", {}).items()):
+        yield "import.%s" % name, summary
+
+    for backend, protocols in sorted(results["rpc"].items()):
+        for protocol, benchmarks in sorted(protocols.items()):
+            for name, summary in sorted(benchmarks.items()):
+                yield "%s.%s.%s" % (backend, protocol, name), summary
+
+
+def _percentile(ordered, percent):
+    index = int(round((len(ordered) - 1) * percent / 100.0))
+    return ordered[index]
+
+
+def _commit():
+    """Return current commit of the repository of this package, if any"""
+    try:
+        output = subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], stderr=subprocess.PIPE,
+            cwd=os.path.dirname(os.path.abspath(__file__)))
+    except (OSError, subprocess.CalledProcessError, AttributeError):
+        return None
+
+    return output.decode("ascii").strip()
+
+
+def main(iterations=200, instances=50, output=None, compare_to=None):
+    """Run benchmarks and report to stdout, as per the command-line"""
+
+    def log(message):
+        sys.stderr.write(message + "\n")
+
+    results = run(iterations, instances, log=log)
+
+    print(report(results))
+
+    if compare_to:
+        print("")
+        print(compare(load(compare_to), results))
+
+    if output:
+        save(results, output)
+        log("Results written to %s" % output)
+
+    return results
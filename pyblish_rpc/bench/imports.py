@@ -0,0 +1,128 @@
+"""Time taken to import modules, from a cold start
+
+Each import is measured in a new interpreter, such that nothing is
+imported beforehand besides what Python itself imports on startup.
+On Python 3.7 and above, :func:`breakdown` lists the time taken by
+each module imported along the way, as per ``python -X importtime``.
+
+Usage:
+    $ python -m pyblish_rpc --imports
+    $ python -m pyblish_rpc --imports pyblish_rpc.service
+
+"""
+
+import os
+import sys
+import subprocess
+
+# Modules imported by hosts, and on starting a server
+MODULES = ("pyblish_rpc", "pyblish_rpc.server")
+
+_measure = """\
+import time
+timer = getattr(time, "perf_counter", time.time)
+start = timer()
+import %s
+print(timer() - start)
+"""
+
+
+def run(modules=MODULES, repeat=5):
+    """Return duration of each of `repeat` imports of each module
+
+    Returns:
+        List of durations in seconds, by module
+
+    """
+
+    return dict(
+        (module, [float(_python("-c", _measure % module)[0])
+                  for _ in range(repeat)])
+        for module in modules
+    )
+
+
+def breakdown(module):
+    """Return time taken by each module imported along with `module`
+
+    Returns:
+        List of (name, self, cumulative), durations in seconds,
+            slowest first by cumulative time.
+
+    Raises:
+        RuntimeError on Python below 3.7, lacking -X importtime
+
+    """
+
+    if sys.version_info < (3, 7):
+        raise RuntimeError("A breakdown requires Python 3.7+")
+
+    _, stderr = _python("-X", "importtime", "-c", "import %s" % module)
+
+    modules = list()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+
+        self_, cumulative, name = line[len("import time:"):].split("|")
+
+        try:
+            modules.append((name.strip(),
+                            int(self_) / 1e6,
+                            int(cumulative) / 1e6))
+        except ValueError:
+            continue  # The header
+
+    return sorted(modules, key=lambda module: module[2], reverse=True)
+
+
+def report(module, top=25):
+    """Return human-readable table of the slowest imports of `module`
+
+    Only the total is reported where a breakdown is unsupported.
+
+    """
+
+    lines = ["%-48s %10s %10s" % ("Module", "self (ms)", "total (ms)")]
+
+    if sys.version_info < (3, 7):
+        durations = sorted(run([module])[module])
+        lines.append("%-48s %10s %10.2f" % (
+            module, "-", durations[len(durations) // 2] * 1000))
+        return "\n".join(lines)
+
+    for name, self_, cumulative in breakdown(module)[:top]:
+        lines.append("%-48s %10.2f %10.2f" % (
+            name, self_ * 1000, cumulative * 1000))
+
+    return "\n".join(lines)
+
+
+def _python(*args):
+    """Run Python with `args` and return its stdout and stderr
+
+    This package is importable from the new interpreter, as it is
+    from this one.
+
+    """
+
+    root = os.path.dirname(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__))))
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [root, env.get("PYTHONPATH")]))
+
+    popen = subprocess.Popen([sys.executable] + list(args),
+                             stdout=subprocess.PIPE,
+                             stderr=subprocess.PIPE,
+                             env=env)
+    stdout, stderr = popen.communicate()
+
+    if popen.returncode != 0:
+        raise RuntimeError(stderr.decode("utf-8", "replace"))
+
+    return stdout.decode("utf-8"), stderr.decode("utf-8")
+
+
+__all__ = ["run", "breakdown", "report"]
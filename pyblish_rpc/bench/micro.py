@@ -0,0 +1,65 @@
+"""Microbenchmarks of formatting, in isolation of the wire"""
+
+import logging
+
+from .. import bench, formatting, mocking
+
+
+def run(iterations, instances):
+    context = bench.synthetic_context(instances)
+    plugin = mocking.ValidateFailureMock
+    result = _result(plugin, context[0])
+
+    def uncached_plugin():
+        formatting.clear_cache()
+        return [plugin]
+
+    results = {
+        "format_context": bench.measure(
+            formatting.format_context, iterations,
+            setup=lambda: [context]),
+        "format_plugin": bench.measure(
+            formatting.format_plugin, iterations,
+            setup=lambda: [plugin]),
+        "format_plugin.uncached": bench.measure(
+            formatting.format_plugin, iterations,
+            setup=uncached_plugin),
+        "format_result": bench.measure(
+            formatting.format_result, iterations,
+            setup=lambda: [result]),
+        "format_result.minimal": bench.measure(
+            formatting.format_result, iterations,
+            setup=lambda: [result, "minimal", logging.INFO]),
+    }
+
+    return dict((name, bench.summarise(durations))
+                for name, durations in results.items())
+
+
+def _result(plugin, instance):
+    """Return unformatted result of `plugin`, as pyblish.plugin does"""
+    records = list()
+    for level, message in ((logging.DEBUG, "e = mc^2"),
+                           (logging.INFO, "About to fail.."),
+                           (logging.WARNING, "Failing.. soooon.."),
+                           (logging.CRITICAL, "Ok, you're done.")):
+        records.append(logging.LogRecord(
+            plugin.__name__, level, __file__, 1, message, None, None))
+
+    error = AssertionError("Failed")
+    try:
+        raise error
+    except AssertionError:
+        formatting.extract_traceback(error)
+
+    return {
+        "success": False,
+        "plugin": plugin,
+        "instance": instance,
+        "error": error,
+        "records": records,
+        "duration": 1.0,
+    }
+
+
+__all__ = ["run"]
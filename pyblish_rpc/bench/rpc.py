@@ -0,0 +1,160 @@
+"""End-to-end benchmarks over a real server
+
+The server runs in a thread of this process, serving
+:class:`MockRpcService` without delay, such that what is measured
+is the cost of the round-trip itself. Each backend of the server
+is benchmarked, see :func:`server._server`, over TCP and, where
+available, a Unix socket; the latter named with a "-unix" suffix.
+
+"""
+
+import os
+import socket
+import shutil
+import tempfile
+import threading
+
+from .. import bench, client, encoding, server, service
+
+
+class CountingTransport(client.PooledTransport):
+    """Transport keeping count of the bytes of each body sent and received"""
+
+    def __init__(self, *args, **kwargs):
+        client.PooledTransport.__init__(self, *args, **kwargs)
+        self.sent = 0
+        self.received = 0
+
+    def _send(self, connection, handler, body, headers, method="POST"):
+        response = client.PooledTransport._send(
+            self, connection, handler, body, headers, method)
+
+        self.sent += len(body or b"")
+        self.received += int(response.getheader("Content-Length") or 0)
+
+        return response
+
+
+def protocols():
+    """Return protocols available in this environment"""
+    available = ["xmlrpc", "json"]
+
+    if encoding.MSGPACK in encoding.content_types:
+        available.append("msgpack")
+
+    return available
+
+
+def backends():
+    """Return server backends available in this environment"""
+    try:
+        import asyncio
+    except ImportError:
+        available = ["threaded"]
+    else:
+        available = ["threaded", "asyncio"]
+
+    if hasattr(socket, "AF_UNIX"):
+        available += [backend + "-unix" for backend in available]
+
+    return available
+
+
+def run(protocol, iterations, instances, backend="threaded"):
+    """Benchmark each call over `protocol`, served by `backend`
+
+    Arguments:
+        backend (str, optional): Backend of server, suffixed
+            with "-unix" to serve from a Unix socket.
+
+    Returns:
+        Summary of each call, by name
+
+    """
+
+    backend, _, family = backend.partition("-")
+    directory = None
+
+    if family == "unix":
+        directory = tempfile.mkdtemp()
+        address = os.path.join(directory, "bench.sock")
+    else:
+        address = 0
+
+    service_ = service.MockRpcService(delay=0)
+    server_ = server._server(address, service_, backend)
+
+    thread = threading.Thread(target=server_.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    # Every response via the side channel, to clients asking for it
+    server_.side_channel_threshold = 0
+
+    transport = CountingTransport()
+    proxy = client.Proxy(address or server_.server_address[1],
+                         transport=transport,
+                         protocol=protocol)
+
+    side_transport = CountingTransport(side_channel=True)
+    side_proxy = client.Proxy(address or server_.server_address[1],
+                              transport=side_transport,
+                              protocol=protocol)
+
+    try:
+        proxy.reset()
+        bench.synthetic_context(instances, context=service_._context)
+
+        plugins = proxy.discover()
+        context = proxy.context()
+
+        # Quiet plug-in, processing an instance of family "A"
+        plugin = next(p for p in plugins if p.__name__ == "Validator1Proxy")
+
+        def full_context(fields=None, proxy=proxy):
+            # Ask for the full state, rather than changes
+            proxy.cached_revision = None
+            proxy.context(fields)
+
+        calls = {
+            "discover": proxy.discover,
+            "context": full_context,
+            "context.listing": lambda: full_context(
+                {"keys": ["family", "publish"]}),
+            "context.side_channel": lambda: full_context(proxy=side_proxy),
+            "process": lambda: proxy.process(plugin, context, context[0]),
+            "emit": lambda: proxy.emit("benchmark"),
+            "health": proxy.health,
+        }
+
+        results = dict()
+        for name, call in calls.items():
+            for counting in (transport, side_transport):
+                counting.sent = counting.received = 0
+
+            durations = bench.measure(call, iterations)
+
+            # Bytes over the socket, excluding those of the side channel
+            sent = transport.sent + side_transport.sent
+            received = transport.received + side_transport.received
+
+            results[name] = bench.summarise(
+                durations,
+                bytesSent=sent // iterations,
+                bytesReceived=received // iterations,
+                bytesPerCall=(sent + received) // iterations)
+
+        return results
+
+    finally:
+        transport.close()
+        side_transport.close()
+        server_.shutdown()
+        server_.server_close()
+        thread.join()
+
+        if directory is not None:
+            shutil.rmtree(directory)
+
+
+__all__ = ["run", "protocols", "backends"]
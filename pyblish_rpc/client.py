@@ -7,19 +7,35 @@ communication is serialised back into its original JSON.
 
 """
 
+import os
+import json
+import uuid
+import types
 import socket
+import itertools
+import threading
+import traceback
 
 
 try:
-    from xmlrpclib import Transport, ServerProxy
+    import httplib
+    from xmlrpclib import Transport, ServerProxy, Fault, ProtocolError
 except ImportError:
     # Python 3
-    from xmlrpc.client import Transport, ServerProxy
+    import http.client as httplib
+    from xmlrpc.client import Transport, ServerProxy, Fault, ProtocolError
 
 
 import pyblish.api
 import pyblish.plugin
 
+from . import encoding, pool, sessions, sidechannel
+from .vendor import six
+from .vendor.six.moves.urllib.parse import quote, unquote
+
+# Bytes of a mapped response handed to the XML parser at a time
+_CHUNK_SIZE = 1 << 20
+
 
 class Proxy(object):
     """Wrap ServerProxy with logic and object proxies
@@ -27,6 +43,23 @@ class Proxy(object):
     The proxy mirrors the remote interface to provide an
     as-similar experience as possible.
 
+    Arguments:
+        port (int or str): Port at which the host is listening, or
+            the path of the Unix socket it listens on.
+        user (str, optional): Username for authentication
+        password (str, optional): Password for authentication
+        transport (Transport, optional): Defaults to PooledTransport
+        protocol (str, optional): One of "xmlrpc", "json" or "msgpack".
+            Defaults to the most compact encoding available, falling
+            back to "xmlrpc" if the host doesn't support it.
+        side_channel (bool, optional): Ask a host on this machine for
+            large responses via the side channel, see
+            :class:`PooledTransport`. Applies to the default transport.
+        session (str, optional): Id of session on the host, whose
+            context is kept apart from that of other sessions, see
+            :mod:`sessions`. Applies to the default transport.
+            Defaults to the session shared by clients without one.
+
     """
 
     _instance = None
@@ -35,34 +68,112 @@ class Proxy(object):
         """Any call not overloaded, simply pass it on"""
         return getattr(self._proxy, attr)
 
-    def __init__(self, port, user=None, password=None):
+    def __init__(self, port, user=None, password=None, transport=None,
+                 protocol=None, side_channel=False, session=None):
         self.cached_context = list()
         self.cached_discover = list()
+        self.cached_revision = None
+        self.cached_fields = None
+
+        # Proxies of plug-ins last discovered, by plug-in id,
+        # along with their descriptor, see PluginProxy.from_json()
+        self._plugin_proxies = dict()
+
+        if transport is None:
+            transport = PooledTransport(side_channel=side_channel,
+                                        session=session)
+
+        self.transport = transport
+
+        if isinstance(port, six.string_types):
+            # Unix sockets require PooledTransport.connect()
+            if not isinstance(transport, PooledTransport):
+                raise ValueError("Unix sockets require PooledTransport")
+
+            address = quote(os.path.abspath(port), safe="")
+        else:
+            address = "127.0.0.1:%d" % port
+
+        host = "{auth}{address}".format(
+            address=address,
+            auth=("{user}:{pwd}@".format(
+                user=user, pwd=password)
+            ) if user else "")
 
-        transport = Transport()
+        self._host = host
+
+        # Whether to ask the host for its health, rather than ping it
+        self._health = isinstance(transport, PooledTransport)
 
         self._proxy = ServerProxy(
-            "http://{auth}127.0.0.1:{port}/pyblish".format(
-                port=port,
-                auth=("{user}:{pwd}@".format(
-                    user=user, pwd=password)
-                ) if user else ""),
+            "http://%s/pyblish" % host,
             allow_none=True,
             transport=transport)
 
+        if protocol is None:
+            protocol = ("msgpack" if encoding.MSGPACK in
+                        encoding.content_types else "json")
+
+            # Compact encodings require PooledTransport.round_trip()
+            if not isinstance(transport, PooledTransport):
+                protocol = "xmlrpc"
+
+        if protocol != "xmlrpc":
+            self._proxy = CompactServerProxy(
+                host, "/pyblish",
+                transport=transport,
+                content_type={"json": encoding.JSON,
+                              "msgpack": encoding.MSGPACK}[protocol],
+                fallback=self._proxy)
+
     def test(self, **vars):
         """Vars can only be passed as a non-keyword argument"""
         return self._proxy.test(vars)
 
     def ping(self):
-        """Convert Fault to True/False"""
+        """Return whether the host is alive
+
+        Asks for the health of the host where supported, which is
+        answered even whilst the host is busy with other calls,
+        and calls ping() on hosts predating it.
+
+        """
+
         try:
+            if self._health:
+                try:
+                    return self.health()["alive"]
+                except ProtocolError:
+                    self._health = False
+
             self._proxy.ping()
+
         except (socket.timeout, socket.error):
             return False
+
         return True
 
-    def process(self, plugin, context, instance=None, action=None):
+    def health(self):
+        """Return whether the host is busy, and with what
+
+        Answered by the server directly, rather than dispatched as
+        a call, see PooledDispatcher.health().
+
+        Raises:
+            ProtocolError if the host doesn't support it
+
+        """
+
+        status, data = self.transport.get(self._host, "/health")
+
+        if status != 200:
+            raise ProtocolError(self._host + "/health", status,
+                                "Health is not supported", {})
+
+        return json.loads(data.decode("utf-8"))
+
+    def process(self, plugin, context, instance=None, action=None,
+                on_record=None, interval=0.2, records=None):
         """Transmit a `process` request to host
 
         Arguments:
@@ -70,32 +181,703 @@ class Proxy(object):
             context (ContextProxy): Filtered context
             instance (InstanceProxy, optional): Instance to process
             action (str, optional): Action to process
+            on_record (callable, optional): Called with each record
+                as it is emitted on the host, possibly from another
+                thread, rather than once processing has finished.
+            interval (float, optional): Seconds between fetching
+                records, if `on_record` is passed.
+            records (dict, optional): "detail" and "level" of records
+                for this call only, defaults to those configured via
+                configure_records().
 
         """
 
         plugin = plugin.to_json()
         instance = instance.to_json() if instance is not None else None
-        return self._proxy.process(plugin, instance, action)
 
-    def repair(self, plugin, context, instance=None):
+        return self._call(self._proxy.process, on_record, interval,
+                          records, plugin, instance, action)
+
+    def repair(self, plugin, context, instance=None,
+               on_record=None, interval=0.2, records=None):
         plugin = plugin.to_json()
         instance = instance.to_json() if instance is not None else None
-        return self._proxy.repair(plugin, instance)
 
-    def context(self):
-        self.cached_context = ContextProxy.from_json(self._proxy.context())
+        return self._call(self._proxy.repair, on_record, interval,
+                          records, plugin, instance)
+
+    def _call(self, func, on_record, interval, records, *args):
+        """Call `func` with `args`, streaming records if need be
+
+        Trailing arguments are only passed when used, as understood
+        by hosts predating them.
+
+        """
+
+        if on_record is None:
+            if records is None:
+                return func(*args)
+            return func(*(args + (None, records)))
+
+        return self._stream(func, on_record, interval, records, *args)
+
+    def configure_records(self, detail=None, level=None):
+        """Set which records results carry, for all calls from now on
+
+        Arguments:
+            detail (str, optional): "minimal", "standard" or "full"
+            level (int, optional): Exclude records below this level
+
+        """
+
+        return self._proxy.configure_records(detail, level)
+
+    def _stream(self, func, on_record, interval, records, *args):
+        """Call `func` whilst fetching its records as they are emitted
+
+        The result carries every record, streamed or not.
+
+        """
+
+        call = str(uuid.uuid4())
+        finished = threading.Event()
+        streamed = list()
+
+        def fetch():
+            cursor = 0
+
+            while not finished.wait(interval):
+                try:
+                    status = self._proxy.records(call, cursor)
+                except Exception:
+                    traceback.print_exc()
+                    continue
+
+                cursor = status["next"]
+
+                for record in status["records"]:
+                    streamed.append(record)
+                    on_record(record)
+
+        thread = threading.Thread(target=fetch)
+        thread.daemon = True
+        thread.start()
+
+        if records is not None:
+            args += (call, records)
+        else:
+            args += (call,)
+
+        try:
+            result = func(*args)
+        finally:
+            finished.set()
+            thread.join()
+
+        # The result carries streamed records too, in the order
+        # emitted, amongst those of other threads
+        delivered = iter(streamed)
+        pending = next(delivered, None)
+
+        for record in result["records"]:
+            if record == pending:
+                pending = next(delivered, None)
+            else:
+                on_record(record)
+
+        return result
+
+    def context(self, fields=None):
+        """Return context of host, updated in place from what was cached
+
+        Only changes since the last call are transferred.
+
+        Usage:
+            >> # Cheaply list many instances, ..
+            >> context = proxy.context({"keys": ["family", "publish"]})
+            >> # ..and look closer at one of them
+            >> proxy.instance(context[0].id, {"keys": ["family", "path"]})
+
+        Arguments:
+            fields (dict, optional): Selection of data and instances,
+                see formatting.format_data(). Changing selection
+                transfers the context in full.
+
+        """
+
+        if fields != self.cached_fields:
+            self.cached_revision = None
+            self.cached_fields = fields
+
+        if fields is None:
+            # As understood by hosts predating the selection of fields
+            changes = self._proxy.changes(self.cached_revision)
+        else:
+            changes = self._proxy.changes(self.cached_revision, fields)
+
+        if "since" in changes:
+            self.cached_context.apply_changes(changes)
+        else:
+            self.cached_context = ContextProxy.from_json(changes["context"])
+
+        self.cached_revision = changes["revision"]
+
         return self.cached_context
 
+    def instance(self, id, fields=None):
+        """Return instance `id` alone, as selected by `fields`
+
+        The cached context is left untouched, such that an instance
+        may be fetched with more data than the others.
+
+        Arguments:
+            id (str): Id of instance
+            fields (dict, optional): Selection of data,
+                see formatting.format_data()
+
+        Raises:
+            KeyError if there is no such instance
+
+        """
+
+        fields = dict(fields or {}, instances=[id])
+        context = self._proxy.context(fields)
+
+        if not context["children"]:
+            raise KeyError(id)
+
+        return InstanceProxy.from_json(context["children"][0])
+
     def discover(self):
         self.cached_discover[:] = list()
         for plugin in self._proxy.discover():
-            self.cached_discover.append(PluginProxy.from_json(plugin))
+            self.cached_discover.append(
+                PluginProxy.from_json(plugin, self._plugin_proxies))
+
+        # Forget plug-ins no longer discovered
+        ids = set(plugin.id for plugin in self.cached_discover)
+        for id_ in set(self._plugin_proxies) - ids:
+            del self._plugin_proxies[id_]
 
         return self.cached_discover
 
     def emit(self, signal, **kwargs):
         self._proxy.emit(signal, kwargs)
 
+    def run_pass(self, plugins=None, orders=None, timeout=1.0):
+        """Process `plugins` on the host, yielding results as they arrive
+
+        Arguments:
+            plugins (list, optional): PluginProxy objects or ids
+                to process, defaults to every active plug-in.
+            orders (list, optional): Lower (inclusive) and upper
+                bound of orders to process.
+            timeout (float, optional): Seconds each poll waits
+                for the next result on the host.
+
+        Yields:
+            Results, as returned by :meth:`process`
+
+        """
+
+        if plugins is not None:
+            plugins = [getattr(p, "id", p) for p in plugins]
+
+        id_ = self._proxy.start_pass(plugins, orders)
+        cursor = 0
+
+        while True:
+            status = self._proxy.poll_pass(id_, cursor, timeout)
+            cursor = status["cursor"]
+
+            for result in status["results"]:
+                yield result
+
+            if status["finished"]:
+                break
+
+
+class AsyncProxy(object):
+    """Non-blocking counterpart to :class:`Proxy`
+
+    Calls return immediately with a :class:`pool.Future` of what
+    :class:`Proxy` would have returned, including its ContextProxy
+    and PluginProxy objects. Calls are carried out by a few threads
+    over pooled connections, such that several may be in flight at
+    once, e.g. pinging whilst processing.
+
+    Futures may be waited upon, given callbacks, cancelled whilst
+    still pending or awaited from asyncio coroutines.
+
+    Usage:
+        >> proxy = AsyncProxy(6000)
+        >> context, plugins = proxy.context(), proxy.discover()
+        >> proxy.ping().result(timeout=1)
+        True
+        >> len(context.result()), len(plugins.result())
+        (2, 30)
+
+    Arguments:
+        port (int): Port at which the host is listening
+        user (str, optional): Username for authentication
+        password (str, optional): Password for authentication
+        protocol (str, optional): As per :class:`Proxy`
+        workers (int, optional): Maximum number of calls in flight,
+            further calls are pending until one has finished.
+        session (str, optional): As per :class:`Proxy`
+
+    Attributes:
+        proxy (Proxy): Blocking proxy carrying out calls
+
+    """
+
+    def __init__(self, port, user=None, password=None, protocol=None,
+                 workers=4, session=None):
+        self.transport = PooledTransport(max_connections=workers,
+                                         session=session)
+        self.proxy = Proxy(port, user, password,
+                           transport=self.transport,
+                           protocol=protocol)
+
+        self._pool = pool.WorkerPool(workers, queue_size=0,
+                                     name="AsyncProxy")
+
+        # Calls updating the cached context and plug-ins
+        self._cache_lock = threading.Lock()
+
+    def __getattr__(self, attr):
+        """Any call not overloaded, submit that of the Proxy"""
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+
+        func = getattr(self.proxy, attr)
+
+        def call(*args, **kwargs):
+            return self.submit(func, *args, **kwargs)
+
+        return call
+
+    def submit(self, func, *args, **kwargs):
+        """Call `func` from a worker, returning Future of its result"""
+        return self._pool.submit(0, func, *args, **kwargs)
+
+    def context(self, fields=None):
+        return self.submit(self._cached, self.proxy.context, fields)
+
+    def discover(self):
+        return self.submit(self._cached, self.proxy.discover)
+
+    def run_pass(self, plugins=None, orders=None, timeout=1.0,
+                 on_result=None):
+        """Process on the host as per :meth:`Proxy.run_pass`
+
+        Arguments:
+            on_result (callable, optional): Called with each result
+                as it arrives, from another thread.
+
+        Returns:
+            Future of all results
+
+        """
+
+        def run():
+            results = list()
+            for result in self.proxy.run_pass(plugins, orders, timeout):
+                if on_result is not None:
+                    on_result(result)
+                results.append(result)
+            return results
+
+        return self.submit(run)
+
+    def close(self):
+        """Stop once pending calls have finished and close connections"""
+        self._pool.shutdown()
+        self.transport.close()
+
+    def _cached(self, func, *args):
+        with self._cache_lock:
+            return func(*args)
+
+
+class PooledTransport(Transport):
+    """Thread-safe HTTP/1.1 transport with persistent connections
+
+    Each request borrows an idle connection from the pool, or opens
+    a new one if none is available, and hands it back once the response
+    has been read. Connections closed by the server whilst idle are
+    re-established transparently.
+
+    Responses compressed with gzip are accepted, and decompressed,
+    unless :attr:`accept_gzip_encoding` is False. Requests are
+    compressed beyond :attr:`encode_threshold`, if any.
+
+    Large responses of a server on this machine may be passed via a
+    file in shared memory instead, mapped and decoded where it lies
+    rather than read into memory of its own, see :mod:`sidechannel`.
+
+    Arguments:
+        max_connections (int, optional): Maximum number of idle
+            connections kept alive per host. Defaults to 4.
+        timeout (float, optional): Socket timeout in seconds,
+            defaults to no timeout.
+        encode_threshold (int, optional): Bytes beyond which requests
+            are compressed, defaults to never compressing requests.
+        side_channel (bool, optional): Ask for large responses via the
+            side channel, only for servers sharing this machine and
+            its files. Defaults to False.
+        session (str, optional): Id of session of each request,
+            see :mod:`sessions`.
+
+    Attributes:
+        connects (int): Number of connections opened
+        reuses (int): Number of requests served by an existing connection
+
+    """
+
+    def __init__(self, max_connections=4, timeout=None,
+                 encode_threshold=None, side_channel=False,
+                 session=None, *args, **kwargs):
+        Transport.__init__(self, *args, **kwargs)
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.encode_threshold = encode_threshold
+        self.side_channel = side_channel
+        self.session = session
+        self.connects = 0
+        self.reuses = 0
+
+        self._idle = dict()
+        self._lock = threading.Lock()
+
+    def request(self, host, handler, request_body, verbose=False):
+        self.verbose = verbose
+
+        response, connection, host = self.round_trip(
+            host, handler, request_body, {"Content-Type": "text/xml"})
+
+        if response.status != 200:
+            connection.close()
+            raise ProtocolError(host + handler,
+                                response.status,
+                                response.reason,
+                                response.msg)
+
+        try:
+            result = self.parse_response(response)
+
+        except Fault:
+            # The response was read in full, the connection is still good
+            self.release(host, connection)
+            raise
+
+        except Exception:
+            connection.close()
+            raise
+
+        self.release(host, connection)
+        return result
+
+    def parse_response(self, response):
+        side_channel = response.getheader(sidechannel.HEADER)
+        if side_channel is None:
+            return Transport.parse_response(self, response)
+
+        response.read()
+
+        # Parsed in pieces, rather than copied whole
+        parser, unmarshaller = self.getparser()
+        with sidechannel.mapped(side_channel) as buffer:
+            for offset in range(0, len(buffer), _CHUNK_SIZE):
+                parser.feed(buffer[offset:offset + _CHUNK_SIZE])
+        parser.close()
+
+        return unmarshaller.close()
+
+    def get(self, host, handler):
+        """Return status and body of a GET request of `handler`
+
+        Returns:
+            Tuple of (status, body), the body decompressed
+
+        """
+
+        response, connection, host = self.round_trip(
+            host, handler, None, {}, method="GET")
+
+        try:
+            data = response.read()
+            if response.getheader("Content-Encoding", "") == "gzip":
+                data = encoding.decompress(data)
+        except Exception:
+            connection.close()
+            raise
+
+        self.release(host, connection)
+
+        return response.status, data
+
+    def round_trip(self, host, handler, body, headers, method="POST"):
+        """Send `body` to `handler` and return the unread response
+
+        The caller is responsible for reading the response and
+        either handing the connection back via :meth:`release`
+        or closing it.
+
+        Returns:
+            Tuple of (response, connection, host)
+
+        """
+
+        host, extra_headers, _ = self.get_host_info(host)
+
+        headers = dict(headers)
+        headers.update(extra_headers or [])
+        headers.setdefault("User-Agent", self.user_agent)
+
+        if self.accept_gzip_encoding:
+            headers.setdefault("Accept-Encoding", "gzip")
+
+        if self.side_channel and method == "POST":
+            headers.setdefault(sidechannel.HEADER, "mmap")
+
+        if self.session is not None:
+            headers.setdefault(sessions.HEADER, self.session)
+
+        if (body is not None and
+                self.encode_threshold is not None and
+                len(body) > self.encode_threshold):
+            body = encoding.compress(body)
+            headers["Content-Encoding"] = "gzip"
+
+        connection, reused = self.acquire(host)
+
+        try:
+            response = self._send(connection, handler, body, headers,
+                                  method)
+            return response, connection, host
+
+        except socket.timeout:
+            connection.close()
+            raise
+
+        except (socket.error, httplib.HTTPException):
+            connection.close()
+            if not reused:
+                raise
+
+        # The server dropped an idle connection; try again on a fresh one
+        connection = self.connect(host)
+
+        try:
+            response = self._send(connection, handler, body, headers,
+                                  method)
+        except Exception:
+            connection.close()
+            raise
+
+        return response, connection, host
+
+    def acquire(self, host):
+        """Return an idle connection to `host`, or a new one
+
+        Returns:
+            Tuple of (connection, reused)
+
+        """
+
+        with self._lock:
+            idle = self._idle.get(host)
+            if idle:
+                self.reuses += 1
+                return idle.pop(), True
+
+        return self.connect(host), False
+
+    def release(self, host, connection):
+        """Return `connection` to the pool, or close it if the pool is full"""
+        if connection.sock is None:
+            return  # Closed by the server, e.g. an HTTP/1.0 response
+
+        with self._lock:
+            idle = self._idle.setdefault(host, list())
+            if len(idle) < self.max_connections:
+                idle.append(connection)
+                return
+
+        connection.close()
+
+    def connect(self, host):
+        """Return new connection to `host`
+
+        Hosts starting with a slash, percent-encoded, are the path
+        of a Unix socket, e.g. "%2Ftmp%2Fpyblish.sock".
+
+        """
+
+        if host.upper().startswith("%2F"):
+            connection = UnixHTTPConnection(unquote(host),
+                                            timeout=self.timeout)
+            connection.connect()
+
+        else:
+            connection = httplib.HTTPConnection(host, timeout=self.timeout)
+            connection.connect()
+
+            # Requests are small and latency-bound
+            connection.sock.setsockopt(socket.IPPROTO_TCP,
+                                       socket.TCP_NODELAY, 1)
+
+        with self._lock:
+            self.connects += 1
+
+        return connection
+
+    def close(self):
+        """Close all idle connections"""
+        with self._lock:
+            idle, self._idle = self._idle, dict()
+
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+    def stats(self):
+        return {
+            "connects": self.connects,
+            "reuses": self.reuses,
+        }
+
+    def _send(self, connection, handler, body, headers, method="POST"):
+        connection.request(method, handler, body, headers)
+        return connection.getresponse()
+
+
+class UnixHTTPConnection(httplib.HTTPConnection):
+    """HTTP connection over the Unix socket at `path`"""
+
+    def __init__(self, path, timeout=None):
+        httplib.HTTPConnection.__init__(self, "localhost", timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+
+        try:
+            sock.connect(self.path)
+        except Exception:
+            sock.close()
+            raise
+
+        self.sock = sock
+
+
+class CompactServerProxy(object):
+    """ServerProxy speaking JSON-RPC in a compact encoding
+
+    Calls are sent as JSON-RPC 2.0 in either JSON or msgpack, see
+    :mod:`encoding`. Should the server answer in anything else, it
+    is assumed to not support it and all calls are handed to
+    `fallback` from then on.
+
+    Arguments:
+        host (str): Host, including port and authentication
+        handler (str): Path of API, e.g. "/pyblish"
+        transport (PooledTransport): Transport of requests
+        content_type (str, optional): One of encoding.content_types
+        fallback (ServerProxy, optional): XML-RPC proxy of same host
+
+    """
+
+    def __init__(self, host, handler, transport,
+                 content_type=encoding.JSON, fallback=None):
+        self._host = host
+        self._handler = handler
+        self._transport = transport
+        self._content_type = content_type
+        self._fallback = fallback
+        self._use_fallback = False
+        self._ids = itertools.count()
+
+    def __getattr__(self, name):
+        return _Method(self._request, name)
+
+    def _request(self, method, params):
+        if self._use_fallback:
+            return getattr(self._fallback, method)(*params)
+
+        body = encoding.dumps(
+            encoding.request(method, params, next(self._ids)),
+            self._content_type)
+
+        response, connection, host = self._transport.round_trip(
+            self._host, self._handler, body, {
+                "Content-Type": self._content_type,
+                "Accept": self._content_type,
+            })
+
+        content_type = response.getheader("Content-Type", "")
+        supported = content_type.startswith(self._content_type)
+        reply = None
+
+        try:
+            data = response.read()
+            if response.getheader("Content-Encoding", "") == "gzip":
+                data = encoding.decompress(data)
+
+            side_channel = response.getheader(sidechannel.HEADER)
+            if side_channel is not None and supported:
+                # Whilst the server keeps the file, until the next
+                # request over this connection
+                with sidechannel.mapped(side_channel) as buffer:
+                    reply = encoding.loads(buffer, self._content_type)
+
+        except Exception:
+            connection.close()
+            raise
+
+        self._transport.release(host, connection)
+
+        if response.status != 200:
+            raise ProtocolError(host + self._handler,
+                                response.status,
+                                response.reason,
+                                response.msg)
+
+        if not supported:
+            if self._fallback is None:
+                raise ProtocolError(host + self._handler,
+                                    response.status,
+                                    "Unsupported encoding: %s"
+                                    % self._content_type,
+                                    response.msg)
+
+            self._use_fallback = True
+            return getattr(self._fallback, method)(*params)
+
+        if reply is None:
+            reply = encoding.loads(data, self._content_type)
+
+        if reply.get("error") is not None:
+            raise Fault(reply["error"]["code"], reply["error"]["message"])
+
+        return reply["result"]
+
+
+class _Method(object):
+    """Callable remote method, supporting dotted names"""
+
+    def __init__(self, send, name):
+        self._send = send
+        self._name = name
+
+    def __getattr__(self, name):
+        return _Method(self._send, "%s.%s" % (self._name, name))
+
+    def __call__(self, *args):
+        return self._send(self._name, list(args))
+
 
 # Object Proxies
 
@@ -125,6 +907,33 @@ class ContextProxy(pyblish.api.Context):
 
         return self
 
+    def apply_changes(self, changes):
+        """Patch context in place with changes from RpcService.changes()
+
+        Instances which weren't modified remain the same objects.
+
+        Arguments:
+            changes (dict): Changes, see schema/changes.json
+
+        """
+
+        instances = dict((instance.id, instance) for instance in self)
+        instances[self.id] = self
+
+        for instance in changes.get("added", []):
+            instances[instance["id"]] = InstanceProxy.from_json(instance)
+
+        for id_, item in changes.get("context", {}).items():
+            data = instances[id_].data
+            for key, change in item.items():
+                if "new" in change:
+                    data[key] = change["new"]
+                else:
+                    data.pop(key, None)
+
+        if "order" in changes:
+            self[:] = [instances[id_] for id_ in changes["order"]]
+
     def to_json(self):
         return {
             "name": self.name,
@@ -167,35 +976,97 @@ class PluginProxy(object):
     """
 
     @classmethod
-    def from_json(cls, plugin):
+    def from_json(cls, plugin, cache=None):
         """Build PluginProxy object from incoming dictionary
 
         Emulate a plug-in by providing access to attributes
         in the same way they are accessed using the remote object.
         This allows for it to be used by members of :mod:`pyblish.logic`.
 
+        Given a `cache`, classes are reused for as long as the
+        descriptor of their plug-in remains the same, such that
+        rediscovery doesn't accumulate classes. Attributes of a
+        reused class are reset to those of the descriptor, e.g.
+        `active` having been toggled by the client.
+
+        Arguments:
+            plugin (dict): Descriptor of plug-in
+            cache (dict, optional): Classes along with their
+                descriptor, by plug-in id, e.g. of one Proxy.
+
         """
 
-        process = None
-        repair = None
+        digest = json.dumps(plugin, sort_keys=True)
 
-        name = plugin["name"] + "Proxy"
-        cls = type(name, (cls,), plugin)
+        try:
+            cached_digest, proxy = cache[plugin["id"]]
+        except (KeyError, TypeError):
+            pass
+        else:
+            if cached_digest == digest:
+                for key, value in plugin.items():
+                    setattr(proxy, key, value)
+
+                return proxy
 
-        # Emulate function
-        for name in ("process", "repair"):
-            args = ", ".join(plugin["process"]["args"])
-            func = "def {name}({args}): pass".format(name=name,
-                                                     args=args)
-            exec(func)
+        name = str(plugin["name"] + "Proxy")
+        proxy = type(name, (cls,), plugin)
 
-        cls.process = process
-        cls.repair = repair
+        # Emulate functions, with the signature of the originals
+        proxy.process = _stub("process", plugin["process"]["args"])
+        proxy.repair = _stub("repair", plugin["repair"]["args"])
 
-        cls.__orig__ = plugin
+        proxy.__orig__ = plugin
 
-        return cls
+        if cache is not None:
+            cache[plugin["id"]] = (digest, proxy)
+
+        return proxy
 
     @classmethod
     def to_json(cls):
         return cls.__orig__.copy()
+
+
+def _stub(name, args):
+    """Return function `name` taking `args` and doing nothing
+
+    The function is built from the code of :func:`_noop`, with
+    its arguments replaced, such that introspection finds `args`.
+
+    """
+
+    template = _noop.__code__
+    args = tuple(str(arg) for arg in args)
+
+    if hasattr(template, "replace"):
+        # Python 3.8+
+        code = template.replace(co_name=name,
+                                co_argcount=len(args),
+                                co_nlocals=len(args),
+                                co_varnames=args)
+    else:
+        fields = [len(args)]
+
+        if six.PY3:
+            fields.append(template.co_kwonlyargcount)
+
+        fields.extend([len(args),
+                       template.co_stacksize,
+                       template.co_flags,
+                       template.co_code,
+                       template.co_consts,
+                       template.co_names,
+                       args,
+                       template.co_filename,
+                       name,
+                       template.co_firstlineno,
+                       template.co_lnotab])
+
+        code = types.CodeType(*fields)
+
+    return types.FunctionType(code, {}, name)
+
+
+def _noop():
+    pass
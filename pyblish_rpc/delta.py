@@ -0,0 +1,309 @@
+"""Revisioned synchronisation of the context
+
+The service bumps the :class:`Tracker` whenever the context may have
+changed, e.g. after processing, but not upon merely reading it. The
+revision moves on once the context is found to have changed indeed.
+Clients then ask for changes since the revision they last saw and
+receive only what was added, removed or modified in the meantime.
+
+Changes are relative to a selection of fields, see
+:func:`formatting.format_data`, with a history kept per selection.
+
+Attributes:
+    UNTRACKED: Data members of the context carried by its full state,
+        but never sent as a change, as they change on every read.
+
+"""
+
+import json
+import threading
+
+from . import schema, formatting
+
+UNTRACKED = ("connectTime",)
+
+
+class Tracker(object):
+    """Track changes to a context across revisions
+
+    Formatted snapshots of the last few revisions are kept, each
+    sharing the formatted instances which did not change between
+    them. Clients further behind than that receive the full state.
+
+    Snapshots are kept per selection of fields, for the few
+    selections most recently asked for.
+
+    Arguments:
+        history (int, optional): Number of snapshots to keep
+        selections (int, optional): Number of selections to keep
+            snapshots of.
+
+    """
+
+    def __init__(self, history=16, selections=8):
+        self._revision = 0
+        self._stale = False
+        self._histories = dict()
+        self._keys = list()  # Selections, least recently used first
+        self._size = history
+        self._selections = selections
+        self._lock = threading.Lock()
+
+    @property
+    def revision(self):
+        return self._revision
+
+    def bump(self):
+        """Signal that the context may have changed
+
+        The revision is incremented upon the next call to changes(),
+        and only if the context did change.
+
+        """
+
+        with self._lock:
+            self._stale = True
+
+    def reset(self):
+        """Signal that the context was replaced altogether"""
+        with self._lock:
+            self._revision += 1
+            self._stale = False
+            self._histories.clear()
+            del self._keys[:]
+
+    def changes(self, context, since=None, fields=None):
+        """Return changes to `context` since revision `since`
+
+        Arguments:
+            context (Context): Current context
+            since (int, optional): Revision last seen by the client,
+                None means no revision at all.
+            fields (dict, optional): Selection of data and instances,
+                see formatting.format_data()
+
+        Returns:
+            Changes (see schema/changes.json), or the full
+                state (see schema/state.json) if changes from
+                `since` are no longer available.
+
+        """
+
+        formatting.check_fields(fields)
+
+        with self._lock:
+            if self._stale:
+                self._settle(context)
+
+            history = self._history(fields)
+            current = self._snapshot(context, history, fields)
+
+            if since == current["revision"]:
+                result = {"revision": since, "since": since}
+
+            else:
+                previous = next((snapshot for snapshot in history
+                                 if snapshot["revision"] == since), None)
+
+                if previous is None:
+                    result = _state(current)
+                else:
+                    result = _diff(previous, current)
+
+        schema.check(result, "changes" if "since" in result else "state")
+
+        return result
+
+    def _history(self, fields):
+        """Return snapshots of selection `fields`, most recent last"""
+        key = json.dumps(fields, sort_keys=True)
+
+        try:
+            history = self._histories[key]
+        except KeyError:
+            history = self._histories[key] = list()
+
+            if len(self._keys) >= self._selections:
+                self._histories.pop(self._keys.pop(0))
+        else:
+            self._keys.remove(key)
+
+        self._keys.append(key)
+
+        return history
+
+    def _settle(self, context):
+        """Increment the revision if `context` changed since the last
+
+        As seen by each selection snapshots are kept of, those being
+        the only ones changes may be asked for. Their snapshots at the
+        new revision are kept for use by changes().
+
+        """
+
+        self._stale = False
+        revision = self._revision + 1
+        snapshots = list()
+
+        for key, history in self._histories.items():
+            snapshots.append((history, _format_snapshot(
+                context, history[-1], json.loads(key), revision)))
+
+        if snapshots and not any(_changed(history[-1], snapshot)
+                                 for history, snapshot in snapshots):
+            return
+
+        self._revision = revision
+
+        for history, snapshot in snapshots:
+            history.append(snapshot)
+            del history[:-self._size]
+
+    def _snapshot(self, context, history, fields=None):
+        previous = history[-1] if history else None
+
+        if previous and previous["revision"] == self._revision:
+            return previous
+
+        snapshot = _format_snapshot(context, previous, fields,
+                                    self._revision)
+
+        history.append(snapshot)
+        del history[:-self._size]
+
+        return snapshot
+
+
+def _format_snapshot(context, previous, fields, revision):
+    """Return snapshot of selection `fields` of `context` at `revision`
+
+    Instances unchanged since snapshot `previous` are shared with it.
+
+    """
+
+    selected = formatting.select_instances(context, fields)
+
+    instances = dict()
+    for instance in selected:
+        formatted = formatting.format_instance(instance, fields)
+
+        # Share unchanged instances with the previous snapshot,
+        # such that they compare by identity in _diff()
+        if previous is not None:
+            old = previous["instances"].get(instance.id)
+            if old == formatted:
+                formatted = old
+
+        instances[instance.id] = formatted
+
+    return {
+        "revision": revision,
+        "name": context.name,
+        "id": context.id,
+        "data": formatting.format_data(context.data, fields),
+        "order": [instance.id for instance in selected],
+        "instances": instances,
+    }
+
+
+def _state(snapshot):
+    return {
+        "revision": snapshot["revision"],
+        "context": {
+            "name": snapshot["name"],
+            "id": snapshot["id"],
+            "data": snapshot["data"],
+            "children": [snapshot["instances"][id_]
+                         for id_ in snapshot["order"]],
+        }
+    }
+
+
+def _diff(old, new):
+    changes = {
+        "revision": new["revision"],
+        "since": old["revision"],
+    }
+
+    modified = dict()
+    added = list()
+    replaced = False
+
+    data = _diff_data(old["data"], new["data"], UNTRACKED)
+    if data:
+        modified[new["id"]] = data
+
+    for id_ in new["order"]:
+        instance = new["instances"][id_]
+        previous = old["instances"].get(id_)
+
+        if previous is None:
+            added.append(instance)
+
+        elif previous is instance:
+            continue
+
+        elif _replaced(previous, instance):
+            # Sent in full, replacing the instance of the client
+            added.append(instance)
+            replaced = True
+
+        else:
+            data = _diff_data(previous["data"], instance["data"])
+            if data:
+                modified[id_] = data
+
+    removed = [id_ for id_ in old["order"]
+               if id_ not in new["instances"]]
+
+    if modified:
+        changes["context"] = modified
+
+    if added:
+        changes["added"] = added
+
+    if removed:
+        changes["removed"] = removed
+
+    if replaced or old["order"] != new["order"]:
+        changes["order"] = new["order"]
+
+    return changes
+
+
+def _changed(old, new):
+    """Return whether snapshots `old` and `new` differ, for clients"""
+    return any(key not in ("revision", "since")
+               for key in _diff(old, new))
+
+
+def _replaced(old, new):
+    """Return whether members of an instance other than data changed"""
+    return any(old[key] != value
+               for key, value in new.items()
+               if key != "data")
+
+
+def _diff_data(old, new, untracked=()):
+    """Return changes from `old` to `new` data, keyed by data member
+
+    Members in `untracked` are left out.
+
+    """
+
+    changes = dict()
+
+    for key, value in new.items():
+        if key in untracked:
+            continue
+
+        if key not in old:
+            changes[key] = {"new": value}
+        elif old[key] != value:
+            changes[key] = {"new": value, "old": old[key]}
+
+    for key, value in old.items():
+        if key not in new and key not in untracked:
+            changes[key] = {"old": value}
+
+    return changes
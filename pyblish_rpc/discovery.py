@@ -0,0 +1,262 @@
+"""Discovery of plug-ins, reusing modules whose files are unchanged
+
+As :func:`pyblish.api.discover`, except modules are only imported
+anew once the path, time of modification or size of their file has
+changed, see :class:`Cache`. Optionally, a :class:`Watcher` checks
+for changes in the background, invalidating modules as they change.
+
+Modules are cached on their own file alone; should a plug-in depend
+on another module, e.g. a library of its own, changes to that module
+go unnoticed until the plug-in changes too, or :meth:`Cache.clear`.
+Plug-ins of cached modules are nonetheless checked against the hosts
+registered at the time, and discovery filters applied, upon each
+discovery.
+
+"""
+
+import os
+import sys
+import types
+import logging
+import threading
+
+import pyblish.api
+import pyblish.plugin
+
+from .vendor import six
+
+_log = logging.getLogger("pyblish-rpc")
+
+
+class Cache(object):
+    """Plug-ins of each module, by the path of its file
+
+    Attributes:
+        hits (int): Number of modules reused
+        misses (int): Number of modules imported
+
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+        # Fingerprint and module, by path of module
+        self._modules = dict()
+        self._lock = threading.Lock()
+
+    def discover(self, paths=None):
+        """Return available plug-ins, as pyblish.api.discover() does
+
+        Arguments:
+            paths (list, optional): Paths to discover plug-ins from,
+                defaults to every registered path.
+
+        """
+
+        allow_duplicates = getattr(pyblish.plugin, "ALLOW_DUPLICATES", False)
+        plugins = dict()
+        found = set()
+
+        for path in paths or pyblish.api.plugin_paths():
+            path = os.path.normpath(path)
+            if not os.path.isdir(path):
+                continue
+
+            for fname in os.listdir(path):
+                if fname.startswith("_"):
+                    continue
+
+                abspath = os.path.join(path, fname)
+                mod_name, mod_ext = os.path.splitext(fname)
+
+                if mod_ext != ".py" or not os.path.isfile(abspath):
+                    continue
+
+                found.add(abspath)
+
+                module = self._module(abspath, mod_name)
+                if module is None:
+                    continue
+
+                for plugin in pyblish.plugin.plugins_from_module(module):
+                    key = plugin.__name__
+
+                    if allow_duplicates:
+                        key = "%s.%s" % (abspath, key)
+
+                    elif key in plugins:
+                        _log.debug("Duplicate plug-in found: %s", plugin)
+                        continue
+
+                    plugins[key] = plugin
+
+        # Forget modules no longer found
+        with self._lock:
+            for abspath in set(self._modules) - found:
+                self._modules.pop(abspath)
+
+        names = set(plugin.__name__ for plugin in plugins.values())
+
+        for plugin in pyblish.api.registered_plugins():
+            if not allow_duplicates and plugin.__name__ in names:
+                _log.debug("Duplicate plug-in found: %s", plugin)
+                continue
+
+            plugins[plugin.__name__] = plugin
+
+        plugins = list(plugins.values())
+        pyblish.plugin.sort(plugins)  # In-place
+
+        # In-place, as registered via register_discovery_filter()
+        for filter_ in _discovery_filters():
+            filter_(plugins)
+
+        return plugins
+
+    def invalidate(self, path):
+        """Import module at `path` anew, upon next discovery"""
+        with self._lock:
+            self._modules.pop(path, None)
+
+    def clear(self):
+        """Import every module anew, upon next discovery"""
+        with self._lock:
+            self._modules.clear()
+
+    def paths(self):
+        """Return fingerprint of each cached module, by its path"""
+        with self._lock:
+            return dict((path, entry[0])
+                        for path, entry in self._modules.items())
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "modules": len(self._modules),
+        }
+
+    def _module(self, abspath, mod_name):
+        """Return module at `abspath`, imported if need be
+
+        None if the module failed to import.
+
+        """
+
+        fingerprint = _fingerprint(abspath)
+
+        with self._lock:
+            entry = self._modules.get(abspath)
+
+            if entry is not None and entry[0] == fingerprint:
+                self.hits += 1
+                module = entry[1]
+
+                # As though imported
+                if module is not None:
+                    sys.modules[mod_name] = module
+
+                return module
+
+            self.misses += 1
+
+        module = types.ModuleType(mod_name)
+        module.__file__ = abspath
+
+        try:
+            with open(abspath) as f:
+                six.exec_(f.read(), module.__dict__)
+
+            # Store reference to original module, to avoid
+            # garbage collection from collecting it's global
+            # imports, such as `import os`.
+            sys.modules[mod_name] = module
+
+        except Exception as err:
+            _log.debug("Skipped: \"%s\" (%s)", mod_name, err)
+
+            # Remembered as broken, until changed
+            module = None
+
+        with self._lock:
+            self._modules[abspath] = (fingerprint, module)
+
+        return module
+
+
+class Watcher(object):
+    """Invalidate modules of `cache` as their files change
+
+    Files are checked from a thread of their own, every `interval`
+    seconds, rather than upon discovery.
+
+    Arguments:
+        cache (Cache): Cache whose modules to watch
+        interval (float, optional): Seconds between checks
+        on_change (callable, optional): Called with the paths of
+            modules changed or removed, from the thread of the watcher.
+
+    """
+
+    def __init__(self, cache, interval=1.0, on_change=None):
+        self.cache = cache
+        self.interval = interval
+        self.on_change = on_change
+
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run,
+                                        name="DiscoveryWatcher")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+        if self._thread is not None:
+            self._thread.join()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            self.check()
+
+    def check(self):
+        """Invalidate modules changed since cached, and return their paths"""
+        changed = list()
+
+        for path, fingerprint in self.cache.paths().items():
+            if _fingerprint(path) != fingerprint:
+                self.cache.invalidate(path)
+                changed.append(path)
+
+        if changed and self.on_change is not None:
+            try:
+                self.on_change(changed)
+            except Exception:
+                _log.exception("Failed to handle change of %s", changed)
+
+        return changed
+
+
+def _discovery_filters():
+    """Return registered discovery filters, of pyblish 1.8 and above"""
+    filters = getattr(pyblish.plugin, "registered_discovery_filters", None)
+    return filters() if filters is not None else []
+
+
+def _fingerprint(path):
+    """Return time of modification and size of file at `path`
+
+    None if the file no longer exists.
+
+    """
+
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    return getattr(stat, "st_mtime_ns", stat.st_mtime), stat.st_size
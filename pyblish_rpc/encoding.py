@@ -0,0 +1,135 @@
+"""Compact encodings of requests and responses
+
+XML-RPC is verbose and slow to parse. Alongside it, the server
+accepts JSON-RPC 2.0 messages encoded either as JSON, or msgpack
+if it is available, distinguished by their Content-Type.
+
+Attributes:
+    JSON: Content-Type of JSON encoded messages
+    MSGPACK: Content-Type of msgpack encoded messages
+    content_types: Content-Types available in this environment,
+        most compact first.
+
+Any of them may additionally be compressed with gzip, as negotiated
+via the Accept-Encoding and Content-Encoding headers of HTTP.
+
+"""
+
+import json
+import zlib
+import codecs
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON = "application/json"
+MSGPACK = "application/x-msgpack"
+
+content_types = ((MSGPACK, JSON) if msgpack is not None else (JSON,))
+
+
+def dumps(message, content_type):
+    """Serialise `message` as `content_type`"""
+    if content_type == MSGPACK:
+        return msgpack.packb(message, default=_default, use_bin_type=True)
+
+    return json.dumps(message,
+                      default=_default,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def loads(data, content_type):
+    """Deserialise `data` of `content_type`
+
+    Arguments:
+        data (bytes): Message, or any buffer, such as a memory map,
+            decoded where it lies rather than copied first.
+
+    """
+
+    if content_type == MSGPACK:
+        return msgpack.unpackb(data, raw=False)
+
+    return json.loads(codecs.utf_8_decode(data, "strict", True)[0])
+
+
+def compress(data, level=6):
+    """Return `data` compressed as gzip"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def decompress(data):
+    """Return gzip compressed `data`, decompressed"""
+    return zlib.decompress(data, 16 + zlib.MAX_WBITS)
+
+
+def accepts_gzip(accept_encoding):
+    """Return whether an Accept-Encoding header permits gzip
+
+    Example:
+        >>> accepts_gzip("gzip, deflate")
+        True
+        >>> accepts_gzip("gzip;q=0, identity")
+        False
+        >>> accepts_gzip("*")
+        True
+        >>> accepts_gzip("")
+        False
+
+    """
+
+    accepted = dict()
+    for coding in (accept_encoding or "").split(","):
+        coding, _, params = coding.partition(";")
+        quality = 1.0
+
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+
+        accepted[coding.strip().lower()] = quality
+
+    return accepted.get("gzip", accepted.get("*", 0.0)) > 0
+
+
+def request(method, params, id=None):
+    return {
+        "jsonrpc": "2.0",
+        "method": method,
+        "params": params,
+        "id": id
+    }
+
+
+def response(result, id=None):
+    return {
+        "jsonrpc": "2.0",
+        "result": result,
+        "id": id
+    }
+
+
+def error(code, message, id=None):
+    return {
+        "jsonrpc": "2.0",
+        "error": {
+            "code": code,
+            "message": message
+        },
+        "id": id
+    }
+
+
+def _default(obj):
+    """Serialise objects as XML-RPC would; by their attributes"""
+    if hasattr(obj, "__dict__"):
+        return vars(obj)
+
+    return str(obj)
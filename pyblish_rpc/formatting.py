@@ -5,12 +5,68 @@ import inspect
 import traceback
 
 from . import schema
+from .vendor import six
 
 import pyblish.lib
 import pyblish.plugin
 
 log = logging.getLogger("pyblish")
 
+# Descriptors of plug-ins, by plug-in class
+_plugin_cache = dict()
+
+# Data members accessible from the client, unless selected otherwise
+DATA_KEYS = (
+
+    # Essential data from each instance
+    "name",
+    "label",
+    "family",
+    "families",
+    "publish",
+
+    # Provided by service.py
+    "host",
+    "port",
+    "user",
+    "connectTime",
+    "pyblishServerVersion",
+    "pyblishRPCVersion",
+    "pythonVersion"
+)
+
+# Members of a selection of fields, see format_data()
+FIELDS = ("keys", "maxSize", "idsOnly", "instances")
+
+# Members of records at each level of detail, see format_record()
+RECORD_DETAIL = {
+    "minimal": (
+        "name",
+        "levelno",
+        "levelname",
+    ),
+    "standard": (
+        "name",
+        "levelno",
+        "levelname",
+        "created",
+        "msecs",
+        "module",
+        "filename",
+        "funcName",
+        "lineno",
+        "threadName",
+    ),
+
+    # Every member
+    "full": None,
+}
+
+
+def clear_cache():
+    """Forget previously formatted plug-ins, e.g. upon rediscovery"""
+    _plugin_cache.clear()
+
 
 def extract_traceback(exception):
     try:
@@ -24,8 +80,16 @@ def extract_traceback(exception):
         del(exc_type, exc_value, exc_traceback)
 
 
-def format_result(result):
-    """Serialise Result"""
+def format_result(result, detail="full", level=0):
+    """Serialise Result
+
+    Arguments:
+        result (dict): Result, as produced by pyblish.plugin.process()
+        detail (str, optional): Detail of records, see format_record()
+        level (int, optional): Exclude records below this level
+
+    """
+
     instance = None
     error = None
 
@@ -40,27 +104,52 @@ def format_result(result):
         "plugin": format_plugin(result["plugin"]),
         "instance": instance,
         "error": error,
-        "records": format_records(result["records"]),
+        "records": format_records(result["records"], detail, level),
         "duration": result["duration"]
     }
 
-    if os.getenv("PYBLISH_SAFE"):
-        schema.validate(result, "result")
+    schema.check(result, "result")
 
     return result
 
 
-def format_records(records):
-    """Serialise multiple records"""
+def format_records(records, detail="full", level=0):
+    """Serialise multiple records
+
+    Arguments:
+        records (list): LogRecord instances
+        detail (str, optional): Detail of records, see format_record()
+        level (int, optional): Exclude records below this level
+
+    """
+
+    check_detail(detail)
+
     formatted = list()
     for record_ in records:
-        formatted.append(format_record(record_))
+        if record_.levelno >= level:
+            formatted.append(format_record(record_, detail))
     return formatted
 
 
-def format_record(record):
+def check_detail(detail):
+    """Raise ValueError if `detail` is not a level of detail of records"""
+    if detail not in RECORD_DETAIL:
+        raise ValueError("Unknown detail \"%s\", use one of %s"
+                         % (detail, ", ".join(sorted(RECORD_DETAIL))))
+
+
+def format_record(record, detail="full"):
     """Serialise LogRecord instance
 
+    The record itself is left untouched. Its message is available
+    as "message" at every level of detail, along with the members of
+    that level, see RECORD_DETAIL.
+
+    Arguments:
+        record (LogRecord): Record to serialise
+        detail (str, optional): "minimal", "standard" or "full"
+
     Data:
         threadName
         name
@@ -84,15 +173,22 @@ def format_record(record):
 
     """
 
-    record = record.__dict__
+    members = record.__dict__
+    keys = RECORD_DETAIL[detail]
+
+    if keys is None:
+        formatted = dict(members)
+        formatted.pop("msg", None)
+    else:
+        formatted = dict((key, members[key])
+                         for key in keys if key in members)
 
     # Humanise output and conform to Exceptions
-    record["message"] = str(record.pop("msg"))
+    formatted["message"] = str(record.msg)
 
-    if os.getenv("PYBLISH_SAFE"):
-        schema.validate(record, "record")
+    schema.check(formatted, "record")
 
-    return record
+    return formatted
 
 
 def format_error(error):
@@ -111,42 +207,83 @@ def format_error(error):
     return formatted
 
 
-def format_data(data):
+def check_fields(fields):
+    """Raise ValueError if `fields` is not a valid selection
+
+    Example:
+        >>> check_fields({"keys": ["family"], "maxSize": 10})
+        >>> check_fields({"key": ["family"]})
+        Traceback (most recent call last):
+        ...
+        ValueError: Unknown field selector "key"
+
+    """
+
+    for key in fields or {}:
+        if key not in FIELDS:
+            raise ValueError("Unknown field selector \"%s\"" % key)
+
+
+def format_data(data, fields=None):
     """Serialise instance/context data
 
+    Which data is serialised may be selected with `fields`, a
+    dictionary of any of the following.
+
+    - keys (list): Data members to include, defaults to DATA_KEYS
+    - maxSize (int): Strings, lists and dictionaries longer than
+        this are truncated, with the original length of each listed
+        under the "__truncated__" member.
+    - idsOnly (bool): Include no data at all, only the name and id
+        of the context and each instance.
+    - instances (list): Ids of instances to include, defaults to all,
+        see :func:`format_context`.
+
     Arguments:
         data (dict): Data to serialise
+        fields (dict, optional): Selection of data
 
     Returns:
         data (dict): Serialised data
 
     """
 
-    # These are the only data members
-    # accessible from the client
-    return dict((key, data[key]) for key in (
+    fields = fields or {}
 
-        # Essential data from each instance
-        "name",
-        "label",
-        "family",
-        "families",
-        "publish",
+    if fields.get("idsOnly"):
+        return dict()
+
+    keys = fields.get("keys")
+    if keys is None:
+        keys = DATA_KEYS
 
-        # Provided by service.py
-        "host",
-        "port",
-        "user",
-        "connectTime",
-        "pyblishServerVersion",
-        "pyblishRPCVersion",
-        "pythonVersion"
+    formatted = dict((key, data[key]) for key in keys if key in data)
 
-        ) if key in data
-    )
+    max_size = fields.get("maxSize")
+    if max_size is not None:
+        truncated = dict()
+
+        for key, value in formatted.items():
+            if (isinstance(value, (six.string_types, list, tuple, dict))
+                    and len(value) > max_size):
+                formatted[key] = _truncate(value, max_size)
+                truncated[key] = len(value)
+
+        if truncated:
+            formatted["__truncated__"] = truncated
+
+    return formatted
 
 
-def format_instance(instance):
+def _truncate(value, size):
+    """Return the first `size` characters, items or members of `value`"""
+    if isinstance(value, dict):
+        return dict((key, value[key]) for key in sorted(value)[:size])
+
+    return value[:size]
+
+
+def format_instance(instance, fields=None):
     """Serialise `instance`
 
     For children to be visualised and modified,
@@ -163,6 +300,10 @@ def format_instance(instance):
         data (dict, optional): Associated data
         publish (bool): Whether or not instance should be published
 
+    Arguments:
+        instance (Instance): Instance to serialise
+        fields (dict, optional): Selection of data, see format_data()
+
     Returns:
         Dictionary of JSON-compatible instance
 
@@ -171,25 +312,47 @@ def format_instance(instance):
     instance = {
         "name": instance.name,
         "id": instance.id,
-        "data": format_data(instance.data),
+        "data": format_data(instance.data, fields),
         "children": list(),
     }
 
-    if os.getenv("PYBLISH_SAFE"):
-        schema.validate(instance, "instance")
+    schema.check(instance, "instance")
 
     return instance
 
 
-def format_context(context):
+def format_context(context, fields=None):
+    """Serialise `context` along with its instances
+
+    Arguments:
+        context (Context): Context to serialise
+        fields (dict, optional): Selection of data and instances,
+            see format_data()
+
+    """
+
+    check_fields(fields)
+
     return {
         "name": context.name,
         "id": context.id,
-        "data": format_data(context.data),
-        "children": list(format_instance(i) for i in context)
+        "data": format_data(context.data, fields),
+        "children": list(format_instance(i, fields)
+                         for i in select_instances(context, fields))
     }
 
 
+def select_instances(context, fields=None):
+    """Return instances of `context` selected by `fields`"""
+    ids = (fields or {}).get("instances")
+
+    if ids is None:
+        return list(context)
+
+    ids = set(ids)
+    return [instance for instance in context if instance.id in ids]
+
+
 def format_plugins(plugins):
     """Serialise multiple plug-in
 
@@ -209,6 +372,10 @@ def format_plugins(plugins):
 def format_plugin(plugin):
     """Serialise `plugin`
 
+    Descriptors are computed once per plug-in class and cached
+    until :func:`clear_cache`, except for `active` which is kept
+    up to date. The returned dictionary must not be modified.
+
     Attributes:
         name: Name of Python class
         id: Unique identifier
@@ -227,6 +394,18 @@ def format_plugin(plugin):
 
     """
 
+    try:
+        output = _plugin_cache[plugin]
+    except KeyError:
+        output = _plugin_cache[plugin] = _format_plugin(plugin)
+
+    if output["active"] != plugin.active:
+        output = _plugin_cache[plugin] = dict(output, active=plugin.active)
+
+    return output
+
+
+def _format_plugin(plugin):
     type = "Other"
 
     for order, _type in {pyblish.plugin.CollectorOrder: "Collector",
@@ -249,8 +428,8 @@ def format_plugin(plugin):
 
     has_repair = False
 
-    args = inspect.getargspec(plugin.repair).args
-    if "context" in args or "instance" in args:
+    repair_args = inspect.getargspec(plugin.repair).args
+    if "context" in repair_args or "instance" in repair_args:
         has_repair = True
 
     # Legacy abilities
@@ -287,14 +466,13 @@ def format_plugin(plugin):
             "args": inspect.getargspec(plugin.process).args,
         },
         "repair": {
-            "args": inspect.getargspec(plugin.repair).args,
+            "args": repair_args,
         },
 
         "actions": [format_action(a) for a in plugin.actions],
     }
 
-    if os.getenv("PYBLISH_SAFE"):
-        schema.validate(output, "plugin")
+    schema.check(output, "plugin")
 
     return output
 
@@ -0,0 +1,290 @@
+"""Thread-safe counters and latency histograms per method
+
+Each call is recorded along with the time it spent queued, waiting
+on the dispatch wrapper, e.g. for the main thread of a host, and
+executing. Compression of responses is recorded as well, see
+:meth:`Metrics.compressed`, as are responses sent via the side channel,
+see :meth:`Metrics.side_channel`. Metrics are served both as a
+dictionary, via stats(), and as plain text in the Prometheus
+exposition format.
+
+"""
+
+import re
+import threading
+
+# Upper bounds of histogram buckets, in seconds
+BOUNDS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+          0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Phases of a call, by their name in stats() and text()
+PHASES = (
+    ("queueWait", "queue_wait"),
+    ("wrapperWait", "wrapper_wait"),
+    ("execution", "execution"),
+)
+
+
+class Histogram(object):
+    """Distribution of values across fixed buckets
+
+    Not thread-safe on its own; guarded by :class:`Metrics`.
+
+    Arguments:
+        bounds (tuple, optional): Upper bound of each bucket,
+            values beyond the last are counted separately.
+
+    """
+
+    def __init__(self, bounds=BOUNDS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        index = 0
+        for bound in self.bounds:
+            if value <= bound:
+                break
+            index += 1
+
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def percentile(self, percent):
+        """Return upper bound of bucket holding `percent` of values"""
+        if not self.count:
+            return 0.0
+
+        threshold = self.count * percent / 100.0
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            if cumulative >= threshold:
+                return min(bound, self.max)
+
+        return self.max
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / (self.count or 1),
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "bounds": list(self.bounds),
+            "counts": list(self.counts),
+        }
+
+
+class Method(object):
+    """Metrics of a single method"""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.received = 0
+        self.sent = 0
+        self.phases = dict((name, Histogram()) for name, _ in PHASES)
+
+
+class Metrics(object):
+    """Metrics of calls, by method
+
+    Arguments:
+        max_methods (int, optional): Maximum number of methods kept
+            apart, calls to any further methods are recorded together
+            as "other". Method names are chosen by clients.
+
+    """
+
+    def __init__(self, max_methods=128):
+        self.max_methods = max_methods
+        self._methods = dict()
+        self._compression = {
+            "count": 0,
+            "bytesIn": 0,
+            "bytesOut": 0,
+            "seconds": 0.0,
+        }
+        self._side_channel = {
+            "count": 0,
+            "bytes": 0,
+        }
+        self._lock = threading.Lock()
+
+    def record(self, method, error=False, **durations):
+        """Record a call to `method`
+
+        Arguments:
+            method (str): Name of method called
+            error (bool, optional): Whether the call failed
+            **durations: Seconds spent per phase, see PHASES
+
+        """
+
+        with self._lock:
+            metrics = self._method(method)
+            metrics.count += 1
+            metrics.errors += bool(error)
+
+            for name, duration in durations.items():
+                if duration is not None:
+                    metrics.phases[name].observe(duration)
+
+    def transferred(self, method, received, sent):
+        """Record bytes `received` and `sent` on behalf of `method`"""
+        with self._lock:
+            metrics = self._method(method)
+            metrics.received += received
+            metrics.sent += sent
+
+    def compressed(self, before, after, seconds):
+        """Record a response compressed from `before` to `after` bytes
+
+        Arguments:
+            before (int): Bytes of response
+            after (int): Bytes of response, once compressed
+            seconds (float): Processor time spent compressing
+
+        """
+
+        with self._lock:
+            self._compression["count"] += 1
+            self._compression["bytesIn"] += before
+            self._compression["bytesOut"] += after
+            self._compression["seconds"] += seconds
+
+    def side_channel(self, size):
+        """Record a response of `size` bytes sent via the side channel
+
+        See :mod:`sidechannel`.
+
+        """
+
+        with self._lock:
+            self._side_channel["count"] += 1
+            self._side_channel["bytes"] += size
+
+    def stats(self):
+        """Return totals along with the metrics of each method"""
+        with self._lock:
+            compression = dict(self._compression)
+            side_channel = dict(self._side_channel)
+            methods = dict(
+                (name, {
+                    "count": metrics.count,
+                    "errors": metrics.errors,
+                    "bytesReceived": metrics.received,
+                    "bytesSent": metrics.sent,
+                    "queueWait": metrics.phases["queueWait"].snapshot(),
+                    "wrapperWait": metrics.phases["wrapperWait"].snapshot(),
+                    "execution": metrics.phases["execution"].snapshot(),
+                })
+                for name, metrics in self._methods.items()
+            )
+
+        return {
+            "totalRequestCount": sum(m["count"] for m in methods.values()),
+            "errorCount": sum(m["errors"] for m in methods.values()),
+            "bytesReceived": sum(m["bytesReceived"]
+                                 for m in methods.values()),
+            "bytesSent": sum(m["bytesSent"] for m in methods.values()),
+            "compression": dict(compression, ratio=(
+                float(compression["bytesOut"]) / compression["bytesIn"]
+                if compression["bytesIn"] else 1.0)),
+            "sideChannel": side_channel,
+            "methods": methods,
+        }
+
+    def text(self, gauges=None):
+        """Return metrics in the Prometheus text exposition format
+
+        Arguments:
+            gauges (dict, optional): Additional numerical values,
+                by name, e.g. the depth of the queue.
+
+        """
+
+        stats = self.stats()
+        compression = stats["compression"]
+        side_channel = stats["sideChannel"]
+        stats = stats["methods"]
+        lines = list()
+
+        def counter(name, key, help):
+            lines.append("# HELP pyblish_rpc_%s %s" % (name, help))
+            lines.append("# TYPE pyblish_rpc_%s counter" % name)
+            for method, metrics in sorted(stats.items()):
+                lines.append('pyblish_rpc_%s{method="%s"} %d'
+                             % (name, _escape(method), metrics[key]))
+
+        counter("requests_total", "count", "Calls, by method")
+        counter("errors_total", "errors", "Failed calls, by method")
+        counter("received_bytes_total", "bytesReceived",
+                "Bytes of requests, by method")
+        counter("sent_bytes_total", "bytesSent",
+                "Bytes of responses, by method")
+
+        for key, name in PHASES:
+            name = "%s_seconds" % name
+            lines.append("# TYPE pyblish_rpc_%s histogram" % name)
+
+            for method, metrics in sorted(stats.items()):
+                method = _escape(method)
+                histogram = metrics[key]
+                cumulative = 0
+
+                for bound, count in zip(histogram["bounds"] + ["+Inf"],
+                                        histogram["counts"]):
+                    cumulative += count
+                    lines.append(
+                        'pyblish_rpc_%s_bucket{method="%s",le="%s"} %d'
+                        % (name, method, bound, cumulative))
+
+                lines.append('pyblish_rpc_%s_sum{method="%s"} %r'
+                             % (name, method, histogram["sum"]))
+                lines.append('pyblish_rpc_%s_count{method="%s"} %d'
+                             % (name, method, histogram["count"]))
+
+        for totals, key, name, help in (
+                (compression, "count", "compressed_total",
+                 "Compressed responses"),
+                (compression, "bytesIn", "compression_input_bytes_total",
+                 "Bytes of responses, prior to compression"),
+                (compression, "bytesOut", "compression_output_bytes_total",
+                 "Bytes of responses, once compressed"),
+                (compression, "seconds", "compression_seconds_total",
+                 "Processor time spent compressing"),
+                (side_channel, "count", "side_channel_total",
+                 "Responses sent via the side channel"),
+                (side_channel, "bytes", "side_channel_bytes_total",
+                 "Bytes of responses sent via the side channel")):
+            lines.append("# HELP pyblish_rpc_%s %s" % (name, help))
+            lines.append("# TYPE pyblish_rpc_%s counter" % name)
+            lines.append("pyblish_rpc_%s %r" % (name, totals[key]))
+
+        for name, value in sorted((gauges or {}).items()):
+            name = re.sub("([a-z])([A-Z])", r"\1_\2", name).lower()
+            lines.append("# TYPE pyblish_rpc_%s gauge" % name)
+            lines.append("pyblish_rpc_%s %r" % (name, value))
+
+        return "\n".join(lines) + "\n"
+
+    def _method(self, name):
+        try:
+            return self._methods[name]
+        except KeyError:
+            if len(self._methods) >= self.max_methods:
+                name = "other"
+
+            return self._methods.setdefault(name, Method())
+
+
+def _escape(label):
+    return label.replace("\\", "\\\\").replace('"', '\\"')
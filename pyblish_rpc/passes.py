@@ -0,0 +1,144 @@
+"""Publishing passes run on the host
+
+Rather than the client stepping through each (plug-in, instance)
+pair with one request each, a pass runs the whole of its plug-ins
+in a thread of its own whilst the client collects results as they
+become available.
+
+"""
+
+import uuid
+import threading
+import traceback
+
+import pyblish.logic
+
+
+class Pass(object):
+    """An ordered run of plug-ins over the context
+
+    Each step is handed to `step`, which processes the pair and
+    returns the formatted result. Results are kept in order of
+    completion and fetched incrementally via :meth:`poll`.
+
+    Arguments:
+        plugins (list): Plug-ins to process, in order
+        context (Context): Context to process
+        step (callable): Called with (plugin, instance) for each
+            pair to process, returning its formatted result.
+        toggles (bool, optional): Whether to skip inactive plug-ins,
+            as opposed to process every plug-in given. Instances
+            whose "publish" is False are skipped regardless.
+        on_finish (callable, optional): Called without arguments
+            once the pass has finished, or was stopped, from the
+            thread of the pass.
+
+    """
+
+    def __init__(self, plugins, context, step, toggles=True,
+                 on_finish=None):
+        self.id = str(uuid.uuid4())
+        self.finished = False
+        self.stopped = None
+        self.error = None
+
+        self._plugins = plugins
+        self._context = context
+        self._step = step
+        self._toggles = toggles
+        self._on_finish = on_finish
+        self._results = list()
+        self._stop = False
+        self._condition = threading.Condition()
+
+    def start(self):
+        thread = threading.Thread(target=self.run)
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def stop(self):
+        """Stop once the current step has finished"""
+        self._stop = True
+
+    def run(self):
+        test = pyblish.logic.registered_test()
+        state = {
+            "nextOrder": None,
+            "ordersWithError": set()
+        }
+
+        try:
+            for plugin in self._plugins:
+                if self._toggles and not plugin.active:
+                    continue
+
+                state["nextOrder"] = plugin.order
+
+                message = test(**state)
+                if message:
+                    self.stopped = "Stopped due to %s" % message
+                    break
+
+                if plugin.__instanceEnabled__:
+                    instances = pyblish.logic.instances_by_plugin(
+                        self._context, plugin)
+                    instances = [i for i in instances
+                                 if i.data.get("publish") is not False]
+                else:
+                    instances = [None]
+
+                for instance in instances:
+                    if self._stop:
+                        break
+
+                    result = self._step(plugin, instance)
+
+                    if result["error"] is not None:
+                        state["ordersWithError"].add(plugin.order)
+
+                    with self._condition:
+                        self._results.append(result)
+                        self._condition.notify_all()
+
+                if self._stop:
+                    self.stopped = "Stopped by client"
+                    break
+
+        except Exception as e:
+            traceback.print_exc()
+            self.error = str(e)
+
+        if self._on_finish is not None:
+            try:
+                self._on_finish()
+            except Exception:
+                traceback.print_exc()
+
+        with self._condition:
+            self.finished = True
+            self._condition.notify_all()
+
+    def poll(self, cursor=0, timeout=0):
+        """Return results from `cursor` onwards
+
+        Arguments:
+            cursor (int, optional): Number of results already fetched
+            timeout (float, optional): Seconds to wait for results
+                if none are available yet, 0 returns immediately.
+
+        """
+
+        with self._condition:
+            if (timeout and not self.finished
+                    and cursor >= len(self._results)):
+                self._condition.wait(timeout)
+
+            return {
+                "id": self.id,
+                "results": self._results[cursor:],
+                "cursor": len(self._results),
+                "finished": self.finished,
+                "stopped": self.stopped,
+                "error": self.error,
+            }
@@ -0,0 +1,414 @@
+"""Bounded, prioritised pool of worker threads
+
+Work is queued by priority, lowest first, and first come first
+served within a priority. Once the queue is full, further work is
+refused with :class:`Busy` rather than queued indefinitely. Some
+workers may be reserved for work of the highest priority.
+
+Work which must be carried out elsewhere, such as on the main thread
+of a host, is handed over in batches by a :class:`Coalescer`.
+
+"""
+
+import sys
+import time
+import heapq
+import threading
+import itertools
+
+from .vendor import six
+
+
+class Busy(Exception):
+    """The queue is full
+
+    Attributes:
+        retry (float): Suggested number of seconds to wait
+            before trying again.
+
+    """
+
+    def __init__(self, retry):
+        super(Busy, self).__init__("Queue is full, retry in %.2f seconds"
+                                   % retry)
+        self.retry = retry
+
+
+class Cancelled(Exception):
+    """The work was cancelled before it started"""
+
+
+class Future(object):
+    """The eventual result of work submitted to a pool"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = list()
+        self._started = False
+        self._cancelled = False
+        self._result = None
+        self._exc_info = None
+
+    def cancel(self):
+        """Cancel work which has not yet started
+
+        Returns:
+            True if cancelled, False if already started
+
+        """
+
+        with self._lock:
+            if self._started:
+                return False
+            self._cancelled = True
+
+        self._finish()
+        return True
+
+    def cancelled(self):
+        return self._cancelled
+
+    def done(self):
+        return self._event.is_set()
+
+    def result(self, timeout=None):
+        """Wait for and return result, re-raising any exception
+
+        Raises:
+            Cancelled if the work was cancelled
+            RuntimeError if not done within `timeout` seconds
+
+        """
+
+        if not self._event.wait(timeout) and not self._event.is_set():
+            raise RuntimeError("Timed out after %s seconds" % timeout)
+
+        if self._cancelled:
+            raise Cancelled()
+
+        if self._exc_info is not None:
+            six.reraise(*self._exc_info)
+
+        return self._result
+
+    def add_done_callback(self, callback):
+        """Call `callback` with this future once done"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+
+        callback(self)
+
+    def __await__(self):
+        """Await result from an asyncio coroutine
+
+        Cancelling the awaiting task cancels this future, if pending.
+
+        """
+
+        import asyncio
+
+        loop = asyncio.get_event_loop()
+        waiter = loop.create_future()
+
+        def transfer(future):
+            if waiter.cancelled():
+                return
+            if future.cancelled():
+                waiter.set_exception(Cancelled())
+            elif future._exc_info is not None:
+                waiter.set_exception(future._exc_info[1])
+            else:
+                waiter.set_result(future._result)
+
+        def cancel(waiter):
+            if waiter.cancelled():
+                self.cancel()
+
+        waiter.add_done_callback(cancel)
+        self.add_done_callback(
+            lambda future: loop.call_soon_threadsafe(transfer, future))
+
+        return waiter.__await__()
+
+    def set_running(self):
+        """Mark as started, returns False if already cancelled"""
+        with self._lock:
+            if self._cancelled:
+                return False
+            self._started = True
+            return True
+
+    def set_result(self, result):
+        self._result = result
+        self._finish()
+
+    def set_exception(self, exc_info):
+        self._exc_info = exc_info
+        self._finish()
+
+    def _finish(self):
+        with self._lock:
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, list()
+
+        for callback in callbacks:
+            callback(self)
+
+
+class WorkerPool(object):
+    """Fixed number of threads working off a bounded priority queue
+
+    Work of priority 0, such as interactive calls, may additionally
+    be carried out by `reserved` workers which other work never
+    occupies, such that it is never stuck behind long-running work.
+
+    Arguments:
+        workers (int, optional): Number of worker threads
+        queue_size (int, optional): Maximum number of queued items
+            of work, further work is refused with :class:`Busy`.
+            0 means no limit.
+        name (str, optional): Name of worker threads
+        reserved (int, optional): Number of workers kept for work
+            of priority 0, fewer than `workers`.
+
+    """
+
+    def __init__(self, workers=8, queue_size=64, name="WorkerPool",
+                 reserved=0):
+        if not 0 <= reserved < workers:
+            raise ValueError("Reserved workers must be fewer than %d"
+                             % workers)
+
+        self._queue = list()  # Heap of (priority, sequence, item)
+        self._queue_size = queue_size
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._shutdown = False
+
+        # Number of workers which may carry out work of priority above 0
+        self._unreserved = workers - reserved
+        self._running_unreserved = 0
+
+        self._running = 0
+        self._rejected = 0
+        self._started = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+        self._threads = list()
+        for index in range(workers):
+            thread = threading.Thread(target=self._work,
+                                      name="%s-%d" % (name, index))
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, priority, func, *args, **kwargs):
+        """Queue `func` to be called with `args` and `kwargs`
+
+        Arguments:
+            priority (int): Lower is sooner
+
+        Returns:
+            Future of result
+
+        Raises:
+            Busy if the queue is full
+
+        """
+
+        future = Future()
+        item = (priority, next(self._sequence),
+                (future, time.time(), func, args, kwargs))
+
+        with self._condition:
+            if self._queue_size and len(self._queue) >= self._queue_size:
+                self._rejected += 1
+                raise Busy(max(0.1, self._wait_total / (self._started or 1)))
+
+            heapq.heappush(self._queue, item)
+            self._condition.notify_all()
+
+        return future
+
+    def shutdown(self, wait=False):
+        """Stop workers once they have finished their current work
+
+        Arguments:
+            wait (bool, optional): Block until workers have stopped,
+                such that none outlives the host.
+
+        """
+
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+
+        if wait:
+            for thread in self._threads:
+                if thread is not threading.current_thread():
+                    thread.join()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queueDepth": len(self._queue),
+                "workers": len(self._threads),
+                "busyWorkers": self._running,
+                "rejectedCount": self._rejected,
+                "queueWaitMean": self._wait_total / (self._started or 1),
+                "queueWaitMax": self._wait_max,
+            }
+
+    def _next(self):
+        """Return next item of work this worker may carry out, if any"""
+        if not self._queue:
+            return None
+
+        priority = self._queue[0][0]
+
+        if priority > 0 and self._running_unreserved >= self._unreserved:
+            return None
+
+        return heapq.heappop(self._queue)
+
+    def _work(self):
+        while True:
+            with self._condition:
+                entry = self._next()
+
+                while entry is None and not self._shutdown:
+                    self._condition.wait()
+                    entry = self._next()
+
+                if entry is None:
+                    break
+
+                priority, _, item = entry
+                future, queued, func, args, kwargs = item
+
+                if not future.set_running():
+                    continue
+
+                wait = time.time() - queued
+                unreserved = priority > 0
+
+                self._running += 1
+                self._running_unreserved += unreserved
+                self._started += 1
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+
+            try:
+                future.set_result(func(*args, **kwargs))
+            except Exception:
+                future.set_exception(sys.exc_info())
+
+            with self._condition:
+                self._running -= 1
+                self._running_unreserved -= unreserved
+                self._condition.notify_all()
+
+
+class Coalescer(object):
+    """Hand calls over to a wrapper, several at a time
+
+    Calls made whilst the wrapper is busy with previous calls are
+    queued, and handed over together the next time around. With a
+    wrapper hopping onto the main thread of a host, many concurrent
+    calls then cost a few hops rather than one each.
+
+    The thread making a call waits for it to finish, carrying out
+    the hop itself unless another thread already is.
+
+    Attributes:
+        hops (int): Number of times the wrapper was called
+        calls (int): Number of calls handed over
+
+    """
+
+    def __init__(self):
+        self.hops = 0
+        self.calls = 0
+
+        self._pending = list()
+        self._hopping = False
+        self._condition = threading.Condition()
+
+    def call(self, wrapper, func, *args):
+        """Return `func` called with `args`, from within `wrapper`
+
+        Arguments:
+            wrapper (callable): Called with a function and arguments,
+                see pyblish_rpc.register_dispatch_wrapper()
+            func (callable): Function to call
+
+        """
+
+        future = Future()
+
+        with self._condition:
+            self._pending.append((future, func, args))
+
+            while not future.done():
+                if self._hopping:
+                    self._condition.wait()
+                    continue
+
+                batch, self._pending = self._pending, list()
+                self._hopping = True
+                self.hops += 1
+                self.calls += len(batch)
+
+                self._condition.release()
+
+                try:
+                    wrapper(_call_all, batch)
+
+                except Exception:
+                    # The wrapper itself failed
+                    exc_info = sys.exc_info()
+                    for pending, _, _ in batch:
+                        if not pending.done():
+                            pending.set_exception(exc_info)
+
+                finally:
+                    self._condition.acquire()
+                    self._hopping = False
+                    self._condition.notify_all()
+
+        return future.result()
+
+    def call_alone(self, wrapper, func, *args):
+        """Return `func` called with `args`, from within `wrapper`
+
+        Handed over straight away, in a hop of its own, rather than
+        waiting for calls already handed over to finish.
+
+        """
+
+        with self._condition:
+            self.hops += 1
+            self.calls += 1
+
+        return wrapper(func, *args)
+
+    def stats(self):
+        with self._condition:
+            return {
+                "mainThreadHops": self.hops,
+                "mainThreadCalls": self.calls,
+            }
+
+
+def _call_all(batch):
+    """Call each of `batch`, from within the wrapper of a Coalescer"""
+    for future, func, args in batch:
+        try:
+            future.set_result(func(*args))
+        except Exception:
+            future.set_exception(sys.exc_info())
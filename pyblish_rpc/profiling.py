@@ -0,0 +1,263 @@
+"""Profiling of dispatched calls, on demand
+
+Two kinds of profiler are available.
+
+- "cprofile" profiles each selected call deterministically, merging
+    them into a single pstats file. Calls already running when
+    profiling starts are not included.
+- "sample" periodically samples the stack of every thread running a
+    selected call, including those already running, and writes them
+    as collapsed stacks suitable for flame graphs.
+
+Neither costs anything whilst not started, see :meth:`RpcService._dispatch`.
+
+"""
+
+import os
+import sys
+import time
+import pstats
+import cProfile
+import tempfile
+import threading
+import collections
+
+
+def create(mode, root, methods=None, interval=0.005, path=None):
+    """Return profiler of `mode`, not yet started
+
+    Arguments:
+        mode (str): Either "cprofile" or "sample"
+        root (function): Function through which calls are dispatched,
+            stacks are sampled from there onwards.
+        methods (list, optional): Names of methods to profile,
+            defaults to all methods.
+        interval (float, optional): Seconds between samples
+        path (str, optional): File to write results to, defaults to
+            a new, timestamped file in the temporary directory.
+
+    """
+
+    try:
+        cls = {"cprofile": DeterministicProfiler,
+               "sample": SamplingProfiler}[mode]
+    except KeyError:
+        raise ValueError("Unknown profiling mode \"%s\", "
+                         "use either \"cprofile\" or \"sample\"" % mode)
+
+    if path is None:
+        # Created exclusively, never an existing file or link
+        fd, path = tempfile.mkstemp(
+            prefix="pyblish-rpc-%s-" % time.strftime("%Y%m%d-%H%M%S"),
+            suffix="." + cls.extension)
+        os.close(fd)
+
+    return cls(root, methods, interval, path)
+
+
+class Profiler(object):
+    """Common interface of profilers"""
+
+    mode = None
+    extension = None
+
+    def __init__(self, root, methods, interval, path):
+        self.methods = frozenset(methods) if methods else None
+        self.interval = interval
+        self.path = path
+
+        self._root = getattr(root, "__func__", root).__code__
+        self._started = None
+
+    def wants(self, method):
+        return self.methods is None or method in self.methods
+
+    def start(self):
+        self._started = time.time()
+
+    def stop(self, top=20):
+        """Stop, write results to :attr:`path` and return summary
+
+        Arguments:
+            top (int, optional): Number of functions in summary
+
+        """
+
+        return {
+            "mode": self.mode,
+            "path": self.path,
+            "methods": sorted(self.methods) if self.methods else None,
+            "duration": time.time() - self._started,
+        }
+
+    def call(self, method, func, params):
+        """Call `func` of `method` with `params`"""
+        return func(*params)
+
+
+class DeterministicProfiler(Profiler):
+    """Profile each selected call with cProfile"""
+
+    mode = "cprofile"
+    extension = "pstats"
+
+    def __init__(self, *args, **kwargs):
+        super(DeterministicProfiler, self).__init__(*args, **kwargs)
+        self._profiles = list()
+        self._lock = threading.Lock()
+
+    def call(self, method, func, params):
+        if not self.wants(method):
+            return func(*params)
+
+        profile = cProfile.Profile()
+
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is active, as of Python 3.12 only one
+            # may run at a time across threads
+            return func(*params)
+
+        try:
+            return func(*params)
+        finally:
+            profile.disable()
+
+            with self._lock:
+                if self._profiles is not None:
+                    self._profiles.append(profile)
+
+    def stop(self, top=20):
+        summary = super(DeterministicProfiler, self).stop(top)
+
+        with self._lock:
+            profiles, self._profiles = self._profiles, None
+
+        summary["calls"] = len(profiles)
+        summary["top"] = list()
+
+        if not profiles:
+            os.remove(self.path)
+            summary["path"] = None
+            return summary
+
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+
+        stats.dump_stats(self.path)
+
+        functions = sorted(stats.stats.items(),
+                           key=lambda item: item[1][3],
+                           reverse=True)
+
+        for (filename, line, name), timing in functions[:top]:
+            _, calls, total, cumulative, _ = timing
+            summary["top"].append({
+                "function": _label(filename, line, name),
+                "calls": calls,
+                "total": total,
+                "cumulative": cumulative,
+            })
+
+        return summary
+
+
+class SamplingProfiler(Profiler):
+    """Sample stacks of threads running selected calls"""
+
+    mode = "sample"
+    extension = "folded"
+
+    def __init__(self, *args, **kwargs):
+        super(SamplingProfiler, self).__init__(*args, **kwargs)
+        self._stacks = collections.defaultdict(int)
+        self._samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        super(SamplingProfiler, self).start()
+        self._thread = threading.Thread(target=self._run,
+                                        name="RpcProfiler")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, top=20):
+        summary = super(SamplingProfiler, self).stop(top)
+
+        self._stop.set()
+        self._thread.join()
+
+        with open(self.path, "w") as f:
+            for stack, count in sorted(self._stacks.items()):
+                f.write("%s %d\n" % (stack, count))
+
+        inclusive = collections.defaultdict(int)
+        exclusive = collections.defaultdict(int)
+
+        for stack, count in self._stacks.items():
+            frames = stack.split(";")
+            exclusive[frames[-1]] += count
+            for frame in set(frames):
+                inclusive[frame] += count
+
+        summary["samples"] = self._samples
+        summary["interval"] = self.interval
+        summary["top"] = [
+            {
+                "function": function,
+                "samples": count,
+                "self": exclusive[function],
+                "cumulative": count * self.interval,
+            }
+            for function, count in sorted(inclusive.items(),
+                                          key=lambda item: item[1],
+                                          reverse=True)[:top]
+        ]
+
+        return summary
+
+    def _run(self):
+        ident = threading.current_thread().ident
+
+        while True:
+            self._stop.wait(self.interval)
+            if self._stop.is_set():
+                break
+
+            for thread, frame in sys._current_frames().items():
+                if thread == ident:
+                    continue
+
+                stack = self._stack(frame)
+                if stack is not None:
+                    self._stacks[stack] += 1
+                    self._samples += 1
+
+    def _stack(self, frame):
+        """Return collapsed stack of `frame`, if running a selected call"""
+        frames = list()
+
+        while frame is not None:
+            code = frame.f_code
+
+            if code is self._root:
+                method = frame.f_locals.get("method")
+                if not self.wants(method):
+                    return None
+
+                frames.append(str(method))
+                return ";".join(reversed(frames))
+
+            frames.append(_label(code.co_filename,
+                                 code.co_firstlineno,
+                                 code.co_name))
+            frame = frame.f_back
+
+        return None
+
+
+def _label(filename, line, name):
+    return "%s (%s:%d)" % (name, os.path.basename(filename), line)
@@ -0,0 +1,156 @@
+"""Constant-time lookup of plug-ins and instances by id
+
+Clients refer to plug-ins and instances by their id alone, which
+the service must resolve into actual objects on every request.
+
+"""
+
+import pyblish.api
+
+from .vendor import six
+
+
+class Registry(object):
+    """Map of id to item
+
+    Arguments:
+        items (list, optional): Initial items
+        kind (str, optional): What the items are, used in error messages
+
+    Raises:
+        KeyError if an id is not registered
+
+    Example:
+        >>> Obj = type("Object", (object,), {})
+        >>> obj = Obj()
+        >>> obj.id = "1234"
+        >>> registry = Registry([obj])
+        >>> registry["1234"] == obj
+        True
+        >>> registry.discard(obj)
+        >>> registry.get("1234") is None
+        True
+
+    """
+
+    def __init__(self, items=None, kind="item"):
+        self._items = dict()
+        self._kind = kind
+        self.update(items or [])
+
+    def __getitem__(self, id):
+        try:
+            return self._items[id]
+        except KeyError:
+            raise KeyError("No %s with id \"%s\"; it may have been removed "
+                           "or rediscovered since it was last fetched"
+                           % (self._kind, id))
+
+    def __contains__(self, id):
+        return id in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, id, default=None):
+        return self._items.get(id, default)
+
+    def add(self, item):
+        self._items[item.id] = item
+
+    def discard(self, item):
+        self._items.pop(item.id, None)
+
+    def update(self, items):
+        for item in items:
+            self._items[item.id] = item
+
+    def reset(self, items):
+        self._items.clear()
+        self.update(items)
+
+
+class IndexedContext(pyblish.api.Context):
+    """Context which keeps an index of its instances
+
+    Every means of adding or removing instances, including those
+    inherited from :class:`list`, is mirrored in :attr:`registry`
+    such that looking up an instance by id is constant-time.
+
+    Example:
+        >>> context = IndexedContext()
+        >>> instance = context.create_instance("MyInstance")
+        >>> context.registry[instance.id] == instance
+        True
+        >>> context[instance.id] == instance
+        True
+        >>> context.remove(instance)
+        >>> instance.id in context
+        False
+
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.registry = Registry(kind="instance")
+        super(IndexedContext, self).__init__(*args, **kwargs)
+
+    def __contains__(self, key):
+        return getattr(key, "id", key) in self.registry
+
+    def __getitem__(self, item):
+        if isinstance(item, six.string_types):
+            return self.registry[item]
+        return list.__getitem__(self, item)
+
+    def get(self, key, default=None):
+        return self.registry.get(key, default)
+
+    def append(self, instance):
+        super(IndexedContext, self).append(instance)
+        self.registry.add(instance)
+
+    def insert(self, index, instance):
+        super(IndexedContext, self).insert(index, instance)
+        self.registry.add(instance)
+
+    def extend(self, instances):
+        instances = list(instances)
+        super(IndexedContext, self).extend(instances)
+        self.registry.update(instances)
+
+    def __iadd__(self, instances):
+        self.extend(instances)
+        return self
+
+    def remove(self, instance):
+        super(IndexedContext, self).remove(instance)
+        self.registry.discard(instance)
+
+    def pop(self, *args):
+        instance = super(IndexedContext, self).pop(*args)
+        self.registry.discard(instance)
+        return instance
+
+    def clear(self):
+        del self[:]
+
+    def __setitem__(self, index, value):
+        super(IndexedContext, self).__setitem__(index, value)
+        self._reindex()
+
+    def __delitem__(self, index):
+        super(IndexedContext, self).__delitem__(index)
+        self._reindex()
+
+    # Python 2 routes simple slices through these
+
+    def __setslice__(self, i, j, sequence):
+        list.__setslice__(self, i, j, sequence)
+        self._reindex()
+
+    def __delslice__(self, i, j):
+        list.__delslice__(self, i, j)
+        self._reindex()
+
+    def _reindex(self):
+        self.registry.reset(list.__iter__(self))
@@ -1,7 +1,21 @@
 """JSON Schema utilities
 
+Schemas are compiled once into plain Python checking functions and
+cached, such that validating an object costs little more than the
+isinstance() checks it takes. Schemas using keywords beyond those
+understood by the compiler fall back to a cached jsonschema validator.
+
+Safe mode is read once from PYBLISH_SAFE on import; "1" validates
+every object, a larger number N validates 1-in-N objects of each
+schema, whereas unset or "0" validates none. See :func:`check`.
+
+Nothing is loaded until first validated; schemas are read from disk
+as they are first used, and jsonschema imported only once a schema
+beyond the compiler is validated, such that importing this module
+costs next to nothing with safe mode off.
+
 Attributes:
-    cache: Cache of previously loaded schemas
+    cache: Cache of previously loaded schemas, by file name
 
 Resources:
     http://json-schema.org/
@@ -11,16 +25,83 @@ Resources:
 """
 
 import os
+import sys
 import json
-
-import jsonschema
+import numbers
+import itertools
+import collections
 
 from .vendor import six
 
-cache = {}
+self = sys.modules[__name__]
+self.rate = 0
+self._validators = dict()
+self._counters = dict()
+self._errors = dict()
+
 module_dir = os.path.dirname(__file__)
 schema_dir = os.path.join(module_dir, "schema")
 
+# Keywords understood by the compiler, along with annotations
+_keywords = frozenset((
+    "$schema", "$ref", "id", "title", "description", "definitions",
+    "type", "enum", "required", "properties", "additionalProperties",
+    "items", "minItems", "maxItems", "oneOf",
+))
+
+_types = {
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, (list, tuple)),
+    "string": lambda value: isinstance(value, six.string_types),
+    "integer": lambda value: (isinstance(value, six.integer_types) and
+                              not isinstance(value, bool)),
+    "number": lambda value: (isinstance(value, numbers.Number) and
+                             not isinstance(value, bool)),
+    "boolean": lambda value: isinstance(value, bool),
+    "null": lambda value: value is None,
+}
+
+
+class ValidationError(Exception):
+    """Object does not conform to its schema
+
+    Once jsonschema is imported, e.g. by the caller, errors raised
+    are also instances of jsonschema.ValidationError, as they were
+    when jsonschema was imported along with this module.
+
+    Attributes:
+        message (str): Description of the error
+        path (deque): Keys and indices leading to the offending member
+
+    """
+
+    def __init__(self, message, path=()):
+        super(ValidationError, self).__init__(message)
+        self.message = message
+        self.path = collections.deque(path)
+
+
+class _Unsupported(Exception):
+    """Schema cannot be compiled, use jsonschema instead"""
+
+
+class _Cache(dict):
+    """Schemas by file name, each read from disk once first used"""
+
+    def __missing__(self, name):
+        path = os.path.join(schema_dir, name)
+
+        if name.startswith(("_", ".")) or not os.path.isfile(path):
+            raise KeyError(name)
+
+        with open(path) as f:
+            schema = self[name] = json.load(f)
+
+        return schema
+
+
+cache = _Cache()
+
 
 def load_all():
     for schema in os.listdir(schema_dir):
@@ -30,26 +111,343 @@ def load_all():
             continue
         if not os.path.isfile(os.path.join(schema_dir, schema)):
             continue
-        with open(os.path.join(schema_dir, schema)) as f:
-            cache[schema] = json.load(f)
+        cache[schema]
+
+
+def configure(rate):
+    """Set rate at which :func:`check` validates
+
+    Arguments:
+        rate (int): 0 validates nothing, 1 everything and
+            N validates 1-in-N objects of each schema.
+
+    """
+
+    self.rate = max(0, int(rate))
+    self._counters.clear()
+
+
+def check(data, schema):
+    """Validate `data` against `schema` as per the configured rate
+
+    This is what formatting calls for every object it produces
+    and costs a single comparison with safe mode off.
+
+    """
+
+    if not self.rate:
+        return
+
+    if self.rate > 1:
+        try:
+            counter = self._counters[schema]
+        except KeyError:
+            counter = self._counters.setdefault(schema, itertools.count())
+
+        if next(counter) % self.rate:
+            return
+
+    validate(data, schema)
 
 
 def validate(data, schema):
+    """Validate `data` against `schema`
+
+    Arguments:
+        data (object): Object to validate
+        schema (str, dict): Name of schema, e.g. "instance",
+            or the schema itself.
+
+    Raises:
+        ValidationError if `data` does not conform to `schema`
+
+    """
+
     if isinstance(schema, six.string_types):
-        schema = cache[schema + ".json"]
+        try:
+            validator = self._validators[schema]
+        except KeyError:
+            validator = self._validators[schema] = compile(schema)
+    else:
+        validator = compile(schema)
+
+    validator(data)
+
+
+def compile(schema):
+    """Return function validating objects against `schema`
+
+    Arguments:
+        schema (str, dict): Name of schema, or the schema itself
+
+    """
+
+    name = None
+    if isinstance(schema, six.string_types):
+        name = schema + ".json"
+        schema = cache[name]
+
+    try:
+        check = _compile(schema, _Resolver(name))
+    except _Unsupported:
+        fallback = _fallback(schema)
+        error = _jsonschema().ValidationError
+
+        def validator(data):
+            try:
+                fallback(data)
+            except error as e:
+                raise _error(e.message, e.path)
+
+        return validator
+
+    def validator(data):
+        check(data, ())
+
+    return validator
+
+
+def _jsonschema():
+    """Return jsonschema, imported upon first use"""
+    from .vendor import jsonschema
+    return jsonschema
+
+
+def _fallback(schema):
+    """Return jsonschema validator of `schema`, checked just the once"""
+    jsonschema = _jsonschema()
+
+    # References may be to any of them, all must be in store
+    load_all()
+
+    cls = jsonschema.validators.validator_for(schema)
+    cls.check_schema(schema)
+
+    resolver = jsonschema.RefResolver("", None, store=cache,
+                                      cache_remote=True)
+    validator = cls(schema, types={"array": (list, tuple)},
+                    resolver=resolver)
+
+    return validator.validate
+
+
+class _Resolver(object):
+    """Compile references, once each and relative to `base`
+
+    Recursive references are compiled into a function forwarding
+    to the compiled target, which is filled in once compiled.
+
+    """
+
+    def __init__(self, base, compiled=None):
+        self._base = base
+        self._compiled = compiled if compiled is not None else dict()
+
+    def __call__(self, ref):
+        document, _, pointer = ref.partition("#")
+        document = document or self._base
+
+        key = (document, pointer)
+        if key in self._compiled:
+            return self._compiled[key]
+
+        target = list()
+
+        def forward(value, path):
+            return target[0](value, path)
+
+        self._compiled[key] = forward
+
+        try:
+            schema = cache[document]
+            for part in filter(None, pointer.split("/")):
+                schema = schema[part]
+        except (KeyError, TypeError):
+            raise _Unsupported()
+
+        target.append(_compile(schema, _Resolver(document, self._compiled)))
+        return forward
+
+
+def _error(message, path=()):
+    """Return ValidationError, also that of jsonschema once imported"""
+    jsonschema = sys.modules.get("pyblish_rpc.vendor.jsonschema")
+    base = getattr(jsonschema, "ValidationError", None)
+
+    if base is None:
+        return ValidationError(message, path)
+
+    try:
+        cls = self._errors[base]
+    except KeyError:
+        cls = self._errors[base] = type("ValidationError",
+                                        (ValidationError, base),
+                                        {"__module__": __name__})
+
+    return cls(message, path)
+
+
+def _fail(path, message):
+    if path:
+        message = "%s: %s" % ("/".join(str(p) for p in path), message)
+
+    raise _error(message, path)
+
+
+def _compile(schema, resolve):
+    """Return function(value, path) checking `value` against `schema`"""
+    if not isinstance(schema, dict) or set(schema) - _keywords:
+        raise _Unsupported()
+
+    if "$ref" in schema:
+        # Siblings of $ref are ignored, as per the specification
+        return resolve(schema["$ref"])
+
+    checks = list()
+
+    if "type" in schema:
+        names = schema["type"]
+        if isinstance(names, six.string_types):
+            names = [names]
+
+        try:
+            tests = [_types[name] for name in names]
+        except KeyError:
+            raise _Unsupported()
+
+        def check_type(value, path):
+            for test in tests:
+                if test(value):
+                    return
+            _fail(path, "%r is not of type %s" % (
+                value, ", ".join(repr(n) for n in names)))
+
+        checks.append(check_type)
+
+    if "enum" in schema:
+        enum = schema["enum"]
+
+        def check_enum(value, path):
+            if value not in enum:
+                _fail(path, "%r is not one of %r" % (value, enum))
+
+        checks.append(check_enum)
+
+    if "required" in schema:
+        required = schema["required"]
+
+        def check_required(value, path):
+            if isinstance(value, dict):
+                for key in required:
+                    if key not in value:
+                        _fail(path, "%r is a required property" % key)
+
+        checks.append(check_required)
+
+    properties = dict(
+        (key, _compile(subschema, resolve))
+        for key, subschema in schema.get("properties", {}).items()
+    )
+
+    additional = schema.get("additionalProperties", True)
+    if additional is False:
+        def additional(key, value, path):
+            _fail(path, "Additional property %r is not allowed" % key)
+    elif additional is True:
+        additional = None
+    else:
+        check_additional = _compile(additional, resolve)
+
+        def additional(key, value, path):
+            check_additional(value, path + (key,))
+
+    if properties or additional is not None:
+        def check_properties(value, path):
+            if not isinstance(value, dict):
+                return
+
+            for key, member in value.items():
+                check = properties.get(key)
+                if check is not None:
+                    check(member, path + (key,))
+                elif additional is not None:
+                    additional(key, member, path)
+
+        checks.append(check_properties)
+
+    if "items" in schema:
+        check_item = _compile(schema["items"], resolve)
+
+        def check_items(value, path):
+            if isinstance(value, (list, tuple)):
+                for index, item in enumerate(value):
+                    check_item(item, path + (index,))
+
+        checks.append(check_items)
+
+    if "minItems" in schema or "maxItems" in schema:
+        lower = schema.get("minItems", 0)
+        upper = schema.get("maxItems", sys.maxsize)
+
+        def check_length(value, path):
+            if isinstance(value, (list, tuple)):
+                if len(value) < lower:
+                    _fail(path, "%r is too short" % (value,))
+                if len(value) > upper:
+                    _fail(path, "%r is too long" % (value,))
+
+        checks.append(check_length)
+
+    if "oneOf" in schema:
+        alternatives = [_compile(subschema, resolve)
+                        for subschema in schema["oneOf"]]
+
+        def check_one_of(value, path):
+            matches = 0
+            for alternative in alternatives:
+                try:
+                    alternative(value, path)
+                except ValidationError:
+                    continue
+                matches += 1
+
+            if matches != 1:
+                _fail(path, "%r is not valid under exactly one of the "
+                            "given schemas" % (value,))
+
+        checks.append(check_one_of)
+
+    if not checks:
+        return _anything
+
+    if len(checks) == 1:
+        return checks[0]
+
+    def check_all(value, path):
+        for check in checks:
+            check(value, path)
+
+    return check_all
+
+
+def _anything(value, path):
+    pass
+
 
-    resolver = jsonschema.RefResolver(
-        "",
-        None,
-        store=cache,
-        cache_remote=True)
-    return jsonschema.validate(data, schema, types={"array": (list, tuple)},
-                               resolver=resolver)
+def _parse_rate(value):
+    """Interpret PYBLISH_SAFE, any value other than a number means 1"""
+    if not value:
+        return 0
 
+    try:
+        return max(0, int(value))
+    except ValueError:
+        return 1
 
-ValidationError = jsonschema.ValidationError
 
-load_all()
+configure(_parse_rate(os.getenv("PYBLISH_SAFE")))
 
 __all__ = ["validate",
+           "check",
+           "configure",
            "ValidationError"]
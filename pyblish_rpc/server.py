@@ -7,42 +7,488 @@ Attributes:
 """
 
 
+import os
 import sys
+import json
+import time
+import errno
+import select
+import socket
 import threading
+import itertools
 
 try:
     from SimpleXMLRPCServer import (
         SimpleXMLRPCServer,
+        SimpleXMLRPCDispatcher,
         SimpleXMLRPCRequestHandler
     )
+    from xmlrpclib import Fault, loads, dumps
 except ImportError:
     from xmlrpc.server import (
         SimpleXMLRPCServer,
+        SimpleXMLRPCDispatcher,
         SimpleXMLRPCRequestHandler
     )
-
-try:
-    import SocketServer as socketserver
-except ImportError:
-    # Python 3
-    import socketserver
+    from xmlrpc.client import Fault, loads, dumps
 
 import pyblish.api
 import pyblish.lib
 import pyblish.logic
 
-from . import dispatch_wrapper, service as service_
+from . import (
+    dispatch_wrapper,
+    encoding,
+    metrics,
+    pool,
+    service as service_,
+    sessions,
+    sidechannel,
+)
+from .vendor import six
 
 self = sys.modules[__name__]
 self.current_server_thread = None
 self.current_server = None
 
+# Fault code of calls refused due to load
+BUSY = 503
+
+# Processor time of the current thread, where available
+_thread_time = getattr(time, "thread_time", time.time)
+
 
 def default_wrapper(func, *args, **kwargs):
     return func(*args, **kwargs)
 
 
-class RpcServer(socketserver.ThreadingMixIn, SimpleXMLRPCServer):
+class PooledDispatcher(object):
+    """Dispatch calls on a pool of workers, and measure them
+
+    Calls are carried out by a fixed number of workers, cheap
+    interactive calls ahead of any other queued work and with a
+    worker reserved for them, such that they are answered whilst
+    other workers are busy processing. Once the queue is at its
+    limit, further calls are refused as busy.
+
+    Each call is measured, see :mod:`metrics`, and the measurements
+    returned by the "stats" call as well as served in plain text
+    at :attr:`metrics_path`.
+
+    Liveness is served as JSON at :attr:`health_path`, answered
+    directly by the server rather than dispatched as a call, such
+    that it is answered even whilst every worker is busy.
+
+    Responses larger than :attr:`compress_threshold` are compressed
+    with gzip for clients accepting it, see :meth:`_compress`. Those
+    larger than :attr:`side_channel_threshold` are instead passed to
+    local clients asking for it via a file, see :mod:`sidechannel`.
+
+    Calls are carried out via the registered dispatch wrapper, e.g.
+    on the main thread of a host, except those known not to need it;
+    see :attr:`free_threaded`. Calls pending at once are handed to
+    the wrapper together, see :class:`pool.Coalescer`, except
+    :attr:`interactive` calls which are handed over on their own.
+
+    Each call is carried out within the session of its client, as
+    identified by the :data:`sessions.HEADER` of its request, on
+    whichever thread it ends up, see :func:`sessions.scope`.
+
+    Mixed into servers alongside SimpleXMLRPCDispatcher, which
+    provides registration of functions and introspection.
+
+    Attributes:
+        interactive (frozenset): Names of methods queued ahead of others
+        free_threaded (frozenset): Names of methods which don't touch
+            the host, carried out without the dispatch wrapper.
+        metrics_path (str): Path at which metrics are served to GET
+        health_path (str): Path at which liveness is served to GET
+        compress_threshold (int): Bytes beyond which responses are
+            compressed, None to never compress.
+        compress_level (int): Level of compression, from 1 to 9
+        side_channel_threshold (int): Bytes beyond which responses
+            are passed via the side channel, None to never do so.
+
+    """
+
+    metrics_path = "/metrics"
+    health_path = "/health"
+    compress_threshold = 1400
+    compress_level = 6
+    side_channel_threshold = 256 * 1024
+
+    interactive = frozenset([
+        "ping",
+        "stats",
+        "context",
+        "changes",
+        "records",
+        "poll_pass",
+        "stop_pass",
+        "profile_start",
+        "profile_stop",
+        "configure_records",
+    ])
+
+    free_threaded = frozenset([
+        "ping",
+        "stats",
+        "records",
+        "start_pass",
+        "poll_pass",
+        "stop_pass",
+        "profile_start",
+        "profile_stop",
+        "configure_records",
+        "kill",
+        "system.listMethods",
+        "system.methodHelp",
+        "system.methodSignature",
+
+        # Dispatches each of its calls in turn
+        "system.multicall",
+    ])
+
+    def _setup_dispatcher(self, workers=8, queue_size=64,
+                          compress_threshold=1400,
+                          side_channel_threshold=256 * 1024):
+        # Interactive calls are never stuck behind processing,
+        # given a worker of their own
+        self.pool = pool.WorkerPool(workers, queue_size, "RpcWorker",
+                                    reserved=min(1, workers - 1))
+        self.metrics = metrics.Metrics()
+        self.main_thread = pool.Coalescer()
+        self.compress_threshold = compress_threshold
+        self.side_channel_threshold = side_channel_threshold
+        self._local = threading.local()
+
+        # Directory of files of the side channel, created once needed
+        self._side_directory = None
+        self._side_lock = threading.Lock()
+
+        # Calls being carried out, by a sequence number of their own
+        self._calls = dict()
+        self._calls_lock = threading.Lock()
+        self._call_ids = itertools.count()
+
+    def authenticate(self, headers):
+        """TODO(marcus): Implement basic authentication"""
+        # basic, _, encoded = headers.get("Authorization").partition(" ")
+        # assert basic == "Basic", "Only basic authentication supported"
+        # username, _, password = base64.b64decode(encoded).partition(":")
+        # assert username == "marcus"
+        # assert password == "pass"
+        return True
+
+    def stats(self, methods=True):
+        """Return statistics about queue and calls
+
+        Arguments:
+            methods (bool, optional): Include metrics of calls,
+                as opposed to only those of the queue.
+
+        """
+
+        stats = self.pool.stats()
+        stats.update(self.main_thread.stats())
+
+        if methods:
+            stats.update(self.metrics.stats())
+
+        return stats
+
+    def health(self):
+        """Return whether the host is busy, and with what
+
+        Cheap and safe to call from any thread; nothing is
+        dispatched and the service is left untouched.
+
+        Returns:
+            Dictionary of "alive", "busy" with a call needing the
+                host, "method" of the longest running such call,
+                if any, and every call "running", longest first.
+
+        """
+
+        now = time.time()
+
+        with self._calls_lock:
+            calls = sorted(self._calls.values(), key=lambda call: call[1])
+
+        host = [method for method, _ in calls
+                if method not in self.free_threaded]
+
+        return {
+            "alive": True,
+            "busy": bool(host),
+            "method": host[0] if host else None,
+            "running": [{"method": method, "seconds": now - started}
+                        for method, started in calls],
+            "queueDepth": self.pool.stats()["queueDepth"],
+        }
+
+    def _health(self):
+        """Return encoded health, see :meth:`health`"""
+        return json.dumps(self.health(),
+                          separators=(",", ":")).encode("utf-8")
+
+    def _compress(self, response, accept_encoding):
+        """Compress `response` if large enough and accepted by the client
+
+        Arguments:
+            response (bytes): Body of response
+            accept_encoding (str): Accept-Encoding header of request
+
+        Returns:
+            Tuple of (body, Content-Encoding or None)
+
+        """
+
+        if (self.compress_threshold is None or
+                len(response) <= self.compress_threshold or
+                not encoding.accepts_gzip(accept_encoding)):
+            return response, None
+
+        started = _thread_time()
+        compressed = encoding.compress(response, self.compress_level)
+        self.metrics.compressed(len(response),
+                                len(compressed),
+                                _thread_time() - started)
+
+        if len(compressed) >= len(response):
+            return response, None
+
+        return compressed, "gzip"
+
+    def _side_channel(self, response, requested):
+        """Pass `response` via a file, if large enough and requested
+
+        Responses are sent inline instead, should the file fail
+        to be written, e.g. for lack of space.
+
+        Arguments:
+            response (bytes): Body of response
+            requested (str): Side channel header of request, if any
+
+        Returns:
+            Side channel header of response, or None to send inline
+
+        """
+
+        if (self.side_channel_threshold is None or
+                not requested or
+                len(response) <= self.side_channel_threshold):
+            return None
+
+        try:
+            with self._side_lock:
+                if self._side_directory is None:
+                    self._side_directory = sidechannel.directory()
+
+            header = sidechannel.write(self._side_directory, response)
+
+        except (IOError, OSError):
+            return None
+
+        self.metrics.side_channel(len(response))
+        return header
+
+    def _close_side_channel(self):
+        """Remove files of the side channel, claimed or not"""
+        with self._side_lock:
+            if self._side_directory is not None:
+                sidechannel.remove_directory(self._side_directory)
+                self._side_directory = None
+
+    def _call(self, method, params, times, content_type, id_, size,
+              accept_encoding, side_channel, session):
+        """Carry out `method` and return its encoded response
+
+        Called from a worker, errors are encoded rather than raised.
+        The response is compressed or passed via the side channel
+        here too.
+
+        Arguments:
+            times (dict): Time at which the call was queued, as "queued"
+            size (int): Bytes of the request, for metrics
+            accept_encoding (str): Accept-Encoding header of request
+            side_channel (str): Side channel header of request, if any
+            session (str): Id of session of the call
+
+        Returns:
+            Tuple of (response, Content-Encoding or None,
+                side channel header or None)
+
+        """
+
+        self._local.dispatching = True
+        error = True
+
+        try:
+            result = self._execute(method, params, times, session)
+
+            if method == "stats":
+                result.update(self.stats())
+
+            response = self._dumps(result, content_type, id_)
+            error = False
+
+        except Fault as fault:
+            response = self._fault(fault.faultCode,
+                                   fault.faultString,
+                                   content_type, id_)
+
+        except Exception:
+            response = self._error(sys.exc_info(), content_type, id_)
+
+        finally:
+            self._local.dispatching = False
+            self._record(method, error, times)
+
+        self.metrics.transferred(method, size, len(response))
+
+        header = self._side_channel(response, side_channel)
+        if header is not None:
+            return b"", None, header
+
+        return self._compress(response, accept_encoding) + (None,)
+
+    def _dispatch(self, method, params):
+        """Carry out each call of system.multicall, from its worker
+
+        Rather than queued anew, such that no worker ever waits on
+        another; each call still goes through the dispatch wrapper.
+
+        """
+
+        times = {"queued": time.time()}
+        error = True
+
+        try:
+            result = self._execute(method, params, times,
+                                   sessions.current())
+            error = False
+        finally:
+            self._record(method, error, times)
+
+        return result
+
+    def _submit(self, method, func, *args):
+        """Queue `func` on behalf of `method`
+
+        Raises:
+            Fault with code BUSY if the queue is full
+
+        """
+
+        priority = 0 if method in self.interactive else 1
+
+        try:
+            return self.pool.submit(priority, func, *args)
+        except pool.Busy as e:
+            self.metrics.record(method, error=True)
+            raise Fault(BUSY, "Host is busy, retry in %.2f seconds"
+                        % e.retry)
+
+    def _execute(self, method, params, times, session=None):
+        """Call `method` via the dispatch wrapper, from a worker
+
+        The time at which each phase of the call starts and finishes
+        is stored in `times`, see :meth:`_record`. Time spent waiting
+        on the wrapper is only measured for calls made through it.
+
+        Arguments:
+            session (str, optional): Id of session of the call
+
+        """
+
+        times["started"] = time.time()
+
+        def execute(method, params):
+            times["entered"] = time.time()
+            try:
+                with sessions.scope(session):
+                    return SimpleXMLRPCDispatcher._dispatch(
+                        self, method, params)
+            finally:
+                times["finished"] = time.time()
+
+        wrapper = dispatch_wrapper()
+        call = next(self._call_ids)
+
+        with self._calls_lock:
+            self._calls[call] = (method, times["started"])
+
+        try:
+            if wrapper is None or method in self.free_threaded:
+                return execute(method, params)
+
+            times["wrapped"] = True
+
+            # Not held up by a batch of other calls in progress
+            if method in self.interactive:
+                return self.main_thread.call_alone(
+                    wrapper, execute, method, params)
+
+            return self.main_thread.call(wrapper, execute, method, params)
+
+        finally:
+            with self._calls_lock:
+                self._calls.pop(call)
+
+    def _record(self, method, error, times):
+        self.metrics.record(
+            method,
+            error=error,
+            queueWait=_elapsed(times, "queued", "started"),
+            wrapperWait=(_elapsed(times, "started", "entered")
+                         if "wrapped" in times else None),
+            execution=_elapsed(times, "entered", "finished"))
+
+    def _loads(self, body, content_type):
+        """Return method, params and id of request `body`"""
+        if content_type == "text/xml":
+            params, method = loads(body)
+            return method, params, None
+
+        request = encoding.loads(body, content_type)
+        return (request["method"],
+                request.get("params", []),
+                request.get("id"))
+
+    def _dumps(self, result, content_type, id_):
+        if content_type == "text/xml":
+            response = dumps((result,), methodresponse=1,
+                             allow_none=self.allow_none,
+                             encoding=self.encoding)
+            return self._encode(response)
+
+        return encoding.dumps(encoding.response(result, id_), content_type)
+
+    def _fault(self, code, message, content_type, id_):
+        if content_type == "text/xml":
+            response = dumps(Fault(code, message),
+                             allow_none=self.allow_none,
+                             encoding=self.encoding)
+            return self._encode(response)
+
+        return encoding.dumps(encoding.error(code, message, id_),
+                              content_type)
+
+    def _encode(self, response):
+        """Return XML-RPC `response` as bytes, as it is on Python 2"""
+        if isinstance(response, bytes):
+            return response
+        return response.encode(self.encoding or "utf-8", "xmlcharrefreplace")
+
+    def _error(self, exc_info, content_type, id_):
+        """Encode exception like SimpleXMLRPCServer does"""
+        exc_type, exc_value, _ = exc_info
+        return self._fault(1, "%s:%s" % (exc_type, exc_value),
+                           content_type, id_)
+
+
+class RpcServer(PooledDispatcher, SimpleXMLRPCServer):
     """The Pyblish RPC Server
 
     Support multiple requests simultaneously. This is important,
@@ -53,11 +499,89 @@ class RpcServer(socketserver.ThreadingMixIn, SimpleXMLRPCServer):
     suffixed with an exact version, such as /pyblish/v1. The root always
     references the latest version.
 
+    Requests are XML-RPC, unless their Content-Type is that of one
+    of the compact encodings in :mod:`encoding`, in which case they
+    are answered in kind.
+
+    Requests are handled by the workers of the pool of the
+    :class:`PooledDispatcher`, rather than a thread each. Each request
+    is read, and interactive calls answered, by a worker at priority
+    0; other calls are handed over at priority 1 and answered by the
+    worker carrying them out, see :meth:`_answer`.
+
+    Connections are kept alive between requests (HTTP/1.1). Whilst
+    idle, they await their next request in :meth:`serve_forever`
+    rather than occupy a worker. Once connections are at their
+    limit, further connections are refused as busy.
+
+    Listens on a Unix socket rather than TCP if its address is
+    the path of one, see :func:`_server`.
+
+    Arguments:
+        path (str): Path of API, in addition to /pyblish
+        workers (int, optional): Number of calls carried out at once
+        queue_size (int, optional): Maximum number of calls queued
+        max_connections (int, optional): Maximum number of open
+            connections, further connections are refused with 503.
+        request_timeout (float, optional): Seconds a worker waits for
+            the rest of a request, once it has begun arriving.
+        compress_threshold (int, optional): Bytes beyond which
+            responses are compressed, None to never compress.
+        side_channel_threshold (int, optional): Bytes beyond which
+            responses are passed via the side channel, if asked for,
+            None to never do so.
+
     """
 
-    def __init__(self, path, *args, **kwargs):
+    def __init__(self, path, address, *args, **kwargs):
+        unix = _is_socket_path(address)
+
+        if unix:
+            self.address_family = _unix_family()
+            _remove_socket(address)
+
+        self._setup_dispatcher(kwargs.pop("workers", 8),
+                               kwargs.pop("queue_size", 64),
+                               kwargs.pop("compress_threshold", 1400),
+                               kwargs.pop("side_channel_threshold",
+                                          256 * 1024))
+        self.max_connections = kwargs.pop("max_connections", 64)
+        request_timeout = kwargs.pop("request_timeout", 10)
+
+        # Handlers of open connections, and of those awaiting
+        # their next request, see serve_forever()
+        self._connections = set()
+        self._idle = set()
+        self._connections_lock = threading.Lock()
+        self._parked = threading.Condition(self._connections_lock)
+
+        self._stopping = False
+        self._stopped = threading.Event()
+
+        # Wakes serve_forever() as a connection becomes idle
+        self._wake_read, self._wake_write = _socket_pair()
+
         class VerifyingRequestHandler(SimpleXMLRPCRequestHandler):
             rpc_paths = ("/pyblish", path)
+            protocol_version = "HTTP/1.1"
+            timeout = request_timeout
+
+            # Not applicable to Unix sockets
+            disable_nagle_algorithm = not unix
+
+            # Side channel of the last response over this connection
+            side_channel = None
+
+            # Call of the current request to hand over, see _answer()
+            deferred = None
+
+            def __init__(this, request, client_address, server):
+                # Requests are handled one at a time, see _handle()
+                this.request = request
+                this.client_address = client_address
+                this.server = server
+                this.close_connection = True
+                this.setup()
 
             def parse_request(this):
                 if SimpleXMLRPCRequestHandler.parse_request(this):
@@ -68,25 +592,409 @@ class RpcServer(socketserver.ThreadingMixIn, SimpleXMLRPCServer):
 
                 return False
 
+            def do_POST(this):
+                # The client has read the previous response by now
+                this.release_side_channel()
+
+                if not this.is_rpc_path_valid():
+                    return this.report_404()
+
+                content_encoding = this.headers.get(
+                    "Content-Encoding", "identity").lower()
+
+                # As decode_request_content() does, from Python 2.7
+                if content_encoding not in ("identity", "gzip"):
+                    return this.send_error(
+                        501, "encoding %r not supported" % content_encoding)
+
+                try:
+                    length = int(this.headers["Content-Length"])
+                    data = this.rfile.read(length)
+
+                    if content_encoding == "gzip":
+                        try:
+                            data = encoding.decompress(data)
+                        except Exception:
+                            return this.send_error(
+                                400, "error decoding gzip content")
+
+                except Exception:
+                    # As SimpleXMLRPCRequestHandler does
+                    this.send_response(500)
+                    this.send_header("Content-Length", "0")
+                    this.end_headers()
+                    return
+
+                self._answer(this, data)
+
+            def do_GET(this):
+                this.release_side_channel()
+
+                if this.path == self.health_path:
+                    return this.send_body("application/json",
+                                          self._health())
+
+                if this.path != self.metrics_path:
+                    return this.report_404()
+
+                response = self.metrics.text(
+                    gauges=self.stats(methods=False)).encode("utf-8")
+
+                this.send_body("text/plain; version=0.0.4",
+                               *self._compress(
+                                   response,
+                                   this.headers.get("Accept-Encoding", "")))
+
+            def send_body(this, content_type, body, content_encoding=None,
+                          side_channel=None):
+                """Send `body`, as encoded or passed via the side channel
+
+                Arguments:
+                    side_channel (str, optional): Header of the side
+                        channel, in place of `body`.
+
+                """
+
+                this.side_channel = side_channel
+
+                this.send_response(200)
+                this.send_header("Content-Type", content_type)
+                if content_encoding is not None:
+                    this.send_header("Content-Encoding", content_encoding)
+                if side_channel is not None:
+                    this.send_header(sidechannel.HEADER, side_channel)
+                this.send_header("Content-Length", str(len(body)))
+                this.end_headers()
+                this.wfile.write(body)
+
+            def release_side_channel(this):
+                """Remove file of previous response, unless claimed"""
+                if this.side_channel is not None:
+                    sidechannel.remove(this.side_channel)
+                    this.side_channel = None
+
+            def finish(this):
+                try:
+                    SimpleXMLRPCRequestHandler.finish(this)
+                finally:
+                    this.release_side_channel()
+
         SimpleXMLRPCServer.__init__(
             self,
+            address,
             requestHandler=VerifyingRequestHandler,
             *args,
             **kwargs)
 
-    def authenticate(self, headers):
-        """TODO(marcus): Implement basic authentication"""
-        # basic, _, encoded = headers.get("Authorization").partition(" ")
-        # assert basic == "Basic", "Only basic authentication supported"
-        # username, _, password = base64.b64decode(encoded).partition(":")
-        # assert username == "marcus"
-        # assert password == "pass"
-        return True
+    def serve_forever(self, poll_interval=0.5):
+        """Serve until shutdown(), then finish requests in progress
+
+        Idle connections await their next request here, and are
+        handed to a worker once it arrives. Requests in progress are
+        answered before returning, as the host may exit thereafter,
+        including the reply to kill() itself.
+
+        """
+
+        self._stopped.clear()
+
+        try:
+            while not self._stopping:
+                with self._connections_lock:
+                    idle = dict((handler.connection, handler)
+                                for handler in self._idle)
+
+                readable = _select([self.socket, self._wake_read] +
+                                   list(idle), poll_interval)
+
+                for sock in readable:
+                    if sock is self.socket:
+                        self._handle_request_noblock()
+
+                    elif sock is self._wake_read:
+                        _drain(sock)
+
+                    else:
+                        handler = idle[sock]
+
+                        with self._connections_lock:
+                            self._idle.discard(handler)
+
+                        self._read(handler)
+
+        finally:
+            with self._parked:
+                while len(self._connections) > len(self._idle):
+                    self._parked.wait()
+
+            self._stopping = False
+            self._stopped.set()
+
+    def shutdown(self):
+        """Stop serving once requests in progress have been answered
+
+        Blocks until stopped, unless called from within a call,
+        e.g. kill(), which must first be answered itself.
+
+        """
+
+        self._stopping = True
+        self._wake()
+
+        if not getattr(self._local, "dispatching", False):
+            self._stopped.wait()
+
+    def process_request(self, request, client_address):
+        with self._connections_lock:
+            refuse = len(self._connections) >= self.max_connections
+
+        if refuse:
+            try:
+                _refuse(request)
+            finally:
+                self.shutdown_request(request)
+            return
+
+        handler = self.RequestHandlerClass(request, client_address, self)
+
+        with self._connections_lock:
+            self._connections.add(handler)
+
+        self._read(handler)
+
+    def _read(self, handler):
+        """Hand next request of `handler` to a worker, to read"""
+        try:
+            self.pool.submit(0, self._handle, handler)
+        except pool.Busy:
+            _refuse(handler.request)
+            handler.close_connection = True
+            self._park(handler)
+
+    def _handle(self, handler):
+        """Handle next request of `handler`, from a worker"""
+        handler.deferred = None
+
+        try:
+            handler.handle_one_request()
+        except Exception:
+            handler.close_connection = True
+            self.handle_error(handler.request, handler.client_address)
+
+        if handler.deferred is not None:
+            content_type, call = handler.deferred
+
+            try:
+                # Answered by the worker carrying out the call
+                return self._submit(call[0], self._reply,
+                                    handler, content_type, call)
+            except Fault as fault:
+                self._reply(handler, content_type, call, fault)
 
-    def _dispatch(self, *args):
-        wrapper = dispatch_wrapper() or default_wrapper
-        return wrapper(SimpleXMLRPCServer._dispatch,
-                       self, *args)
+        else:
+            self._park(handler)
+
+    def _answer(self, handler, data):
+        """Answer the request of `handler`, with body `data`
+
+        Interactive calls are answered there and then, by the worker
+        reading the request. Others are handed over to the pool at
+        their own priority, once the request has been read.
+
+        """
+
+        headers = handler.headers
+        content_type = headers.get("Content-Type", "")
+        content_type = content_type.split(";")[0].strip()
+
+        if content_type not in encoding.content_types:
+            content_type = "text/xml"
+
+        try:
+            method, params, id_ = self._loads(data, content_type)
+        except Exception:
+            return handler.send_body(content_type, self._error(
+                sys.exc_info(), content_type, None))
+
+        # Files are removed once the connection closes, so it
+        # must outlive the response for the client to read them
+        side_channel = (headers.get(sidechannel.HEADER)
+                        if not handler.close_connection else None)
+
+        call = (method, params, {"queued": time.time()}, content_type,
+                id_, len(data), headers.get("Accept-Encoding", ""),
+                side_channel, headers.get(sessions.HEADER) or None)
+
+        if method in self.interactive:
+            return handler.send_body(content_type, *self._call(*call))
+
+        handler.deferred = (content_type, call)
+
+    def _reply(self, handler, content_type, call, fault=None):
+        """Carry out `call` and answer `handler`, from a worker
+
+        Arguments:
+            fault (Fault, optional): Answer with this instead
+
+        """
+
+        try:
+            if fault is None:
+                response = self._call(*call)
+            else:
+                response = (self._fault(fault.faultCode, fault.faultString,
+                                        content_type, call[4]),)
+
+            handler.send_body(content_type, *response)
+            handler.wfile.flush()
+
+        except Exception:
+            handler.close_connection = True
+            self.handle_error(handler.request, handler.client_address)
+
+        finally:
+            self._park(handler)
+
+    def _park(self, handler):
+        """Await next request of `handler`, unless it is to be closed"""
+        if handler.close_connection:
+            return self._close(handler)
+
+        with self._parked:
+            self._idle.add(handler)
+            self._parked.notify_all()
+
+        self._wake()
+
+    def _close(self, handler):
+        try:
+            handler.finish()
+        except Exception:
+            pass  # The client has gone
+        finally:
+            self.shutdown_request(handler.request)
+
+            with self._parked:
+                self._connections.discard(handler)
+                self._idle.discard(handler)
+                self._parked.notify_all()
+
+    def _wake(self):
+        """Wake serve_forever(), e.g. to await a connection anew"""
+        try:
+            self._wake_write.send(b"x")
+        except (IOError, OSError):
+            pass  # Already awake, or closed
+
+    def server_close(self):
+        SimpleXMLRPCServer.server_close(self)
+
+        with self._connections_lock:
+            handlers = list(self._connections)
+
+        # Wake workers reading from connections, such that
+        # none outlives the host
+        for handler in handlers:
+            try:
+                handler.request.shutdown(socket.SHUT_RDWR)
+            except (IOError, OSError):
+                pass
+
+        self.pool.shutdown(wait=True)
+
+        for handler in handlers:
+            self._close(handler)
+
+        self._wake_read.close()
+        self._wake_write.close()
+        self._close_side_channel()
+
+        if _is_socket_path(self.server_address):
+            _remove_socket(self.server_address)
+
+    def stats(self, methods=True):
+        """Return statistics about connections, queue and calls"""
+        stats = PooledDispatcher.stats(self, methods)
+        stats["connectionCount"] = len(self._connections)
+        return stats
+
+
+def _refuse(request):
+    """Answer connection `request` as busy, without reading from it"""
+    try:
+        request.sendall(b"HTTP/1.1 503 Service Unavailable\r\n"
+                        b"Retry-After: 1\r\n"
+                        b"Content-Length: 0\r\n"
+                        b"Connection: close\r\n\r\n")
+    except (IOError, OSError):
+        pass
+
+
+def _socket_pair():
+    """Return pair of connected, non-blocking sockets"""
+    try:
+        pair = socket.socketpair()
+    except AttributeError:
+        # Windows, on Python 2
+        listener = socket.socket()
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(1)
+
+        try:
+            client = socket.create_connection(listener.getsockname())
+            pair = (listener.accept()[0], client)
+        finally:
+            listener.close()
+
+    for sock in pair:
+        sock.setblocking(False)
+
+    return pair
+
+
+def _select(sockets, timeout):
+    """Return those of `sockets` ready to read within `timeout`"""
+    try:
+        return select.select(sockets, [], [], timeout)[0]
+    except (select.error, OSError) as e:
+        if e.args[0] != errno.EINTR:
+            raise
+        return []
+
+
+def _drain(sock):
+    try:
+        while sock.recv(4096):
+            pass
+    except (IOError, OSError):
+        pass
+
+
+def _is_socket_path(address):
+    """Return whether `address` is the path of a Unix socket"""
+    return isinstance(address, six.string_types)
+
+
+def _unix_family():
+    try:
+        return socket.AF_UNIX
+    except AttributeError:
+        raise RuntimeError("Unix sockets are not supported "
+                           "on this platform, use a port")
+
+
+def _remove_socket(path):
+    """Remove socket at `path`, left behind by a previous server"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _elapsed(times, start, end):
+    """Return seconds between `start` and `end`, if both happened"""
+    if start in times and end in times:
+        return times[end] - times[start]
 
 
 def kill():
@@ -95,12 +1003,35 @@ def kill():
     return self.current_server.shutdown()
 
 
-def _server(port, service):
-    server = RpcServer(
+def _server(port, service, backend="threaded", **kwargs):
+    """Return server of `service` at `port`
+
+    Arguments:
+        port (int or str): Port at which to listen for incoming
+            requests, or the path of a Unix socket to listen on
+            instead, for clients on the same machine.
+        service (RpcService): Service responding to requests
+        backend (str, optional): Either "threaded", serving
+            connections from a pool of threads, or "asyncio",
+            serving all connections from a single event loop.
+        **kwargs: Limits passed to the server
+
+    """
+
+    if backend == "asyncio":
+        from .async_server import AsyncRpcServer as cls
+    elif backend == "threaded":
+        cls = RpcServer
+    else:
+        raise ValueError("Unknown backend \"%s\", use either "
+                         "\"threaded\" or \"asyncio\"" % backend)
+
+    server = cls(
         "/pyblish",
-        ("127.0.0.1", port),
+        port if _is_socket_path(port) else ("127.0.0.1", port),
         allow_none=True,
-        logRequests=False)
+        logRequests=False,
+        **kwargs)
 
     server.register_function(kill)
     server.register_introspection_functions()
@@ -111,36 +1042,52 @@ def _server(port, service):
     return server
 
 
-def _serve(port, service=None):
+def _serve(port, service=None, backend="threaded", **kwargs):
     if service is None:
         service = service_.RpcService()
 
-    server = _server(port, service)
-    print("Listening on %s:%s" % server.server_address)
-    server.serve_forever()
+    server = _server(port, service, backend, **kwargs)
+
+    if _is_socket_path(server.server_address):
+        print("Listening on %s" % server.server_address)
+    else:
+        print("Listening on %s:%s" % server.server_address)
 
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
 
-def start_production_server(port, service=None):
+
+def start_production_server(port, service=None, backend="threaded",
+                            **kwargs):
     """Run server with optimisations
 
     Arguments:
-        port (int): Port at which to listen for incoming requests
+        port (int or str): Port at which to listen for incoming
+            requests, or path of a Unix socket, see _server()
         service (RpcService): Service responding to requests
+        backend (str, optional): "threaded" or "asyncio", see _server()
+        **kwargs: Limits passed to the server, e.g. `workers`
 
     """
 
-    return _serve(port, service)
+    return _serve(port, service, backend, **kwargs)
 
 
-def start_async_production_server(port, service=None):
+def start_async_production_server(port, service=None, backend="threaded",
+                                  **kwargs):
     """Start a threaded version of production server
 
+    Pass `backend="asyncio"` to serve connections from an event loop
+    in that thread, rather than a thread each.
+
     Returns Thread object.
 
     """
 
     def worker():
-        start_production_server(port, service)
+        start_production_server(port, service, backend, **kwargs)
 
     thread = threading.Thread(target=worker)
     thread.daemon = True
@@ -5,6 +5,7 @@ import sys
 import time
 import getpass
 import logging
+import threading
 import traceback
 
 # Pyblish Library
@@ -13,22 +14,72 @@ import pyblish.lib
 import pyblish.plugin
 
 # Local Library
-from . import version, mocking, formatting
+from . import (
+    version,
+    formatting,
+    registry,
+    delta,
+    discovery,
+    passes,
+    sessions,
+    streaming
+)
+from . import dispatch_wrapper
 
 _log = logging.getLogger("pyblish-rpc")
 
 
 class RpcService(object):
-    _count = 0
-    __instances = property(
-        lambda self: pyblish.lib.ItemList("id", self._context))
-    __plugins = property(
-        lambda self: pyblish.lib.ItemList("id", self._plugins))
+    """Services of the host, called remotely
 
-    def __init__(self):
-        self._context = None
+    Each client has a session of its own, see :mod:`sessions`, whose
+    state is that of the session of the current call. Plug-ins are
+    shared by all sessions, and only those of modules changed since
+    last discovered are imported anew, see :mod:`discovery`.
+
+    Arguments:
+        max_sessions (int, optional): Number of sessions to keep,
+            beyond which idle sessions are evicted.
+        max_instances (int, optional): Total number of instances
+            of every session to keep, beyond which idle sessions
+            are evicted. None for no limit.
+        watch_interval (float, optional): Seconds between checks
+            for changes to modules of plug-ins, in the background.
+            Defaults to checking upon discovery only.
+
+    """
+
+    _count = 0
+    __instances = property(lambda self: self._context.registry)
+    __plugins = property(lambda self: self._plugin_registry)
+
+    # State of the session of the current call
+    _context = property(lambda self: self._state().context)
+    _provider = property(lambda self: self._state().provider)
+    _tracker = property(lambda self: self._state().tracker)
+    _passes = property(lambda self: self._state().passes)
+    _streams = property(lambda self: self._state().streams)
+    _records = property(lambda self: self._state().records)
+
+    def __init__(self, max_sessions=16, max_instances=100000,
+                 watch_interval=None):
         self._plugins = None
-        self._provider = None
+        self._plugin_registry = None
+        self._discovery = discovery.Cache()
+        self._watcher = None
+        self._sessions = sessions.Sessions(_SessionState,
+                                           lambda state: len(state.context),
+                                           max_sessions,
+                                           max_instances)
+        self._local = threading.local()
+        self._count_lock = threading.Lock()
+        self._passes_lock = threading.Lock()
+        self._profiler = None
+
+        if watch_interval is not None:
+            self._watcher = discovery.Watcher(self._discovery,
+                                              watch_interval)
+            self._watcher.start()
 
         self.reset()
 
@@ -43,20 +94,113 @@ class RpcService(object):
         }
 
     def stats(self):
-        """Return statistics about the API"""
-        return {
+        """Return statistics about the API, and each session"""
+        stats = {
             "totalRequestCount": self._count,
+            "discovery": self._discovery.stats(),
         }
 
+        stats.update(self._sessions.stats())
+
+        return stats
+
     def reset(self):
-        self._context = pyblish.api.Context()
-        self._plugins = pyblish.api.discover()
-        self._provider = pyblish.plugin.Provider()
+        """Discover plug-ins anew, and start over with an empty context
+
+        Only the context of the current session is replaced.
+
+        """
+
+        formatting.clear_cache()
+
+        self._plugins = self._discover()
+        self._plugin_registry = registry.Registry(self._plugins, "plug-in")
+
+        self.reset_context()
+
+    def reset_context(self):
+        """Start over with an empty context, leaving plug-ins alone
+
+        Only the context of the current session is replaced.
+
+        """
+
+        state = self._state()
+        state.context = registry.IndexedContext()
+        state.provider = pyblish.plugin.Provider()
+        self._update_metadata()
+        state.tracker.reset()
+
+    def _session(self):
+        """Return session of the current call"""
+        session = getattr(self._local, "session", None)
+
+        if session is None:
+            # Outside of a call, e.g. from the host itself
+            session = self._sessions.get(sessions.current())
+
+        return session
+
+    def _state(self):
+        return self._session().state
+
+    def _within(self, session, func, *args, **kwargs):
+        """Call `func` within `session`, from any thread"""
+        previous = getattr(self._local, "session", None)
+        self._local.session = session
+
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._local.session = previous
+
+    def _discover(self):
+        return self._discovery.discover()
+
+    def context(self, fields=None):
+        """Return the context in full
+
+        Arguments:
+            fields (dict, optional): Selection of data and instances,
+                see formatting.format_data()
+
+        """
+
+        self._update_metadata()
+        return formatting.format_context(self._context, fields)
+
+    def changes(self, since=None, fields=None):
+        """Return changes to the context since revision `since`
+
+        Arguments:
+            since (int, optional): Revision last seen by the client.
+                Pass None to request the full state.
+            fields (dict, optional): Selection of data and instances,
+                see formatting.format_data(). Changes are relative
+                to what was last seen of the same selection.
+
+        Returns:
+            Changes since `since`, or the full state if changes
+                from `since` are no longer available. See
+                schema/changes.json and schema/state.json.
+
+        """
+
+        self._update_metadata()
+        return self._tracker.changes(self._context, since, fields)
+
+    def _update_metadata(self):
+        """Append additional metadata to context
+
+        The revision is bumped only if metadata other than
+        the time of connection changed, see delta.UNTRACKED.
+
+        """
 
-    def context(self):
-        # Append additional metadata to context
         port = os.environ.get("PYBLISH_CLIENT_PORT", -1)
         hosts = ", ".join(reversed(pyblish.api.registered_hosts()))
+        data = self._context.data
+        changed = False
 
         for key, value in {"host": hosts,
                            "port": int(port),
@@ -66,14 +210,47 @@ class RpcService(object):
                            "pyblishRPCVersion": version,
                            "pythonVersion": sys.version}.items():
 
-            self._context.data[key] = value
+            if key not in delta.UNTRACKED and data.get(key) != value:
+                changed = True
+
+            data[key] = value
 
-        return formatting.format_context(self._context)
+        if changed:
+            self._tracker.bump()
 
     def discover(self):
         return formatting.format_plugins(self._plugins)
 
-    def process(self, plugin, instance=None, action=None):
+    def configure_records(self, detail=None, level=None):
+        """Set which records results carry, from now on
+
+        Arguments:
+            detail (str, optional): Members of each record, either
+                "minimal", "standard" or "full", see
+                formatting.format_record(). Defaults to "full".
+            level (int, optional): Exclude records below this level,
+                e.g. 20 for INFO. Defaults to all records.
+
+        Returns:
+            The configuration in effect
+
+        """
+
+        records = dict(self._records)
+
+        if detail is not None:
+            formatting.check_detail(detail)
+            records["detail"] = detail
+
+        if level is not None:
+            records["level"] = level
+
+        self._state().records = records
+
+        return records
+
+    def process(self, plugin, instance=None, action=None, call=None,
+                records=None):
         """Given JSON objects from client, perform actual processing
 
         Arguments:
@@ -81,6 +258,11 @@ class RpcService(object):
             instance (dict, optional): JSON representation of Instance to
                 be processed.
             action (str, optional): Id of action to process
+            call (str, optional): Id, chosen by the client, with which
+                to fetch records via records() whilst processing. The
+                result then carries only records not already fetched.
+            records (dict, optional): "detail" and "level" of records
+                for this call only, see configure_records()
 
         """
 
@@ -88,36 +270,220 @@ class RpcService(object):
         instance_obj = (self.__instances[instance["id"]]
                         if instance is not None else None)
 
-        result = pyblish.plugin.process(
-            plugin=plugin_obj,
-            context=self._context,
-            instance=instance_obj,
-            action=action)
-
-        return formatting.format_result(result)
+        return self._run(pyblish.plugin.process, call, records,
+                         plugin=plugin_obj,
+                         context=self._context,
+                         instance=instance_obj,
+                         action=action)
 
-    def repair(self, plugin, instance=None):
+    def repair(self, plugin, instance=None, call=None, records=None):
         plugin_obj = self.__plugins[plugin["id"]]
         instance_obj = (self.__instances[instance["id"]]
                         if instance is not None else None)
 
-        result = pyblish.plugin.repair(
-            plugin=plugin_obj,
-            context=self._context,
-            instance=instance_obj)
+        return self._run(pyblish.plugin.repair, call, records,
+                         plugin=plugin_obj,
+                         context=self._context,
+                         instance=instance_obj)
+
+    def records(self, call, since=0):
+        """Return records of running `call` from sequence `since` onwards
+
+        Arguments:
+            call (str): Id of call, as passed to process() or repair()
+            since (int, optional): Sequence number of first record,
+                i.e. the number of records already fetched.
+
+        """
+
+        stream = self._streams.get(call)
+
+        if stream is None:
+            return {"records": [], "next": since,
+                    "dropped": 0, "running": False}
+
+        return stream.fetch(since)
+
+    def _run(self, func, call, records=None, **kwargs):
+        """Produce formatted result of `func`, streaming records of `call`"""
+        records = dict(self._records, **(records or {}))
+        detail, level = records["detail"], records["level"]
+
+        if call is None:
+            result = func(**kwargs)
+            self._tracker.bump()
+            return formatting.format_result(result, detail, level)
+
+        stream = self._streams[call] = streaming.RecordStream(
+            detail=detail, level=level)
+
+        try:
+            with streaming.capture(stream):
+                result = func(**kwargs)
+        finally:
+            self._streams.pop(call)
+
+        self._tracker.bump()
+
+        # Every record, including those already streamed and those of
+        # threads spawned by the plug-in, which are not streamed
+        return formatting.format_result(result, detail, level)
+
+    def start_pass(self, plugins=None, orders=None):
+        """Process plug-ins in order, on the host, as one pass
+
+        Each step is processed as though requested via process(),
+        including going through any registered dispatch wrapper.
+        Results are fetched incrementally via poll_pass().
+
+        The session is held until the pass has finished, such
+        that it is never evicted from underneath the pass.
+
+        Arguments:
+            plugins (list, optional): Ids of plug-ins to process,
+                defaults to every active plug-in.
+            orders (list, optional): Lower and upper bound of
+                orders to process, lower inclusive, either may
+                be None for no bound.
+
+        Returns:
+            Id of pass
+
+        """
+
+        if plugins is None:
+            plugin_objs = self._plugins
+        else:
+            plugin_objs = sorted((self.__plugins[id_] for id_ in plugins),
+                                 key=lambda p: p.order)
+
+        if orders is not None:
+            lower, upper = orders
+            plugin_objs = [p for p in plugin_objs
+                           if (lower is None or p.order >= lower)
+                           and (upper is None or p.order < upper)]
+
+        # Steps are processed from the thread of the pass
+        session = self._sessions.acquire(self._session().id)
+
+        def step(plugin, instance):
+            wrapper = dispatch_wrapper() or _default_wrapper
+            return wrapper(self._within, session, self.process,
+                           {"id": plugin.id},
+                           {"id": instance.id}
+                           if instance is not None else None)
+
+        pass_ = passes.Pass(plugin_objs,
+                            self._context,
+                            step,
+                            toggles=plugins is None,
+                            on_finish=lambda: self._sessions.release(session))
+
+        # Keep the most recent passes only
+        with self._passes_lock:
+            self._passes.append(pass_)
+            self._passes[:] = self._passes[-8:]
+
+        pass_.start()
+
+        return pass_.id
+
+    def poll_pass(self, id, cursor=0, timeout=0):
+        """Return results of pass `id` from `cursor` onwards
+
+        Arguments:
+            id (str): Id of pass, as returned by start_pass()
+            cursor (int, optional): Number of results already fetched
+            timeout (float, optional): Seconds to block awaiting
+                new results, 0 returns immediately.
+
+        Returns:
+            Dictionary of results, the next cursor and whether
+                the pass has finished or was stopped.
+
+        """
 
-        return formatting.format_result(result)
+        return self._pass(id).poll(cursor, timeout)
+
+    def stop_pass(self, id):
+        """Stop pass `id` once its current step has finished"""
+        self._pass(id).stop()
+
+    def _pass(self, id):
+        with self._passes_lock:
+            for pass_ in self._passes:
+                if pass_.id == id:
+                    return pass_
+
+        raise KeyError("No pass with id \"%s\"" % id)
+
+    def profile_start(self, mode="sample", methods=None, interval=0.005):
+        """Start profiling calls, e.g. whilst a slow call is running
+
+        Arguments:
+            mode (str, optional): "sample" for low-overhead sampling of
+                the stacks of running calls, or "cprofile" to profile
+                calls made from now on in full.
+            methods (list, optional): Names of methods to profile,
+                defaults to every method.
+            interval (float, optional): Seconds between samples
+
+        Returns:
+            Mode and path of the file on the host to which results
+                are written, a new file in its temporary directory.
+
+        """
+
+        if self._profiler is not None:
+            raise ValueError("Already profiling, see profile_stop()")
+
+        # Imported on demand, being of no use until then
+        from . import profiling
+
+        profiler = profiling.create(mode, RpcService._dispatch,
+                                    methods, interval)
+        profiler.start()
+
+        self._profiler = profiler
+
+        return {
+            "mode": profiler.mode,
+            "path": profiler.path,
+        }
+
+    def profile_stop(self, top=20):
+        """Stop profiling and return summary of the `top` functions
+
+        Results are written to the host as pstats, or collapsed
+        stacks when sampling, at the "path" of the summary.
+
+        """
+
+        profiler, self._profiler = self._profiler, None
+
+        if profiler is None:
+            raise ValueError("Not profiling, see profile_start()")
+
+        return profiler.stop(top)
 
     def _dispatch(self, method, params):
         """Customise exception handling"""
-        self._count += 1
+        with self._count_lock:
+            self._count += 1
 
         func = getattr(self, method)
+        profiler = self._profiler
+        session = self._sessions.acquire(sessions.current())
         try:
-            return func(*params)
+            if profiler is not None:
+                return self._within(session, profiler.call,
+                                    method, func, params)
+            return self._within(session, func, *params)
         except Exception as e:
             traceback.print_exc()
             raise e
+        finally:
+            self._sessions.release(session)
 
     def emit(self, signal, kwargs):
         """Trigger registered callbacks
@@ -139,6 +505,24 @@ class RpcService(object):
 
         pyblish.api.emit(signal, **kwargs)
 
+        self._tracker.bump()
+
+
+class _SessionState(object):
+    """State of the session of one client, see :mod:`sessions`"""
+
+    def __init__(self):
+        self.context = registry.IndexedContext()
+        self.provider = pyblish.plugin.Provider()
+        self.tracker = delta.Tracker()
+        self.passes = list()
+        self.streams = dict()
+        self.records = {"detail": "full", "level": logging.NOTSET}
+
+
+def _default_wrapper(func, *args, **kwargs):
+    return func(*args, **kwargs)
+
 
 class MockRpcService(RpcService):
     def __init__(self, delay=0.01, *args, **kwargs):
@@ -146,12 +530,12 @@ class MockRpcService(RpcService):
         self.delay = delay
 
     def discover(self):
+        from . import mocking
         return formatting.format_plugins(mocking.plugins)
 
-    def reset(self):
-        self._context = pyblish.api.Context()
-        self._plugins = pyblish.lib.ItemList("id", mocking.plugins)
-        self._provider = pyblish.plugin.Provider()
+    def _discover(self):
+        from . import mocking
+        return mocking.plugins
 
     def process(self, *args, **kwargs):
         time.sleep(self.delay)
@@ -0,0 +1,188 @@
+"""State of each client, kept apart from that of others
+
+Clients identify their session via the :data:`HEADER` request
+header, and the server attributes each call to it, see :func:`scope`.
+Clients sending none share the default session, of id None.
+
+Each session has a context of its own, along with its revisions,
+passes and records, such that one client resetting or processing
+leaves those of others untouched. Plug-ins are discovered once
+and shared by every session.
+
+Attributes:
+    HEADER: Name of request header carrying the id of a session
+
+"""
+
+import time
+import threading
+import contextlib
+
+HEADER = "X-Pyblish-Session"
+
+_local = threading.local()
+
+
+@contextlib.contextmanager
+def scope(id):
+    """Attribute calls made within, from this thread, to session `id`"""
+    previous = current()
+    _local.id = id
+
+    try:
+        yield
+    finally:
+        _local.id = previous
+
+
+def current():
+    """Return id of session of this thread, None for the default"""
+    return getattr(_local, "id", None)
+
+
+class Session(object):
+    """State of one client
+
+    Arguments:
+        id (str): Id of session, None for the default session
+        state (object): State of the client, e.g. its context
+
+    Attributes:
+        calls (int): Number of calls made within this session
+        active (int): Number of calls currently in progress
+
+    """
+
+    def __init__(self, id, state):
+        self.id = id
+        self.state = state
+        self.created = time.time()
+        self.used = self.created
+        self.calls = 0
+        self.active = 0
+
+    def stats(self, size):
+        return {
+            "calls": self.calls,
+            "active": self.active,
+            "size": size,
+            "age": time.time() - self.created,
+            "idle": time.time() - self.used,
+        }
+
+
+class Sessions(object):
+    """Sessions by id, evicting those least recently used
+
+    Once there are more than `max_sessions`, or the total size of
+    every session exceeds `max_size`, idle sessions are evicted,
+    least recently used first. Sessions with a call in progress
+    are never evicted, nor is the default session.
+
+    Arguments:
+        factory (callable): Return the state of a new session
+        size (callable): Return the size of the state of a session,
+            in whatever unit `max_size` is.
+        max_sessions (int, optional): Number of sessions to keep
+        max_size (int, optional): Total size of sessions to keep,
+            None for no limit.
+
+    Attributes:
+        evicted (int): Number of sessions evicted
+
+    """
+
+    def __init__(self, factory, size, max_sessions=16, max_size=None):
+        self.max_sessions = max_sessions
+        self.max_size = max_size
+        self.evicted = 0
+
+        self._factory = factory
+        self._size = size
+        self._sessions = dict()
+        self._order = list()  # Ids, least recently used first
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def acquire(self, id):
+        """Return session `id`, created if need be, for a call
+
+        Pair with :meth:`release` once the call is done.
+
+        """
+
+        with self._lock:
+            session = self._sessions.get(id)
+
+            if session is None:
+                session = self._sessions[id] = Session(id, self._factory())
+            else:
+                self._order.remove(id)
+
+            self._order.append(id)
+            session.used = time.time()
+            session.calls += 1
+            session.active += 1
+
+            self._evict()
+
+        return session
+
+    def release(self, session):
+        with self._lock:
+            session.active -= 1
+
+    def get(self, id):
+        """Return session `id`, created if need be, outside of a call"""
+        with self._lock:
+            session = self._sessions.get(id)
+
+            if session is None:
+                session = self._sessions[id] = Session(id, self._factory())
+                self._order.append(id)
+                self._evict()
+
+        return session
+
+    def stats(self):
+        """Return count and statistics of each session, by id
+
+        The default session is listed as "default".
+
+        """
+
+        with self._lock:
+            sessions = [self._sessions[id] for id in self._order]
+
+        return {
+            "sessionCount": len(sessions),
+            "evictedSessionCount": self.evicted,
+            "sessions": dict(
+                ("default" if session.id is None else session.id,
+                 session.stats(self._size(session.state)))
+                for session in sessions
+            ),
+        }
+
+    def _evict(self):
+        """Evict idle sessions, least recently used first, if need be"""
+        for id in list(self._order):
+            if not self._full():
+                break
+
+            if id is None or self._sessions[id].active:
+                continue
+
+            del self._sessions[id]
+            self._order.remove(id)
+            self.evicted += 1
+
+    def _full(self):
+        if len(self._sessions) > self.max_sessions:
+            return True
+
+        return self.max_size is not None and sum(
+            self._size(session.state)
+            for session in self._sessions.values()) > self.max_size
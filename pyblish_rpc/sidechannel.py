@@ -0,0 +1,94 @@
+"""Side channel for large responses between local processes
+
+Rather than through the socket, a large response may be written to
+a file, in shared memory where available, with only its path sent
+in place of the body. The client maps the file and decodes it
+where it lies, rather than reading it into a buffer of its own.
+
+Clients ask for this via the :data:`HEADER` request header, and
+the server answers with the path of the file via the same header
+of the response, whose body is then empty. Any other response,
+such as one too small to be worth it, is sent inline as usual.
+
+A file is removed by the client once read, or by the server on
+the next request over the same connection, or its closing.
+
+Attributes:
+    HEADER: Name of request and response header of the side channel
+
+"""
+
+import os
+import mmap
+import shutil
+import tempfile
+import contextlib
+
+from .vendor.six.moves.urllib.parse import quote, unquote
+
+HEADER = "X-Pyblish-Side-Channel"
+
+# Backed by memory rather than disk, where available
+_shared_memory = "/dev/shm"
+
+
+def directory():
+    """Return a new directory for the files of a server"""
+    root = _shared_memory if os.path.isdir(_shared_memory) else None
+    return tempfile.mkdtemp(prefix="pyblish-rpc-", dir=root)
+
+
+def write(directory, data):
+    """Write `data` to a new file in `directory`
+
+    Only the current user may read the file.
+
+    Returns:
+        Value of :data:`HEADER` for the file
+
+    """
+
+    fd, path = tempfile.mkstemp(dir=directory)
+
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+    except Exception:
+        remove(path)
+        raise
+
+    return quote(path)
+
+
+@contextlib.contextmanager
+def mapped(header):
+    """Map the file of `header` for reading, and remove it once done
+
+    Arguments:
+        header (str): Value of :data:`HEADER` of a response
+
+    """
+
+    path = unquote(header)
+
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    try:
+        yield buffer
+    finally:
+        buffer.close()
+        remove(header)
+
+
+def remove(header):
+    """Remove the file of `header`, unless already removed"""
+    try:
+        os.remove(unquote(header))
+    except OSError:
+        pass
+
+
+def remove_directory(directory):
+    """Remove `directory` along with any files left in it"""
+    shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,125 @@
+"""Live streaming of log records during long-running calls
+
+Records otherwise only reach the client once processing finishes.
+Whilst a call is running, records are formatted as they are emitted
+and kept in a bounded buffer from which a client fetches them by
+sequence number.
+
+"""
+
+import logging
+import threading
+import itertools
+import contextlib
+import collections
+
+from . import formatting
+
+
+class RecordStream(logging.Handler):
+    """Ring buffer of formatted records
+
+    Records are numbered in the order emitted, starting at 0.
+    Once full, the oldest records are dropped to make room.
+    Records below `level` are never buffered.
+
+    Arguments:
+        size (int, optional): Maximum number of records buffered
+        detail (str, optional): Detail of records, see
+            formatting.format_record()
+        level (int, optional): Exclude records below this level
+
+    """
+
+    def __init__(self, size=1000, detail="full", level=logging.NOTSET):
+        formatting.check_detail(detail)
+
+        # Not using super(), for compatibility with Python 2.6
+        logging.Handler.__init__(self, level)
+
+        self.running = True
+        self.detail = detail
+
+        self._records = collections.deque(maxlen=size)
+        self._next = 0
+        self._delivered = 0
+        self._guard = threading.Lock()
+
+    def emit(self, record):
+        formatted = formatting.format_record(record, self.detail)
+
+        with self._guard:
+            self._records.append(formatted)
+            self._next += 1
+
+    def fetch(self, since=0):
+        """Return records from sequence number `since` onwards
+
+        Records returned are considered delivered.
+
+        Returns:
+            Dictionary of records, sequence number of the next
+                record, the number of requested records which were
+                dropped from the buffer and whether the call is
+                still running.
+
+        """
+
+        with self._guard:
+            first = self._next - len(self._records)
+            start = max(since, first)
+
+            records = list(itertools.islice(self._records,
+                                            start - first, None))
+
+            self._delivered = max(self._delivered, self._next)
+
+            return {
+                "records": records,
+                "next": self._next,
+                "dropped": start - since if since < first else 0,
+                "running": self.running,
+            }
+
+    def undelivered(self):
+        """Return records not yet fetched, and still buffered"""
+        with self._guard:
+            first = self._next - len(self._records)
+            start = max(self._delivered, first)
+            return list(itertools.islice(self._records,
+                                         start - first, None))
+
+
+class ThreadFilter(logging.Filter):
+    """Pass records emitted from the thread which created the filter"""
+
+    def __init__(self):
+        logging.Filter.__init__(self)
+        self.thread = threading.current_thread().ident
+
+    def filter(self, record):
+        return record.thread == self.thread
+
+
+@contextlib.contextmanager
+def capture(stream):
+    """Stream records emitted from this thread, for the duration of the block
+
+    Records are captured from the root logger, as processing does,
+    but only those of the calling thread, such that concurrent calls
+    each stream records of their own.
+
+    """
+
+    thread_filter = ThreadFilter()
+    stream.addFilter(thread_filter)
+
+    logger = logging.getLogger()
+    logger.addHandler(stream)
+
+    try:
+        yield stream
+    finally:
+        logger.removeHandler(stream)
+        stream.removeFilter(thread_filter)
+        stream.running = False
@@ -9,9 +9,6 @@ path = os.path.dirname(__file__)
 package_path = os.path.join(path, "pyblish_rpc")
 sys.path.insert(0, os.path.abspath(package_path))
 
-import pyblish_rpc
-pyblish_rpc.register_vendor_packages()
-
 import nose
 
 
@@ -10,9 +10,6 @@ repo_dir = os.path.dirname(test_path)
 package_path = os.path.join(repo_dir, "pyblish_rpc")
 sys.path.insert(0, package_path)
 
-import pyblish_rpc
-pyblish_rpc.register_vendor_packages()
-
 import nose
 
 
@@ -0,0 +1,169 @@
+"""The asyncio server behaves like the threaded one"""
+
+import sys
+import socket
+import threading
+
+import pyblish.api
+
+import pyblish_rpc.client
+import pyblish_rpc.server
+import pyblish_rpc.service
+
+from nose.tools import (
+    with_setup,
+    assert_equals,
+    assert_true,
+)
+from nose.plugins.skip import SkipTest
+
+self = sys.modules[__name__]
+self.server = None
+self.thread = None
+self.port = None
+
+
+def setup():
+    try:
+        import asyncio
+    except ImportError:
+        raise SkipTest("asyncio requires Python 3.4+")
+
+    service = pyblish_rpc.service.RpcService()
+    self.server = pyblish_rpc.server._server(0, service, backend="asyncio")
+    self.port = self.server.server_address[1]
+    self.thread = threading.Thread(target=self.server.serve_forever)
+    self.thread.daemon = True
+    self.thread.start()
+
+
+def teardown():
+    self.server.shutdown()
+    self.server.server_close()
+    self.thread.join(timeout=10)
+    assert not self.thread.is_alive()
+
+
+def setup_empty():
+    pyblish.api.deregister_all_paths()
+    pyblish.api.deregister_all_plugins()
+
+
+@with_setup(setup_empty)
+def test_protocols():
+    """Calls are answered over each protocol, including faults"""
+
+    class CollectA(pyblish.api.ContextPlugin):
+        order = pyblish.api.CollectorOrder
+
+        def process(self, context):
+            context.create_instance("A")
+
+    pyblish.api.register_plugin(CollectA)
+
+    for protocol in ("xmlrpc", "json"):
+        host = pyblish_rpc.client.Proxy(self.port, protocol=protocol)
+
+        assert_true(host.ping())
+        host.reset()
+
+        plugin, = host.discover()
+        result = host.process(plugin, host.context())
+        assert_equals(result["error"], None)
+        assert_equals([i.name for i in host.context()], ["A"])
+
+        try:
+            host._proxy.process({"id": "Unknown"}, None, None)
+        except pyblish_rpc.client.Fault as fault:
+            assert_true("Unknown" in fault.faultString)
+        else:
+            raise AssertionError("Should have failed")
+
+        assert_true("kill" in host.system.listMethods())
+
+        stats = host.stats()
+        assert_true(stats["methods"]["process"]["count"] > 0)
+        assert_true(stats["connectionCount"] > 0)
+
+        host.transport.close()
+
+
+def test_idle_connections():
+    """Idle connections don't hold up others"""
+    idle = list()
+    for _ in range(50):
+        idle.append(socket.create_connection(("127.0.0.1", self.port)))
+
+    # A partial request, never completed
+    idle[0].sendall(b"POST /pyblish HTTP/1.1\r\nContent-Length: 10\r\n\r\n")
+
+    host = pyblish_rpc.client.Proxy(self.port)
+    assert_true(host.ping())
+    assert_true(host.stats()["connectionCount"] > 50)
+    host.transport.close()
+
+    for connection in idle:
+        connection.close()
+
+
+def test_fragmented():
+    """Requests received in many parts are answered"""
+    body = (b"<?xml version='1.0'?><methodCall>"
+            b"<methodName>ping</methodName><params></params></methodCall>")
+    request = (b"POST /pyblish HTTP/1.1\r\n"
+               b"Content-Type: text/xml\r\n"
+               b"Content-Length: %d\r\n\r\n" % len(body)) + body
+
+    connection = socket.create_connection(("127.0.0.1", self.port))
+
+    try:
+        for index in range(len(request)):
+            connection.sendall(request[index:index + 1])
+
+        response = b""
+        while b"</methodResponse>" not in response:
+            data = connection.recv(4096)
+            assert_true(data, response)
+            response += data
+
+        assert_true(response.startswith(b"HTTP/1.1 200"), response)
+        assert_true(b"Hello" in response, response)
+
+    finally:
+        connection.close()
+
+
+def test_metrics():
+    """Metrics are served in plain text, other paths are not found"""
+    try:
+        import httplib
+    except ImportError:
+        import http.client as httplib
+
+    connection = httplib.HTTPConnection("127.0.0.1", self.port)
+
+    connection.request("GET", "/metrics")
+    response = connection.getresponse()
+    text = response.read().decode("utf-8")
+    assert_equals(response.status, 200)
+    assert_true("pyblish_rpc_queue_depth" in text, text)
+
+    # Compressed, if accepted
+    connection.request("GET", "/metrics",
+                       headers={"Accept-Encoding": "gzip"})
+    response = connection.getresponse()
+    body = response.read()
+    assert_equals(response.getheader("Content-Encoding"), "gzip")
+    assert_true(len(body) < len(text), (len(body), len(text)))
+
+    connection.request("GET", "/health")
+    response = connection.getresponse()
+    assert_true(b'"alive":true' in response.read())
+
+    # On the same connection
+    connection.request("GET", "/unknown")
+    response = connection.getresponse()
+    response.read()
+    assert_equals(response.status, 404)
+
+    connection.close()
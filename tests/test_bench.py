@@ -0,0 +1,52 @@
+import os
+import sys
+import tempfile
+
+from pyblish_rpc import bench
+
+from nose.tools import (
+    assert_equals,
+    assert_true,
+)
+from nose.plugins.skip import SkipTest
+
+
+def test_bench():
+    """Benchmarks run and their results survive a round-trip to disk"""
+    results = bench.run(iterations=3, instances=3, protocols=["json"],
+                        backends=["threaded"])
+
+    benchmarks = results["rpc"]["threaded"]["json"]
+    assert_equals(sorted(benchmarks),
+                  ["context", "context.listing", "context.side_channel",
+                   "discover", "emit", "health", "process"])
+    assert_true("format_context" in results["formatting"])
+    assert_equals(results["imports"]["pyblish_rpc.server"]["calls"], 3)
+
+    for summary in benchmarks.values():
+        assert_equals(summary["calls"], 3)
+        assert_true(summary["p50"] <= summary["p99"])
+        assert_true(summary["bytesPerCall"] > 0)
+
+    path = os.path.join(tempfile.mkdtemp(), "results.json")
+    bench.save(results, path)
+
+    for name in ("threaded.json.process", "import.pyblish_rpc.server"):
+        assert_true(name in bench.compare(bench.load(path), results))
+        assert_true(name in bench.report(results))
+
+
+def test_import_breakdown():
+    """Imports are broken down by module, where supported"""
+    from pyblish_rpc.bench import imports
+
+    if sys.version_info < (3, 7):
+        raise SkipTest("A breakdown requires Python 3.7+")
+
+    names = [name for name, _, _ in imports.breakdown("pyblish_rpc.server")]
+    assert_equals(names[0], "pyblish_rpc.server")
+    assert_true("pyblish_rpc.service" in names)
+
+    # Loaded on first use
+    assert_true("jsonschema" not in names)
+    assert_true("pyblish_rpc.mocking" not in names)
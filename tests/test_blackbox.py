@@ -1,6 +1,11 @@
 """Assume behaviour on part of the core Pyblish library"""
 
+import os
 import sys
+import time
+import socket
+import inspect
+import subprocess
 
 import pyblish_rpc.client
 import pyblish_rpc.server
@@ -13,6 +18,7 @@ import pyblish.logic
 from nose.tools import (
     with_setup,
     assert_equals,
+    assert_raises,
     assert_true
 )
 
@@ -48,7 +54,9 @@ def setup():
 
 
 def teardown():
+    self.host.transport.close()
     self.server.shutdown()
+    self.server.server_close()
     self.thread.join(timeout=10)
     assert not thread.isAlive()
 
@@ -199,6 +207,514 @@ def test_ping():
     assert_true(message)
 
 
+def test_stats():
+    """Statistics include those of the server"""
+    self.host._proxy.ping()  # Dispatched, unlike Proxy.ping()
+
+    stats = self.host.stats()
+    assert_true(stats["totalRequestCount"] > 0)
+    assert_true(stats["workers"] > 0)
+    assert_equals(stats["rejectedCount"], 0)
+
+    ping = stats["methods"]["ping"]
+    assert_true(ping["count"] > 0)
+    assert_true(ping["bytesReceived"] > 0)
+    assert_true(ping["bytesSent"] > 0)
+    assert_equals(ping["execution"]["count"], ping["count"])
+
+
+def test_dispatch_wrapper():
+    """Only calls touching the host go through the dispatch wrapper"""
+    import threading
+    import pyblish_rpc
+
+    wrapped = list()
+
+    def wrapper(func, *args, **kwargs):
+        wrapped.append(args[0])
+        return func(*args, **kwargs)
+
+    pyblish_rpc.register_dispatch_wrapper(wrapper)
+
+    try:
+        before = self.host.stats()
+
+        self.host._proxy.ping()
+        assert_equals(wrapped, [])
+
+        # Concurrent calls hop together, at most one hop each
+        hosts = [pyblish_rpc.client.Proxy(port) for _ in range(4)]
+        threads = [threading.Thread(target=host._proxy.discover)
+                   for host in hosts]
+        for thread_ in threads:
+            thread_.start()
+        for thread_ in threads:
+            thread_.join()
+
+        stats = self.host.stats()
+
+        for host in hosts:
+            host.transport.close()
+
+    finally:
+        pyblish_rpc.deregister_dispatch_wrapper()
+
+    calls = sum(len(batch) for batch in wrapped)
+    assert_equals(calls, 4)
+    assert_equals(stats["mainThreadCalls"] - before["mainThreadCalls"], 4)
+    assert_equals(stats["mainThreadHops"] - before["mainThreadHops"],
+                  len(wrapped))
+
+    wait = stats["methods"]["discover"]["wrapperWait"]
+    assert_true(wait["count"] >= 4, wait)
+    assert_equals(stats["methods"]["ping"]["wrapperWait"]["count"], 0)
+
+
+@with_setup(setup_empty)
+def test_dispatch_wrapper_interactive():
+    """Interactive calls are not held up by other calls being wrapped"""
+    import threading
+    import pyblish_rpc
+
+    entered = threading.Event()
+    release = threading.Event()
+    finished = threading.Event()
+
+    class ExtractSlowly(pyblish.api.ContextPlugin):
+        order = pyblish.api.ExtractorOrder
+
+        def process(self, context):
+            entered.set()
+            release.wait(5)
+            finished.set()
+
+    def wrapper(func, *args, **kwargs):
+        return func(*args, **kwargs)
+
+    pyblish.api.register_plugin(ExtractSlowly)
+    self.host.reset()
+    plugin, = self.host.discover()
+    context = self.host.context()
+
+    pyblish_rpc.register_dispatch_wrapper(wrapper)
+
+    busy = pyblish_rpc.client.Proxy(port)
+    thread = threading.Thread(target=busy.process, args=(plugin, context))
+
+    try:
+        thread.start()
+        entered.wait(5)
+
+        # Whilst the batch of process() is still running
+        assert_equals(list(self.host.context()), [])
+        assert_true(not finished.is_set())
+
+    finally:
+        release.set()
+        pyblish_rpc.deregister_dispatch_wrapper()
+
+    thread.join(5)
+    busy.transport.close()
+
+
+@with_setup(setup_empty)
+def test_sessions():
+    """Each session has a context of its own, and plug-ins in common"""
+
+    class CollectA(pyblish.api.ContextPlugin):
+        order = pyblish.api.CollectorOrder
+
+        def process(self, context):
+            context.create_instance("A")
+
+    pyblish.api.register_plugin(CollectA)
+
+    gui = pyblish_rpc.client.Proxy(port, session="gui")
+    batch = pyblish_rpc.client.Proxy(port, session="batch", protocol="xmlrpc")
+
+    gui.reset()
+    plugin, = gui.discover()
+    assert_equals([p.id for p in batch.discover()], [plugin.id])
+
+    gui.process(plugin, gui.context())
+    assert_equals([i.name for i in gui.context()], ["A"])
+    assert_equals(list(batch.context()), [])
+
+    # Resetting one session leaves others untouched
+    batch.process(plugin, batch.context())
+    gui.reset()
+    assert_equals(list(gui.context()), [])
+    assert_equals([i.name for i in batch.context()], ["A"])
+    assert_equals(list(self.host.context()), [])
+
+    # Passes are processed within their session
+    id_ = gui._proxy.start_pass()
+    results = list()
+    while True:
+        poll = gui._proxy.poll_pass(id_, len(results), 1.0)
+        results.extend(poll["results"])
+        if poll["finished"]:
+            break
+
+    assert_equals(len(results), 1)
+    assert_equals([i.name for i in gui.context()], ["A"])
+    assert_equals([i.name for i in batch.context()], ["A"])
+
+    stats = self.host.stats()
+    assert_true(stats["sessionCount"] >= 3, stats)
+    assert_equals(stats["sessions"]["batch"]["size"], 1)
+    assert_true(stats["sessions"]["gui"]["calls"] > 0)
+
+    gui.transport.close()
+    batch.transport.close()
+
+
+@with_setup(setup_empty)
+def test_reset_context():
+    """The context is reset on its own, leaving plug-ins alone"""
+
+    class CollectA(pyblish.api.ContextPlugin):
+        order = pyblish.api.CollectorOrder
+
+        def process(self, context):
+            context.create_instance("A")
+
+    pyblish.api.register_plugin(CollectA)
+    self.host.reset()
+
+    plugin, = self.host.discover()
+    self.host.process(plugin, self.host.context())
+    assert_equals(len(self.host.context()), 1)
+
+    misses = self.host.stats()["discovery"]["misses"]
+
+    self.host.reset_context()
+    assert_equals(list(self.host.context()), [])
+    assert_equals([p.id for p in self.host.discover()], [plugin.id])
+    assert_equals(self.host.stats()["discovery"]["misses"], misses)
+
+
+@with_setup(setup_empty)
+def test_health():
+    """Health is answered whilst the host is busy"""
+    import threading
+    import pyblish_rpc
+
+    entered = threading.Event()
+    release = threading.Event()
+
+    def wrapper(func, *args, **kwargs):
+        # A host whose main thread is busy
+        entered.set()
+        release.wait(5)
+        return func(*args, **kwargs)
+
+    class CollectA(pyblish.api.ContextPlugin):
+        order = pyblish.api.CollectorOrder
+
+        def process(self, context):
+            pass
+
+    pyblish.api.register_plugin(CollectA)
+    self.host.reset()
+    plugin, = self.host.discover()
+    context = self.host.context()
+
+    assert_equals(self.host.health()["busy"], False)
+
+    pyblish_rpc.register_dispatch_wrapper(wrapper)
+
+    try:
+        busy = pyblish_rpc.client.Proxy(port)
+        thread = threading.Thread(target=busy.process,
+                                  args=(plugin, context))
+        thread.start()
+        entered.wait(5)
+
+        assert_true(self.host.ping())
+
+        health = self.host.health()
+        assert_true(health["busy"])
+        assert_equals(health["method"], "process")
+        assert_equals(health["running"][0]["method"], "process")
+
+    finally:
+        release.set()
+        pyblish_rpc.deregister_dispatch_wrapper()
+
+    thread.join(5)
+    busy.transport.close()
+
+    assert_equals(self.host.health()["running"], [])
+
+
+def test_unix_socket():
+    """Calls are answered over a Unix socket, as over TCP"""
+    import os
+    import socket
+    import shutil
+    import tempfile
+    import threading
+    import pyblish_rpc.service
+    from nose.plugins.skip import SkipTest
+
+    if not hasattr(socket, "AF_UNIX"):
+        raise SkipTest("Unix sockets are not supported on this platform")
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "pyblish.sock")
+
+    server = pyblish_rpc.server._server(
+        path, pyblish_rpc.service.RpcService())
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    try:
+        for protocol in ("xmlrpc", "json"):
+            host = pyblish_rpc.client.Proxy(path, protocol=protocol)
+            assert_true(host.ping())
+            assert_equals(host._proxy.ping()["message"],
+                          "Hello, whomever you are")
+            assert_equals(host.transport.stats()["connects"], 1)
+            host.transport.close()
+
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=10)
+
+        # Also restores the server of other tests, see kill()
+        pyblish_rpc.server.current_server = self.server
+
+    assert_true(not os.path.exists(path))
+    shutil.rmtree(directory)
+
+
+def test_metrics():
+    """Metrics are served in plain text"""
+    try:
+        import httplib
+    except ImportError:
+        import http.client as httplib
+
+    self.host._proxy.ping()
+
+    connection = httplib.HTTPConnection("127.0.0.1", port)
+    connection.request("GET", "/metrics")
+    response = connection.getresponse()
+    text = response.read().decode("utf-8")
+    connection.close()
+
+    assert_equals(response.status, 200)
+    assert_true('pyblish_rpc_requests_total{method="ping"}' in text, text)
+    assert_true("pyblish_rpc_queue_depth 0" in text, text)
+
+
+@with_setup(setup_empty)
+def test_compression():
+    """Large responses are compressed for clients accepting gzip"""
+
+    class CollectMany(pyblish.api.ContextPlugin):
+        order = pyblish.api.CollectorOrder
+
+        def process(self, context):
+            for index in range(100):
+                instance = context.create_instance("Instance%d" % index)
+                instance.data["family"] = "animation"
+
+    pyblish.api.register_plugin(CollectMany)
+    self.host.reset()
+
+    plugin, = self.host.discover()
+    self.host.process(plugin, self.host.context())
+
+    def compressed():
+        # Not via stats(), which is compressed itself
+        return self.server.metrics.stats()["compression"]["count"]
+
+    for protocol in ("xmlrpc", "json"):
+        host = pyblish_rpc.client.Proxy(port, protocol=protocol)
+        before = compressed()
+
+        assert_equals(len(host.context()), 100)
+        assert_equals(compressed(), before + 1)
+
+        # Not for clients that don't accept it
+        host.transport.accept_gzip_encoding = False
+        host.cached_revision = None
+        assert_equals(len(host.context()), 100)
+        assert_equals(compressed(), before + 1)
+
+        host.transport.close()
+
+    stats = self.host.stats()["compression"]
+    assert_true(0 < stats["ratio"] < 0.5, stats)
+    assert_true(stats["bytesOut"] < stats["bytesIn"], stats)
+
+
+def test_compressed_request():
+    """Requests compressed with gzip are decompressed"""
+    try:
+        import httplib
+        import xmlrpclib
+    except ImportError:
+        import http.client as httplib
+        import xmlrpc.client as xmlrpclib
+
+    from pyblish_rpc import encoding
+
+    body = xmlrpclib.dumps((), "ping").encode("utf-8")
+
+    responses = dict()
+
+    for content_encoding in ("gzip", "br"):
+        connection = httplib.HTTPConnection("127.0.0.1", port)
+        connection.request("POST", "/pyblish", encoding.compress(body),
+                           {"Content-Type": "text/xml",
+                            "Content-Encoding": content_encoding})
+        response = connection.getresponse()
+        responses[content_encoding] = response.status, response.read()
+        connection.close()
+
+    status, data = responses["gzip"]
+    assert_equals(status, 200)
+    (result,), _ = xmlrpclib.loads(data)
+    assert_equals(result["message"], "Hello, whomever you are")
+
+    # Unsupported encodings are refused
+    assert_equals(responses["br"][0], 501)
+
+
+@with_setup(setup_empty)
+def test_side_channel():
+    """Large responses are passed via a file to clients asking for it"""
+    import os
+
+    class CollectMany(pyblish.api.ContextPlugin):
+        order = pyblish.api.CollectorOrder
+
+        def process(self, context):
+            for index in range(100):
+                context.create_instance(u"Instance\xe9%d" % index)
+
+    pyblish.api.register_plugin(CollectMany)
+    self.host.reset()
+
+    plugin, = self.host.discover()
+    self.host.process(plugin, self.host.context())
+
+    def passed():
+        return self.server.metrics.stats()["sideChannel"]["count"]
+
+    threshold = self.server.side_channel_threshold
+    self.server.side_channel_threshold = 1000
+
+    try:
+        for protocol in ("xmlrpc", "json"):
+            host = pyblish_rpc.client.Proxy(port, protocol=protocol,
+                                            side_channel=True)
+            before = passed()
+
+            assert_equals(len(host.context()), 100)
+            assert_equals(host.context()[1].name, u"Instance\xe91")
+            assert_equals(passed(), before + 1)
+
+            # Small responses are sent inline
+            assert_true(host.ping())
+            assert_equals(passed(), before + 1)
+
+            # Removed once read
+            directory = self.server._side_directory
+            assert_equals(os.listdir(directory), [])
+
+            host.transport.close()
+
+        # Not for clients that don't ask for it
+        before = passed()
+        self.host.cached_revision = None
+        assert_equals(len(self.host.context()), 100)
+        assert_equals(passed(), before)
+
+    finally:
+        self.server.side_channel_threshold = threshold
+
+    assert_true("pyblish_rpc_side_channel_total 2" in
+                self.server.metrics.text(), self.server.metrics.text())
+
+
+def test_keepalive():
+    """Connections are reused between requests and threads"""
+    import threading
+
+    host = pyblish_rpc.client.Proxy(port)
+    errors = list()
+
+    def ping():
+        try:
+            for _ in range(10):
+                assert_true(host.ping())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=ping) for _ in range(4)]
+    for thread_ in threads:
+        thread_.start()
+    for thread_ in threads:
+        thread_.join()
+
+    stats = host.transport.stats()
+    host.transport.close()
+
+    assert_equals(errors, [])
+    assert_true(stats["connects"] <= 4, stats)
+    assert_equals(stats["connects"] + stats["reuses"], 40)
+
+
+@with_setup(setup_empty)
+def test_protocols():
+    """Every encoding is answered with the same results"""
+    import pyblish_rpc.encoding
+
+    class CollectInstance(pyblish.api.ContextPlugin):
+        order = pyblish.api.CollectorOrder
+
+        def process(self, context):
+            context.create_instance("A", family="myFamily")
+
+    pyblish.api.register_plugin(CollectInstance)
+
+    protocols = ["xmlrpc", "json"]
+    if pyblish_rpc.encoding.MSGPACK in pyblish_rpc.encoding.content_types:
+        protocols.append("msgpack")
+
+    results = list()
+    for protocol in protocols:
+        host = pyblish_rpc.client.Proxy(port, protocol=protocol)
+        host.reset()
+        plugin, = host.discover()
+        result = host.process(plugin, host.context())
+        assert_true(result["success"])
+        assert_equals(host.context()[0].name, "A")
+        results.append(sorted(result["plugin"].items()))
+        host.transport.close()
+
+    for result in results[1:]:
+        assert_equals(result, results[0])
+
+    host = pyblish_rpc.client.Proxy(port, protocol="json")
+    assert_true("kill" in host.system.listMethods())
+
+    try:
+        host._proxy.process({"id": "Stale"}, None, None)
+    except pyblish_rpc.client.Fault as fault:
+        assert_true("Stale" in fault.faultString)
+    else:
+        assert False, "Fault not raised"
+
+    host.transport.close()
+
+
 @with_setup(setup_empty)
 def test_logic():
     """Logic works well"""
@@ -266,6 +782,527 @@ def test_logic():
     assert_true(count["failed"])
 
 
+@with_setup(setup_empty)
+def test_plugin_proxies():
+    """Plug-in proxies are reused until their plug-in changes"""
+
+    class CollectA(pyblish.api.ContextPlugin):
+        order = pyblish.api.CollectorOrder
+
+        def process(self, context):
+            pass
+
+    class ValidateB(pyblish.api.InstancePlugin):
+        order = pyblish.api.ValidatorOrder
+
+        def process(self, instance):
+            pass
+
+        def repair(self, instance):
+            pass
+
+    pyblish.api.register_plugin(CollectA)
+    pyblish.api.register_plugin(ValidateB)
+
+    self.host.reset()
+    first = list(self.host.discover())
+
+    collect, validate = first
+    assert_equals(collect.__name__, "CollectAProxy")
+    assert_true(collect.__contextEnabled__)
+    assert_true(validate.__instanceEnabled__)
+    assert_true(validate.hasRepair)
+
+    # Signatures are those of the original plug-in
+    assert_equals(inspect.getargspec(collect.process).args,
+                  ["self", "context"])
+    assert_equals(inspect.getargspec(validate.repair).args,
+                  ["self", "instance"])
+
+    # Toggled by the client, e.g. from a GUI
+    collect.active = False
+
+    second = list(self.host.discover())
+    assert_true(second[0] is first[0])
+    assert_true(second[1] is first[1])
+    assert_equals(collect.active, True)
+
+    # Proxies are kept per Proxy
+    other = pyblish_rpc.client.Proxy(port)
+    assert_true(other.discover()[0] is not first[0])
+    other.transport.close()
+
+    ValidateB.active = False
+    third = list(self.host.discover())
+    assert_true(third[0] is first[0])
+    assert_true(third[1] is not first[1])
+    assert_equals(third[1].active, False)
+
+
+@with_setup(setup_empty)
+def test_context_fields():
+    """A selection of data is synchronised, more fetched on demand"""
+
+    class CollectInstances(pyblish.api.ContextPlugin):
+        order = pyblish.api.CollectorOrder
+
+        def process(self, context):
+            for name in ("A", "B"):
+                context.create_instance(name,
+                                        family="myFamily",
+                                        path="/path/to/" + name)
+
+    class ValidateInstances(pyblish.api.InstancePlugin):
+        order = pyblish.api.ValidatorOrder
+
+        def process(self, instance):
+            instance.data["path"] += "/v002"
+            instance.data["publish"] = False
+
+    pyblish.api.register_plugin(CollectInstances)
+    pyblish.api.register_plugin(ValidateInstances)
+
+    host = pyblish_rpc.client.Proxy(port)
+    host.reset()
+    collector, validator = host.discover()
+    fields = {"keys": ["family", "publish"]}
+
+    host.process(collector, host.context(fields))
+    context = host.context(fields)
+    a, b = context
+    assert_equals(dict(a.data), {"family": "myFamily"})
+
+    host.process(validator, context, a)
+    assert host.context(fields) is context
+    assert_equals(dict(a.data), {"family": "myFamily", "publish": False})
+
+    # The selected instance, in more detail
+    instance = host.instance(a.id, {"keys": ["path"]})
+    assert_equals(instance.data["path"], "/path/to/A/v002")
+    assert_true("path" not in a.data)
+
+    # Another selection is transferred in full
+    context = host.context({"idsOnly": True})
+    assert_equals([dict(i.data) for i in context], [{}, {}])
+    assert_equals([i.id for i in context], [a.id, b.id])
+
+    host.transport.close()
+
+
+@with_setup(setup_empty)
+def test_context_changes():
+    """Context is synchronised incrementally"""
+
+    class CollectInstances(pyblish.api.ContextPlugin):
+        order = pyblish.api.CollectorOrder
+
+        def process(self, context):
+            context.create_instance("A", family="myFamily")
+            context.create_instance("B", family="myFamily")
+
+    class ValidateInstances(pyblish.api.InstancePlugin):
+        order = pyblish.api.ValidatorOrder
+
+        def process(self, instance):
+            instance.data["family"] = "otherFamily"
+
+    class RemoveInstances(pyblish.api.ContextPlugin):
+        order = pyblish.api.ExtractorOrder
+
+        def process(self, context):
+            context.remove(context[0])
+
+    for plugin in (CollectInstances, ValidateInstances, RemoveInstances):
+        pyblish.api.register_plugin(plugin)
+
+    host = pyblish_rpc.client.Proxy(port)
+    host.reset()
+    collector, validator, remover = host.discover()
+
+    context = host.context()
+    assert_equals(list(context), [])
+
+    # Nothing has changed, nothing is sent
+    revision = host.cached_revision
+    assert_equals(host.changes(revision), {"revision": revision,
+                                           "since": revision})
+
+    # Reading the context in full changes nothing either
+    host._proxy.context()
+    assert_equals(host.changes(revision), {"revision": revision,
+                                           "since": revision})
+
+    host.process(collector, context)
+    assert host.context() is context
+    assert_equals([i.name for i in context], ["A", "B"])
+
+    a, b = context
+    host.process(validator, context, a)
+    changes = host.changes(host.cached_revision)
+    assert_equals(list(changes["context"].keys()), [a.id])
+    assert_equals(changes["context"][a.id]["family"],
+                  {"old": "myFamily", "new": "otherFamily"})
+
+    host.context()
+    assert_equals(a.data["family"], "otherFamily")
+    assert_equals(b.data["family"], "myFamily")
+
+    host.process(remover, context)
+    assert_equals(list(host.context()), [b])
+
+    host.transport.close()
+
+
+@with_setup(setup_empty)
+def test_context_unchanged():
+    """Revision moves on only as the context changes"""
+
+    class ValidateNothing(pyblish.api.ContextPlugin):
+        order = pyblish.api.ValidatorOrder
+
+        def process(self, context):
+            pass
+
+    pyblish.api.register_plugin(ValidateNothing)
+
+    host = pyblish_rpc.client.Proxy(port)
+    host.reset()
+    plugin, = host.discover()
+
+    context = host.context()
+    revision = host.cached_revision
+
+    host.process(plugin, context)
+    assert_equals(host.changes(revision), {"revision": revision,
+                                           "since": revision})
+
+    # Metadata is refreshed for clients polling changes alone
+    pyblish.api.register_host("otherHost")
+
+    try:
+        changes = host.changes(revision)
+    finally:
+        pyblish.api.deregister_host("otherHost")
+
+    assert_true(changes["revision"] > revision)
+    assert_true("otherHost" in changes["context"][context.id]["host"]["new"])
+
+    host.transport.close()
+
+
+@with_setup(setup_empty)
+def test_context_renamed():
+    """Members of instances other than data are synchronised too"""
+
+    class CollectInstance(pyblish.api.ContextPlugin):
+        order = pyblish.api.CollectorOrder
+
+        def process(self, context):
+            context.create_instance("A")
+
+    class RenameInstance(pyblish.api.InstancePlugin):
+        order = pyblish.api.ValidatorOrder
+
+        def process(self, instance):
+            instance._name = "Renamed"
+
+    for plugin in (CollectInstance, RenameInstance):
+        pyblish.api.register_plugin(plugin)
+
+    host = pyblish_rpc.client.Proxy(port)
+    host.reset()
+    collector, renamer = host.discover()
+
+    context = host.context()
+    host.process(collector, context)
+    instance, = host.context()
+
+    host.process(renamer, context, instance)
+    renamed, = host.context()
+    assert_equals(renamed.id, instance.id)
+    assert_equals(renamed.name, "Renamed")
+
+    host.transport.close()
+
+
+@with_setup(setup_empty)
+def test_pass():
+    """A whole pass is processed on the host"""
+    count = {"#": 0}
+
+    class CollectInstances(pyblish.api.ContextPlugin):
+        order = pyblish.api.CollectorOrder
+
+        def process(self, context):
+            context.create_instance("A", family="myFamily")
+            context.create_instance("B", family="myFamily", publish=False)
+
+    class ValidateInstances(pyblish.api.InstancePlugin):
+        order = pyblish.api.ValidatorOrder
+        families = ["myFamily"]
+
+        def process(self, instance):
+            count["#"] += 1
+            assert False, "I was programmed to fail"
+
+    class ExtractInstances(pyblish.api.InstancePlugin):
+        """Not run, validation failed"""
+        order = pyblish.api.ExtractorOrder
+        families = ["myFamily"]
+
+        def process(self, instance):
+            count["#"] += 10
+
+    for plugin in (CollectInstances, ValidateInstances, ExtractInstances):
+        pyblish.api.register_plugin(plugin)
+
+    host = pyblish_rpc.client.Proxy(port)
+    host.reset()
+
+    collect = list(host.run_pass(
+        orders=[None, pyblish.api.CollectorOrder + 0.5]))
+    assert_equals(len(collect), 1)
+    assert_equals(len(host.context()), 2)
+
+    publish = list(host.run_pass([ValidateInstances, ExtractInstances]))
+    assert_equals([r["instance"]["name"] for r in publish], ["A"])
+    assert_true(publish[0]["error"] is not None)
+    assert_equals(count["#"], 1)
+
+    host.transport.close()
+
+
+@with_setup(setup_empty)
+def test_record_streaming():
+    """Records are streamed whilst processing"""
+    import threading
+
+    received = threading.Event()
+
+    class ExtractSlowly(pyblish.api.ContextPlugin):
+        order = pyblish.api.ExtractorOrder
+
+        def process(self, context):
+            self.log.info("First")
+            received.wait(5)
+            self.log.info("Second")
+
+    pyblish.api.register_plugin(ExtractSlowly)
+
+    host = pyblish_rpc.client.Proxy(port)
+    host.reset()
+
+    records = list()
+
+    def on_record(record):
+        records.append(record["message"])
+        received.set()
+
+    plugin, = host.discover()
+    result = host.process(plugin, host.context(),
+                          on_record=on_record,
+                          interval=0.01)
+
+    assert_true(received.is_set())
+    assert_equals(records, ["First", "Second"])
+    assert_equals([r["message"] for r in result["records"]],
+                  ["First", "Second"])
+
+    host.transport.close()
+
+
+@with_setup(setup_empty)
+def test_record_streaming_threads():
+    """Records of threads spawned by plug-ins are kept when streaming"""
+    import threading
+
+    class ExtractThreaded(pyblish.api.ContextPlugin):
+        order = pyblish.api.ExtractorOrder
+
+        def process(self, context):
+            self.log.info("First")
+
+            thread = threading.Thread(target=self.log.info,
+                                      args=("Worker",))
+            thread.start()
+            thread.join()
+
+            self.log.info("Second")
+
+    pyblish.api.register_plugin(ExtractThreaded)
+
+    host = pyblish_rpc.client.Proxy(port)
+    host.reset()
+
+    records = list()
+
+    def on_record(record):
+        records.append(record["message"])
+
+    plugin, = host.discover()
+    streamed = host.process(plugin, host.context(),
+                            on_record=on_record,
+                            interval=0.01)
+    result = host.process(plugin, host.context())
+
+    messages = ["First", "Worker", "Second"]
+    assert_equals(sorted(records), sorted(messages))
+    assert_equals([r["message"] for r in streamed["records"]], messages)
+    assert_equals([r["message"] for r in result["records"]], messages)
+
+    host.transport.close()
+
+
+@with_setup(setup_empty)
+def test_record_filtering():
+    """Records are filtered by level and detail, per call or throughout"""
+
+    class ValidateChatty(pyblish.api.ContextPlugin):
+        order = pyblish.api.ValidatorOrder
+
+        def process(self, context):
+            self.log.info("Chatter")
+            self.log.warning("Warning")
+
+    pyblish.api.register_plugin(ValidateChatty)
+
+    host = pyblish_rpc.client.Proxy(port)
+    host.reset()
+    plugin, = host.discover()
+
+    result = host.process(plugin, host.context(),
+                          records={"detail": "minimal", "level": 30})
+    record, = result["records"]
+    assert_equals(sorted(record),
+                  ["levelname", "levelno", "message", "name"])
+    assert_equals(record["message"], "Warning")
+
+    try:
+        host.configure_records("standard", 30)
+
+        for on_record in (None, lambda record: None):
+            result = host.process(plugin, host.context(),
+                                  on_record=on_record,
+                                  interval=0.01)
+            record, = result["records"]
+            assert_true("funcName" in record, record)
+            assert_true("pathname" not in record, record)
+
+    finally:
+        assert_equals(host.configure_records("full", 0),
+                      {"detail": "full", "level": 0})
+
+    result = host.process(plugin, host.context())
+    assert_equals(len(result["records"]), 2)
+
+    host.transport.close()
+
+
+@with_setup(setup_empty)
+def test_profiling():
+    """Calls are profiled, including those already running"""
+    import os
+    import time
+    import threading
+
+    class ExtractSlowly(pyblish.api.ContextPlugin):
+        order = pyblish.api.ExtractorOrder
+
+        def process(self, context):
+            time.sleep(0.3)
+
+    pyblish.api.register_plugin(ExtractSlowly)
+
+    host = pyblish_rpc.client.Proxy(port)
+    host.reset()
+    plugin, = host.discover()
+    context = host.context()
+
+    thread = threading.Thread(target=host.process, args=(plugin, context))
+    thread.start()
+    time.sleep(0.1)
+
+    host.profile_start("sample", ["process"], 0.005)
+    thread.join()
+    summary = host.profile_stop(50)
+
+    assert_true(summary["samples"] > 0, summary)
+    assert_true(os.path.exists(summary["path"]))
+    assert_true(any("process (test_blackbox.py" in function["function"]
+                    for function in summary["top"]), summary)
+    os.remove(summary["path"])
+
+    host.profile_start("cprofile", ["process"])
+    host.process(plugin, context)
+    host.ping()
+    summary = host.profile_stop(5)
+
+    assert_equals(summary["calls"], 1)
+    assert_true(os.path.exists(summary["path"]))
+    assert_equals(len(summary["top"]), 5)
+    os.remove(summary["path"])
+
+    # Results are never written where a client says
+    path = os.path.join(os.path.dirname(summary["path"]), "profile.txt")
+    assert_raises(Exception, host._proxy.profile_start,
+                  "sample", None, 0.005, path)
+    assert_true(not os.path.exists(path))
+
+    host.transport.close()
+
+
+@with_setup(setup_empty)
+def test_async_proxy():
+    """Calls are concurrent, and pending calls may be cancelled"""
+    import threading
+
+    release = threading.Event()
+
+    class ExtractSlowly(pyblish.api.ContextPlugin):
+        order = pyblish.api.ExtractorOrder
+
+        def process(self, context):
+            release.wait(5)
+
+    pyblish.api.register_plugin(ExtractSlowly)
+
+    host = pyblish_rpc.client.AsyncProxy(port, workers=2)
+    host.reset().result()
+
+    context, plugins = host.context(), host.discover()
+    plugin, = plugins.result(timeout=5)
+    assert_true(issubclass(plugin, pyblish_rpc.client.PluginProxy))
+
+    processing = host.process(plugin, context.result(timeout=5))
+
+    # Answered whilst processing
+    assert_true(host.ping().result(timeout=5))
+    assert_true(not processing.done())
+
+    # Both workers busy, the third call is pending
+    blocking = host.process(plugin, context.result())
+    pending = host.ping()
+    assert_true(pending.cancel())
+    assert_true(pending.cancelled())
+
+    release.set()
+    assert_equals(processing.result(timeout=5)["error"], None)
+    assert_equals(blocking.result(timeout=5)["error"], None)
+
+    try:
+        import asyncio
+    except ImportError:
+        pass
+    else:
+        loop = asyncio.new_event_loop()
+        try:
+            assert_true(loop.run_until_complete(host.ping()))
+        finally:
+            loop.close()
+
+    host.close()
+
+
 @with_setup(setup_empty)
 def test_logging_nonstring():
     """Logging a non-string message is ok"""
@@ -327,3 +1364,80 @@ def test_emit_implicit_conversion():
                    not_converted="Test")
 
     assert count["#"] == 11
+
+
+def test_kill():
+    """Killing a server in a process of its own is answered"""
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    free_port = sock.getsockname()[1]
+    sock.close()
+
+    root = os.path.dirname(os.path.dirname(
+        os.path.abspath(pyblish_rpc.__file__)))
+
+    process = subprocess.Popen(
+        [sys.executable, "-m", "pyblish_rpc", "--port", str(free_port)],
+        cwd=root,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE)
+
+    try:
+        host = pyblish_rpc.client.Proxy(free_port)
+
+        # Once listening
+        for _ in range(100):
+            if host.ping():
+                break
+            time.sleep(0.1)
+
+        assert_equals(host.kill(), None)
+
+        stdout, stderr = process.communicate()
+        assert_equals(process.returncode, 0)
+        assert_true(b"Traceback" not in stderr, stderr)
+
+    finally:
+        if process.poll() is None:
+            process.kill()
+
+
+def test_idle_connections():
+    """Idle connections occupy no thread, and never hold up a call"""
+    import threading
+    import pyblish_rpc.service
+
+    server = pyblish_rpc.server._server(
+        0, pyblish_rpc.service.RpcService(), workers=2)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    hosts = list()
+
+    try:
+        threads = threading.active_count()
+        free_port = server.server_address[1]
+
+        for _ in range(16):
+            host = pyblish_rpc.client.Proxy(free_port)
+            assert_true(host.ping())
+            hosts.append(host)
+
+        assert_equals(threading.active_count(), threads)
+        assert_equals(hosts[0]._proxy.stats()["connectionCount"], 16)
+
+        # Each connection is answered anew
+        for host in hosts:
+            assert_true(host.ping())
+
+    finally:
+        for host in hosts:
+            host.transport.close()
+
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=10)
+
+        # Also restores the server of other tests, see kill()
+        pyblish_rpc.server.current_server = self.server
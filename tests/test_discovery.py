@@ -0,0 +1,137 @@
+import os
+import shutil
+import tempfile
+
+import pyblish.api
+
+from pyblish_rpc import discovery
+
+from nose.tools import (
+    with_setup,
+    assert_equals,
+)
+from nose.plugins.skip import SkipTest
+
+PLUGIN = """\
+import pyblish.api
+
+class %s(pyblish.api.ContextPlugin):
+    order = pyblish.api.CollectorOrder
+"""
+
+HOSTED = PLUGIN + """\
+    hosts = ["cacheHost"]
+"""
+
+
+def setup():
+    global directory
+    directory = tempfile.mkdtemp()
+
+
+def teardown():
+    shutil.rmtree(directory)
+
+
+def setup_empty():
+    pyblish.api.deregister_all_paths()
+    pyblish.api.deregister_all_plugins()
+
+    for fname in os.listdir(directory):
+        os.remove(os.path.join(directory, fname))
+
+
+def write(fname, content):
+    path = os.path.join(directory, fname)
+    with open(path, "w") as f:
+        f.write(content)
+    return path
+
+
+@with_setup(setup_empty)
+def test_cache():
+    """Only modules changed since last discovered are imported anew"""
+    write("collect_a.py", PLUGIN % "CollectA")
+    write("collect_b.py", PLUGIN % "CollectB")
+    write("broken.py", "raise ImportError('broken')")
+
+    cache = discovery.Cache()
+    plugins = cache.discover(paths=[directory])
+    assert_equals(sorted(p.__name__ for p in plugins),
+                  ["CollectA", "CollectB"])
+    assert_equals(cache.stats(), {"hits": 0, "misses": 3, "modules": 3})
+
+    # Unchanged, including the broken module
+    assert_equals(cache.discover(paths=[directory]), plugins)
+    assert_equals(cache.stats(), {"hits": 3, "misses": 3, "modules": 3})
+
+    write("collect_b.py", PLUGIN % "CollectRenamed")
+    os.remove(os.path.join(directory, "broken.py"))
+
+    plugins = cache.discover(paths=[directory])
+    assert_equals(sorted(p.__name__ for p in plugins),
+                  ["CollectA", "CollectRenamed"])
+    assert_equals(cache.stats(), {"hits": 4, "misses": 4, "modules": 2})
+
+
+@with_setup(setup_empty)
+def test_watcher():
+    """Changed modules are invalidated by the watcher"""
+    path = write("collect_a.py", PLUGIN % "CollectA")
+
+    cache = discovery.Cache()
+    cache.discover(paths=[directory])
+
+    changes = list()
+    watcher = discovery.Watcher(cache, on_change=changes.append)
+    assert_equals(watcher.check(), [])
+
+    write("collect_a.py", PLUGIN % "CollectChanged")
+    assert_equals(watcher.check(), [path])
+    assert_equals(changes, [[path]])
+    assert_equals(cache.stats()["modules"], 0)
+
+    plugin, = cache.discover(paths=[directory])
+    assert_equals(plugin.__name__, "CollectChanged")
+
+
+@with_setup(setup_empty)
+def test_hosts():
+    """Hosts are checked upon each discovery, including of cached modules"""
+    write("collect_a.py", HOSTED % "CollectA")
+
+    cache = discovery.Cache()
+    assert_equals(cache.discover(paths=[directory]), [])
+
+    pyblish.api.register_host("cacheHost")
+
+    try:
+        plugin, = cache.discover(paths=[directory])
+        assert_equals(plugin.__name__, "CollectA")
+        assert_equals(cache.stats()["hits"], 1)
+    finally:
+        pyblish.api.deregister_host("cacheHost")
+
+
+@with_setup(setup_empty)
+def test_filters():
+    """Discovery filters apply to plug-ins of cached modules"""
+    if not hasattr(pyblish.api, "register_discovery_filter"):
+        raise SkipTest("Discovery filters require pyblish 1.8+")
+
+    write("collect_a.py", PLUGIN % "CollectA")
+    write("collect_b.py", PLUGIN % "CollectB")
+
+    def exclude_b(plugins):
+        plugins[:] = [p for p in plugins if p.__name__ != "CollectB"]
+
+    cache = discovery.Cache()
+    cache.discover(paths=[directory])
+
+    pyblish.api.register_discovery_filter(exclude_b)
+
+    try:
+        plugin, = cache.discover(paths=[directory])
+        assert_equals(plugin.__name__, "CollectA")
+    finally:
+        pyblish.api.deregister_discovery_filter(exclude_b)
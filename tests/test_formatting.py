@@ -5,6 +5,12 @@ import pyblish.api
 from pyblish_rpc import schema
 from pyblish_rpc import formatting
 
+from nose.tools import (
+    assert_equals,
+    assert_true,
+    assert_raises,
+)
+
 
 def test_instance():
     """Formatting of instances works fine"""
@@ -32,6 +38,39 @@ def test_context():
     json.dumps(context)
 
 
+def test_fields():
+    """Data is selected, truncated and instances filtered by fields"""
+    context = pyblish.api.Context()
+    a = context.create_instance("A", family="MyFamily", path="/a" * 50)
+    context.create_instance("B", family="MyFamily", frames=list(range(100)))
+
+    # Defaults to the whitelist
+    assert_equals(formatting.format_data(a.data),
+                  {"name": "A", "family": "MyFamily"})
+
+    formatted = formatting.format_context(context, {
+        "keys": ["family", "path", "frames"],
+        "maxSize": 10,
+    })
+    schema.validate(formatted, "context")
+
+    a_, b_ = formatted["children"]
+    assert_equals(a_["data"]["path"], "/a/a/a/a/a")
+    assert_equals(a_["data"]["__truncated__"], {"path": 100})
+    assert_equals(b_["data"]["frames"], list(range(10)))
+    assert_equals(b_["data"]["family"], "MyFamily")
+
+    formatted = formatting.format_context(context, {
+        "idsOnly": True,
+        "instances": [a.id],
+    })
+    assert_equals(formatted["children"], [
+        {"name": "A", "id": a.id, "data": {}, "children": []}])
+
+    assert_raises(ValueError, formatting.format_context,
+                  context, {"key": ["family"]})
+
+
 def test_record():
     """Formatting of records works well"""
     import logging
@@ -52,6 +91,36 @@ def test_record():
     json.dumps(record)
 
 
+def test_record_detail():
+    """Records are formatted in detail as asked, and left untouched"""
+    record = logging.LogRecord("MyRecord", logging.INFO, "/path.py", 1,
+                               "My %s message", ("log",), None)
+    members = dict(vars(record))
+
+    minimal = formatting.format_record(record, "minimal")
+    assert_equals(sorted(minimal),
+                  ["levelname", "levelno", "message", "name"])
+    assert_equals(minimal["message"], "My %s message")
+
+    standard = formatting.format_record(record, "standard")
+    assert_equals(standard["lineno"], 1)
+    assert_true("pathname" not in standard)
+
+    full = formatting.format_record(record)
+    assert_equals(full["pathname"], "/path.py")
+    assert_true("msg" not in full)
+
+    assert_equals(vars(record), members)
+
+    debug = logging.LogRecord("MyRecord", logging.DEBUG, "/path.py", 1,
+                              "Chatter", None, None)
+    formatted = formatting.format_records([debug, record],
+                                          "minimal", logging.INFO)
+    assert_equals([r["levelno"] for r in formatted], [logging.INFO])
+
+    assert_raises(ValueError, formatting.format_records, [record], "most")
+
+
 def test_error():
     """Formatting of exceptions works well"""
     error = Exception("My message")
@@ -117,3 +186,19 @@ def test_plugin():
     # Test JSON-compatibility
     json.dumps(plugin)
 
+
+def test_plugin_cache():
+    """Plug-ins are formatted once, except for their active state"""
+    class MyPlugin(pyblish.api.ContextPlugin):
+        """Some docstring"""
+
+    first = formatting.format_plugin(MyPlugin)
+    assert formatting.format_plugin(MyPlugin) is first
+
+    MyPlugin.active = False
+    second = formatting.format_plugin(MyPlugin)
+    assert second["active"] is False
+    assert second["id"] == first["id"]
+
+    formatting.clear_cache()
+    assert formatting.format_plugin(MyPlugin) is not second
@@ -0,0 +1,78 @@
+import threading
+
+from pyblish_rpc import metrics
+
+from nose.tools import (
+    assert_equals,
+    assert_true,
+)
+
+
+def test_histogram():
+    """Values are counted in the bucket of their upper bound"""
+    histogram = metrics.Histogram(bounds=(1, 2, 3))
+
+    for value in (0.5, 1, 1.5, 2.5, 10):
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+    assert_equals(snapshot["counts"], [2, 1, 1, 1])
+    assert_equals(snapshot["count"], 5)
+    assert_equals(snapshot["max"], 10)
+    assert_equals(histogram.percentile(50), 2)
+    assert_equals(histogram.percentile(100), 10)
+
+
+def test_concurrent_counts():
+    """No calls are lost to concurrent recording"""
+    metrics_ = metrics.Metrics()
+
+    def record():
+        for _ in range(1000):
+            metrics_.record("ping", execution=0.001)
+            metrics_.transferred("ping", 10, 20)
+
+    threads = [threading.Thread(target=record) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = metrics_.stats()
+    assert_equals(stats["totalRequestCount"], 8000)
+    assert_equals(stats["methods"]["ping"]["execution"]["count"], 8000)
+    assert_equals(stats["bytesReceived"], 80000)
+    assert_equals(stats["bytesSent"], 160000)
+
+
+def test_text():
+    """Metrics are rendered per method, buckets cumulative"""
+    metrics_ = metrics.Metrics(max_methods=1)
+    metrics_.record("process", error=True, execution=0.002)
+    metrics_.record("process", execution=20)
+    metrics_.record('unknown"', execution=0.002)
+
+    text = metrics_.text(gauges={"queueDepth": 3})
+
+    assert_true('pyblish_rpc_errors_total{method="process"} 1' in text)
+    assert_true('pyblish_rpc_requests_total{method="other"} 1' in text)
+    assert_true('pyblish_rpc_execution_seconds_bucket'
+                '{method="process",le="0.0025"} 1' in text)
+    assert_true('pyblish_rpc_execution_seconds_bucket'
+                '{method="process",le="+Inf"} 2' in text)
+    assert_true("pyblish_rpc_queue_depth 3" in text)
+
+
+def test_compression():
+    """Compression is totalled, along with its ratio"""
+    metrics_ = metrics.Metrics()
+    assert_equals(metrics_.stats()["compression"]["ratio"], 1.0)
+
+    metrics_.compressed(1000, 100, 0.001)
+    metrics_.compressed(3000, 300, 0.003)
+
+    stats = metrics_.stats()["compression"]
+    assert_equals(stats["count"], 2)
+    assert_equals(stats["bytesIn"], 4000)
+    assert_equals(stats["ratio"], 0.1)
+    assert_true("pyblish_rpc_compressed_total 2" in metrics_.text())
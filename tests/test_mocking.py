@@ -7,7 +7,7 @@ import pyblish.plugin
 import pyblish_rpc.service
 import pyblish_rpc.mocking
 
-import mock
+from pyblish_rpc.vendor import mock
 
 
 @mock.patch("time.sleep")
@@ -0,0 +1,123 @@
+import threading
+
+from pyblish_rpc import pool
+
+from nose.tools import (
+    assert_equals,
+    assert_raises,
+    assert_true,
+)
+
+
+def test_priority_and_limit():
+    """Work is done by priority and refused once the queue is full"""
+    workers = pool.WorkerPool(workers=1, queue_size=2)
+    release = threading.Event()
+    order = list()
+
+    blocking = workers.submit(1, release.wait, 5)
+
+    # Wait for the worker to pick it up
+    while not workers.stats()["busyWorkers"]:
+        pass
+
+    low = workers.submit(1, order.append, "low")
+    high = workers.submit(0, order.append, "high")
+    assert_raises(pool.Busy, workers.submit, 0, order.append, "refused")
+    assert_equals(workers.stats()["queueDepth"], 2)
+
+    release.set()
+    blocking.result(5)
+    low.result(5)
+    high.result(5)
+
+    assert_equals(order, ["high", "low"])
+    assert_equals(workers.stats()["rejectedCount"], 1)
+
+    workers.shutdown()
+
+
+def test_reserved():
+    """Reserved workers carry out work of priority 0 alone"""
+    workers = pool.WorkerPool(workers=2, reserved=1)
+    release = threading.Event()
+
+    blocking = workers.submit(1, release.wait, 5)
+    queued = workers.submit(1, lambda: "Low")
+
+    # Not stuck behind work of lower priority
+    assert_equals(workers.submit(0, lambda: "High").result(5), "High")
+    assert_true(not queued.done())
+
+    release.set()
+    assert_equals(queued.result(5), "Low")
+    assert_true(blocking.result(5))
+
+    assert_raises(ValueError, pool.WorkerPool, workers=1, reserved=1)
+
+    workers.shutdown()
+
+
+def test_future():
+    """Futures re-raise exceptions and may be cancelled until started"""
+    workers = pool.WorkerPool(workers=1)
+    release = threading.Event()
+
+    blocking = workers.submit(1, release.wait, 5)
+    failing = workers.submit(1, lambda: 1 / 0)
+    cancelled = workers.submit(1, lambda: "Not run")
+
+    assert_true(cancelled.cancel())
+    release.set()
+
+    assert_raises(ZeroDivisionError, failing.result, 5)
+    assert_raises(pool.Cancelled, cancelled.result, 5)
+    assert_true(blocking.result(5))
+
+    workers.shutdown()
+
+
+def test_coalescer():
+    """Calls pending whilst the wrapper is busy are handed over together"""
+    coalescer = pool.Coalescer()
+    entered = threading.Event()
+    release = threading.Event()
+    batches = list()
+
+    def wrapper(func, *args, **kwargs):
+        batches.append(len(args[0]))
+        entered.set()
+        release.wait(5)
+        return func(*args, **kwargs)
+
+    results = list()
+
+    def call(value):
+        results.append(coalescer.call(wrapper, lambda: value * 2))
+
+    first = threading.Thread(target=call, args=(0,))
+    first.start()
+    entered.wait(5)
+
+    others = [threading.Thread(target=call, args=(value,))
+              for value in range(1, 5)]
+    for thread in others:
+        thread.start()
+
+    # Wait for the others to queue up behind the first
+    while len(coalescer._pending) < 4:
+        pass
+
+    release.set()
+    for thread in [first] + others:
+        thread.join(5)
+
+    assert_equals(batches, [1, 4])
+    assert_equals(sorted(results), [0, 2, 4, 6, 8])
+    assert_equals(coalescer.stats(), {"mainThreadHops": 2,
+                                      "mainThreadCalls": 5})
+
+    def fail():
+        raise ValueError("Failed")
+
+    assert_raises(ValueError, coalescer.call, wrapper, fail)
@@ -0,0 +1,43 @@
+import pyblish.api
+
+from pyblish_rpc import registry
+
+from nose.tools import (
+    assert_equals,
+    assert_raises,
+    assert_true,
+)
+
+
+def test_context_mutations():
+    """Every kind of context mutation is reflected in its registry"""
+    context = registry.IndexedContext()
+    a = context.create_instance("A")
+    b = pyblish.api.Instance("B")
+    c = pyblish.api.Instance("C")
+
+    context.extend(iter([b]))
+    context.insert(0, c)
+    assert_equals(len(context.registry), 3)
+
+    # Rearranging, as done by e.g. mocking.RearrangingPlugin
+    context[:] = sorted(context, key=lambda i: i.name, reverse=True)
+    assert_equals(len(context.registry), 3)
+    assert_true(context[a.id] is a)
+
+    context.pop()
+    assert_true(a.id not in context)
+
+    del context[0]
+    assert_true(c.id not in context)
+    assert_equals(list(context), [b])
+    assert_true(context.get(b.id) is b)
+
+
+def test_stale_id():
+    """Looking up a removed instance is a KeyError"""
+    context = registry.IndexedContext()
+    instance = context.create_instance("A")
+    context.remove(instance)
+
+    assert_raises(KeyError, lambda: context.registry[instance.id])
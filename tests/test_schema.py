@@ -0,0 +1,99 @@
+from pyblish_rpc import schema
+from pyblish_rpc.vendor import jsonschema
+
+from nose.tools import (
+    assert_equals,
+    assert_raises,
+)
+
+
+def test_compiled_agrees_with_jsonschema():
+    """Compiled validators accept and reject what jsonschema does"""
+    samples = {
+        "instance": [
+            {"name": "A", "id": "1", "data": {}, "children": []},
+            {"name": 5, "id": "1", "data": {}},
+            {"id": "1", "data": {}},
+            {"name": "A", "data": {"compatibleInstances": ["a", 5]}},
+        ],
+        "error": [
+            {"message": "m", "exc": None},
+            {"message": "m", "exc": "e"},
+            {"message": "m", "exc": 5},
+        ],
+        "changes": [
+            {"revision": 2, "since": 1},
+            {"revision": 2, "since": 1, "context": {"x": {"new": 1}}},
+            {"revision": 2, "since": 1, "context": {"x": {"other": 1}}},
+            {"revision": 2, "since": 1, "added": [{"name": 1}]},
+            {"revision": True, "since": 1},
+            {"revision": 2, "since": 1, "unknown": 1},
+        ],
+    }
+
+    for name, objects in samples.items():
+        fallback = schema._fallback(schema.cache[name + ".json"])
+
+        for obj in objects:
+            try:
+                fallback(obj)
+            except jsonschema.ValidationError:
+                assert_raises(schema.ValidationError,
+                              schema.validate, obj, name)
+            else:
+                schema.validate(obj, name)
+
+
+def test_fallback():
+    """Schemas beyond the compiler are validated by jsonschema"""
+    pattern = {"type": "string", "pattern": "^a"}
+    schema.validate("abc", pattern)
+    assert_raises(schema.ValidationError, schema.validate, "cba", pattern)
+
+
+def test_jsonschema_error():
+    """Errors are those of jsonschema too, once jsonschema is imported"""
+    invalid = {"name": 5, "data": {}}
+    assert_raises(jsonschema.ValidationError,
+                  schema.validate, invalid, "instance")
+    assert_raises(jsonschema.ValidationError,
+                  schema.validate, "cba", {"type": "string", "pattern": "^a"})
+
+    try:
+        schema.validate(invalid, "instance")
+    except schema.ValidationError as e:
+        assert_equals(str(e), e.message)
+
+
+def test_error_path():
+    """Errors point to the offending member"""
+    try:
+        schema.validate({"name": "A", "data": {"family": 5}},
+                        "instance")
+    except schema.ValidationError as e:
+        assert_equals(list(e.path), ["data", "family"])
+    else:
+        raise AssertionError("Should have failed")
+
+
+def test_sampling():
+    """Only 1-in-N objects are validated when sampling"""
+    rate = schema.rate
+    invalid = {"name": 5, "data": {}}
+
+    try:
+        schema.configure(0)
+        schema.check(invalid, "instance")
+
+        schema.configure(3)
+        failures = 0
+        for _ in range(9):
+            try:
+                schema.check(invalid, "instance")
+            except schema.ValidationError:
+                failures += 1
+
+        assert_equals(failures, 3)
+
+    finally:
+        schema.configure(rate)
@@ -0,0 +1,102 @@
+import threading
+
+import pyblish.api
+
+from pyblish_rpc import sessions, service
+
+from nose.tools import (
+    with_setup,
+    assert_equals,
+    assert_true,
+)
+
+
+def setup_empty():
+    pyblish.api.deregister_all_paths()
+    pyblish.api.deregister_all_plugins()
+
+
+def test_eviction():
+    """Idle sessions are evicted, least recently used first"""
+    store = sessions.Sessions(list, len, max_sessions=4)
+
+    for id in (None, "a", "b"):
+        store.release(store.acquire(id))
+
+    busy = store.acquire("c")
+    store.release(store.acquire("a"))
+
+    # Neither the default, the busy nor the most recently used
+    store.release(store.acquire("d"))
+    assert_equals(sorted(store.stats()["sessions"]),
+                  ["a", "c", "d", "default"])
+
+    store.release(store.acquire("e"))
+    assert_equals(sorted(store.stats()["sessions"]),
+                  ["c", "d", "default", "e"])
+    assert_equals(store.stats()["evictedSessionCount"], 2)
+
+    store.release(busy)
+    assert_equals(store.stats()["sessions"]["c"]["calls"], 1)
+
+
+def test_budget():
+    """Sessions are evicted once larger than their budget in total"""
+    store = sessions.Sessions(list, len, max_size=10)
+
+    for id in ("a", "b", "c"):
+        session = store.acquire(id)
+        session.state.extend(range(4))
+        store.release(session)
+
+    store.release(store.acquire("d"))
+
+    stats = store.stats()
+    assert_equals(sorted(stats["sessions"]), ["b", "c", "d"])
+    assert_equals(stats["sessions"]["b"]["size"], 4)
+    assert_true(stats["sessions"]["b"]["idle"] >= 0)
+
+
+def test_scope():
+    """Sessions are scoped to the thread, and nest"""
+    assert_equals(sessions.current(), None)
+
+    with sessions.scope("a"):
+        with sessions.scope("b"):
+            assert_equals(sessions.current(), "b")
+        assert_equals(sessions.current(), "a")
+
+    assert_equals(sessions.current(), None)
+
+
+@with_setup(setup_empty)
+def test_pass_holds_session():
+    """Sessions are never evicted whilst a pass is running"""
+    proceed = threading.Event()
+
+    class CollectA(pyblish.api.ContextPlugin):
+        order = pyblish.api.CollectorOrder
+
+        def process(self, context):
+            proceed.wait(5)
+            context.create_instance("A")
+
+    pyblish.api.register_plugin(CollectA)
+
+    host = service.RpcService(max_sessions=2)
+
+    with sessions.scope("a"):
+        id_ = host._dispatch("start_pass", [])
+
+    for id in ("b", "c", "d"):
+        with sessions.scope(id):
+            host._dispatch("ping", [])
+
+    assert_true("a" in host.stats()["sessions"])
+    proceed.set()
+
+    with sessions.scope("a"):
+        assert_true(host._dispatch("poll_pass", [id_, 0, 5])["finished"])
+        assert_equals(len(host._dispatch("context", [])["children"]), 1)
+
+    assert_equals(host.stats()["sessions"]["a"]["active"], 0)
@@ -0,0 +1,58 @@
+import logging
+import threading
+
+from pyblish_rpc import streaming
+
+from nose.tools import assert_equals
+
+
+def test_ring_buffer():
+    """Records beyond the size of the buffer are dropped, oldest first"""
+    stream = streaming.RecordStream(size=3)
+    log = logging.getLogger("test_ring_buffer")
+    log.propagate = False
+    log.addHandler(stream)
+
+    for message in "ABCDE":
+        log.warning(message)
+
+    status = stream.fetch(since=1)
+    assert_equals([r["message"] for r in status["records"]], list("CDE"))
+    assert_equals(status["next"], 5)
+    assert_equals(status["dropped"], 1)
+
+    log.warning("F")
+    assert_equals([r["message"] for r in stream.undelivered()], ["F"])
+
+
+def test_level():
+    """Records below the level of the stream are never buffered"""
+    stream = streaming.RecordStream(detail="minimal", level=logging.INFO)
+    log = logging.getLogger("test_level")
+    log.propagate = False
+    log.setLevel(logging.DEBUG)
+    log.addHandler(stream)
+
+    log.debug("A")
+    log.info("B")
+
+    record, = stream.fetch()["records"]
+    assert_equals(record, {"name": "test_level",
+                           "levelno": logging.INFO,
+                           "levelname": "INFO",
+                           "message": "B"})
+
+
+def test_capture_thread():
+    """Only records of the capturing thread are streamed"""
+    stream = streaming.RecordStream(detail="minimal")
+    log = logging.getLogger("test_capture_thread")
+
+    with streaming.capture(stream):
+        log.warning("A")
+
+        thread = threading.Thread(target=log.warning, args=("B",))
+        thread.start()
+        thread.join()
+
+    assert_equals([r["message"] for r in stream.fetch()["records"]], ["A"])